@@ -0,0 +1,219 @@
+# audio.py
+# Звуки игры без блокировки окна.
+# play() только кладёт звук в короткую очередь и сразу возвращается;
+# проигрывает его отдельный поток. Тоны генерируются один раз при создании
+# бэкенда. При всплеске одинаковый звук, который уже ждёт в очереди, не
+# ставится повторно; при переполнении вытесняется менее важный, а звук,
+# который прождал дольше MAX_DELAY, выбрасывается — запоздалый сигнал только
+# сбивает с толку.
+#
+# Бэкенды: winsound (Windows, готовый WAV из памяти), bell (терминальный
+# звонок) и silent (ничего не играет, но считает — для тестов и серверов).
+# Выбор: переменная окружения PYDEVBATTLE_AUDIO, иначе по платформе.
+import io
+import math
+import os
+import struct
+import sys
+import threading
+import time
+import wave
+from collections import deque
+
+# Звуки: тип → ноты (частота, длительность в мс), приоритет при вытеснении
+SOUNDS = {
+    "success": ((800, 200),),
+    "bot": ((500, 80), (700, 80)),
+    "timeout": ((300, 500),),
+    "beep": ((600, 100),),
+}
+PRIORITY = {"timeout": 3, "beep": 2, "success": 1, "bot": 1}
+DEFAULT_SOUND = "beep"
+
+MAX_PENDING = 2
+MAX_DELAY = 0.3  # с; позже звук уже не относится к событию
+SAMPLE_RATE = 22050
+VOLUME = 0.4
+
+
+def render_wav(notes, sample_rate=SAMPLE_RATE, volume=VOLUME) -> bytes:
+    # Моно 16 бит; короткие нарастание и спад убирают щелчки на стыках
+    frames = bytearray()
+    amplitude = int(32767 * volume)
+    for freq, ms in notes:
+        count = sample_rate * ms // 1000
+        fade = max(1, min(count // 10, sample_rate // 200))
+        step = 2 * math.pi * freq / sample_rate
+        for i in range(count):
+            envelope = min(1.0, i / fade, (count - i) / fade)
+            frames += struct.pack("<h", int(amplitude * envelope * math.sin(step * i)))
+    buffer = io.BytesIO()
+    with wave.open(buffer, "wb") as out:
+        out.setnchannels(1)
+        out.setsampwidth(2)
+        out.setframerate(sample_rate)
+        out.writeframes(bytes(frames))
+    return buffer.getvalue()
+
+
+# === Бэкенды ===
+class AudioBackend:
+    name = "base"
+
+    def play(self, kind: str):
+        # Вызывается только из потока диспетчера; может блокировать
+        raise NotImplementedError
+
+
+class WinsoundBackend(AudioBackend):
+    name = "winsound"
+
+    def __init__(self):
+        import winsound
+
+        self._winsound = winsound
+        self._wavs = {kind: render_wav(notes) for kind, notes in SOUNDS.items()}
+
+    def play(self, kind):
+        self._winsound.PlaySound(self._wavs[kind], self._winsound.SND_MEMORY | self._winsound.SND_NODEFAULT)
+
+
+class BellBackend(AudioBackend):
+    # Терминальный звонок: тон не задать, поэтому один звонок на звук
+    name = "bell"
+
+    def __init__(self, stream=None):
+        self.stream = stream or sys.stdout
+
+    def play(self, kind):
+        if self.stream is not None:
+            self.stream.write("\a")
+            self.stream.flush()
+
+
+class SilentBackend(AudioBackend):
+    name = "silent"
+
+    def __init__(self):
+        self.played = []
+
+    def play(self, kind):
+        self.played.append(kind)
+
+
+BACKENDS = {
+    "winsound": WinsoundBackend,
+    "bell": BellBackend,
+    "silent": SilentBackend,
+}
+
+
+def make_backend(name=None) -> AudioBackend:
+    name = name or os.environ.get("PYDEVBATTLE_AUDIO") or ("winsound" if os.name == "nt" else "bell")
+    try:
+        return BACKENDS[name]()
+    except Exception:
+        # Нет winsound / звуковой карты / терминала — игра идёт без звука
+        return SilentBackend()
+
+
+# === Диспетчер ===
+class AudioDispatcher:
+    def __init__(self, backend: AudioBackend, max_pending=MAX_PENDING, max_delay=MAX_DELAY):
+        self.backend = backend
+        self.max_pending = max_pending
+        self.max_delay = max_delay
+        self._pending = deque()  # (тип, время постановки)
+        self._cond = threading.Condition()
+        self._thread = None
+        self._closed = False
+        self.stats = {"queued": 0, "played": 0, "merged": 0, "dropped": 0, "late": 0, "failed": 0}
+
+    def play(self, kind: str = DEFAULT_SOUND):
+        # Из любого потока, никогда не ждёт
+        if kind not in SOUNDS:
+            kind = DEFAULT_SOUND
+        with self._cond:
+            if self._closed:
+                return
+            if any(pending == kind for pending, _ in self._pending):
+                self.stats["merged"] += 1
+                return
+            if len(self._pending) >= self.max_pending:
+                victim = min(self._pending, key=lambda item: PRIORITY.get(item[0], 0))
+                if PRIORITY.get(victim[0], 0) > PRIORITY.get(kind, 0):
+                    self.stats["dropped"] += 1
+                    return
+                self._pending.remove(victim)
+                self.stats["dropped"] += 1
+            self._pending.append((kind, time.monotonic()))
+            self.stats["queued"] += 1
+            if self._thread is None:
+                self._thread = threading.Thread(target=self._run, name="audio", daemon=True)
+                self._thread.start()
+            self._cond.notify()
+
+    def _run(self):
+        while True:
+            with self._cond:
+                while not self._pending and not self._closed:
+                    self._cond.wait()
+                if self._closed:
+                    return
+                kind, queued_at = self._pending.popleft()
+                if time.monotonic() - queued_at > self.max_delay:
+                    self.stats["late"] += 1
+                    continue
+            try:
+                self.backend.play(kind)
+            except Exception:
+                self.stats["failed"] += 1
+            else:
+                self.stats["played"] += 1
+
+    @property
+    def pending(self) -> int:
+        return len(self._pending)
+
+    def close(self):
+        with self._cond:
+            self._closed = True
+            self._pending.clear()
+            self._cond.notify()
+
+
+# === Общий диспетчер на процесс ===
+_shared_audio = None
+_shared_lock = threading.Lock()
+
+
+def get_shared_audio() -> AudioDispatcher:
+    global _shared_audio
+    if _shared_audio is None:
+        with _shared_lock:
+            if _shared_audio is None:
+                _shared_audio = AudioDispatcher(make_backend())
+    return _shared_audio
+
+
+if __name__ == "__main__":
+    import argparse
+
+    parser = argparse.ArgumentParser(description="Проверка звуков и диспетчера")
+    parser.add_argument("--backend", choices=sorted(BACKENDS), default=None)
+    parser.add_argument("--burst", type=int, default=50, help="сколько звуков подряд отправить")
+    args = parser.parse_args()
+
+    started = time.perf_counter()
+    dispatcher = AudioDispatcher(make_backend(args.backend))
+    print(f"бэкенд: {dispatcher.backend.name}, подготовка {(time.perf_counter() - started) * 1000:.1f} мс")
+
+    kinds = list(SOUNDS)
+    worst = 0.0
+    for i in range(args.burst):
+        call = time.perf_counter()
+        dispatcher.play(kinds[i % len(kinds)])
+        worst = max(worst, time.perf_counter() - call)
+    print(f"{args.burst} вызовов play(): худший {worst * 1e6:.0f} мкс")
+    time.sleep(MAX_DELAY + 0.7)
+    print(", ".join(f"{key}: {value}" for key, value in dispatcher.stats.items()))
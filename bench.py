@@ -0,0 +1,593 @@
+# bench.py
+# Набор замеров для кода, который выполняется на каждом ходе, без окна и сети.
+#
+# Микрозамеры (нс на операцию): проверка имени (validator.name_key) и та же
+# проверка пакетом из n имён (name_keys), «уже называли» (GameEngine.check_move
+# на used_libs из n имён), путь проверки PyPI через цепочку — кэш в памяти,
+# кэш на диске, снимок индекса из n имён и запрос к локальной подмене PyPI
+# (pypi_stub), подсказка при опечатке по каталогу из n имён (fuzzy), выбор
+# хода бота на базе из n имён, добавление хода в список ходов (history_view
+# с заглушкой Tk). Макрозамер: целые партии бот против бота (нс на ход).
+# n — от 10 до 600 000 имён; данные синтетические и с фиксированным seed.
+#
+# Результаты сохраняются в JSON, compare сравнивает два прогона и помечает
+# регрессии дольше порога. Сравнивается лучший из повторов (минимум: шум
+# только добавляет времени), с поправкой на скорость машины (эталонный
+# цикл, calibrate) и с порогом не ниже разброса повторов самого кейса —
+# два прогона одного дерева не должны давать «регрессий». Допуск на шум
+# ограничен NOISE_CAP порогов: кейсы, где шум выше, перечисляются отдельно
+# как ненадёжные (с --fail-on-noise прогон тогда не проходит).
+#
+#   python bench.py run --out baseline.json
+#   python bench.py run --quick --filter chain
+#   python bench.py compare baseline.json new.json --threshold 0.15
+import gc
+import os
+import platform
+import random
+import statistics
+import subprocess
+import sys
+import tempfile
+import time
+from contextlib import contextmanager
+from typing import Callable, Dict, List, Optional, Tuple
+
+SIZES = (10, 1_000, 100_000, 600_000)
+QUICK_SIZES = (10, 1_000, 10_000)
+REPEAT = 7
+QUICK_REPEAT = 5
+THRESHOLD = 0.15
+NOISE_CAP = 2.0      # шум повторов расширяет порог не больше чем до NOISE_CAP × threshold
+CALIBRATION_LOOPS = 200_000
+SEED = 1234
+
+# Кейс: (имя, зависит ли от n, setup(n, ctx) → (run, число операций в run))
+CASES: List[Tuple[str, bool, Callable]] = []
+
+
+def case(name: str, sized: bool = True):
+    def register(setup):
+        CASES.append((name, sized, setup))
+        return setup
+    return register
+
+
+# === Данные ===
+def make_names(n: int, seed: int = SEED) -> List[str]:
+    # Похожие на PyPI имена: слоги, разделители, цифры; без повторов
+    # (и без пар вроде py_lib / py-lib — у них один канонический ключ)
+    rng = random.Random(seed)
+    syllables = ["py", "lib", "data", "web", "ml", "core", "io", "net", "kit", "fast", "auto", "json",
+                 "http", "test", "util", "flask", "django", "torch", "num", "plot"]
+    names, seen = [], set()
+    while len(names) < n:
+        parts = [rng.choice(syllables) for _ in range(rng.randint(1, 3))]
+        name = rng.choice(("", "-", "_")).join(parts)
+        if rng.random() < 0.3:
+            name += str(rng.randint(2, 99))
+        if name.replace("_", "-") in seen:
+            name = f"{name}-{len(names)}"
+        seen.add(name.replace("_", "-"))
+        names.append(name)
+    return names
+
+
+def make_inputs(count: int, seed: int = SEED) -> List[str]:
+    # То, что вводят игроки: в основном имена, немного мусора и ключевых слов
+    rng = random.Random(seed)
+    names = make_names(count, seed)
+    junk = ["", "import", "class", "1abc", "my lib", "-x", "a" * 80, "пакет", "q!"]
+    return [rng.choice(junk) if rng.random() < 0.1 else name for name in names]
+
+
+class Context:
+    # Временные файлы и общие объекты, которые дорого строить на каждый кейс
+    def __init__(self, workdir: str):
+        self.workdir = workdir
+        self._names = {}
+        self._kbs = {}
+        self.stub = None
+
+    def names(self, n: int) -> List[str]:
+        if n not in self._names:
+            self._names[n] = make_names(n)
+        return self._names[n]
+
+    def knowledge_base(self, n: int):
+        from bot_knowledge import KnowledgeBase, build_knowledge_base
+
+        if n not in self._kbs:
+            rng = random.Random(SEED)
+            categories = ("core", "web", "data-ml", "niche", "fun", "other")
+            path = os.path.join(self.workdir, f"kb-{n}.bin")
+            build_knowledge_base(((name, int(1e6 / (i + 1)) + 1, rng.choice(categories))
+                                  for i, name in enumerate(self.names(n))), path)
+            self._kbs[n] = KnowledgeBase(path)
+        return self._kbs[n]
+
+    def stub_server(self):
+        from pypi_stub import PyPIStubServer
+
+        if self.stub is None:
+            self.stub = PyPIStubServer(self.names(1_000)).start()
+        return self.stub
+
+    def close(self):
+        if self.stub is not None:
+            self.stub.stop()
+
+
+# === Заглушка Tk для списка ходов ===
+class _StubWidget:
+    def __init__(self, *args, **kwargs):
+        self._items = 0
+
+    def _noop(self, *args, **kwargs):
+        pass
+
+    pack = bind = config = itemconfig = coords = set = insert = delete = _noop
+
+    def create_text(self, *args, **kwargs):
+        self._items += 1
+        return self._items
+
+    create_rectangle = create_text
+
+    def winfo_reqwidth(self):
+        return 420
+
+    def get(self):
+        return ""
+
+
+class _StubFont:
+    def __init__(self, *args, **kwargs):
+        pass
+
+    def metrics(self, key):
+        return 14
+
+    def measure(self, text):
+        return 7 * len(text)
+
+
+class _StubTk:
+    Frame = Label = Entry = Canvas = Scrollbar = _StubWidget
+    LEFT, RIGHT = "left", "right"
+
+
+class _StubTkFont:
+    Font = _StubFont
+
+
+@contextmanager
+def stub_tk(module):
+    saved = module.tk, module.tkfont
+    module.tk, module.tkfont = _StubTk, _StubTkFont
+    try:
+        yield
+    finally:
+        module.tk, module.tkfont = saved
+
+
+# === Микрозамеры ===
+@case("valid_name", sized=False)
+def bench_valid_name(n, ctx):
+    from validator import name_key
+
+    inputs = make_inputs(10_000)
+
+    def run():
+        for name in inputs:
+            name_key(name)
+    return run, len(inputs)
+
+
+@case("name_keys")
+def bench_name_keys(n, ctx):
+    from validator import name_keys
+
+    inputs = make_inputs(n)
+
+    def run():
+        name_keys(inputs)
+    return run, len(inputs)
+
+
+@case("check_move")
+def bench_check_move(n, ctx):
+    from game_engine import GameEngine
+    from validator import name_keys
+
+    engine = GameEngine()
+    names = ctx.names(n)
+    engine.state.used_libs.update(name_keys(names))
+    # Половина запросов — уже названные имена, половина — новые
+    queries = [names[i % n] if i % 2 else f"fresh-{i}" for i in range(10_000)]
+
+    def run():
+        for name in queries:
+            engine.check_move(name)
+    return run, len(queries)
+
+
+def _chain(backends):
+    from validation import ValidationChain
+
+    return ValidationChain(backends, default_budget=5.0)
+
+
+@case("chain_memory_hit", sized=False)
+def bench_chain_memory(n, ctx):
+    from validation import MemoryCacheBackend
+
+    memory = MemoryCacheBackend()
+    names = ctx.names(1_000)
+    for name in names:
+        memory.store(name, True)
+    chain = _chain([memory])
+
+    def run():
+        for name in names:
+            chain.is_real_package(name)
+    return run, len(names)
+
+
+@case("chain_disk_hit", sized=False)
+def bench_chain_disk(n, ctx):
+    from pypi_cache import PyPICache
+    from validation import DiskCacheBackend
+
+    cache = PyPICache(os.path.join(ctx.workdir, "cache.sqlite3"))
+    names = ctx.names(1_000)
+    for name in names:
+        cache.set(name, True)
+    chain = _chain([DiskCacheBackend(cache)])
+
+    def run():
+        for name in names:
+            chain.is_real_package(name)
+    return run, len(names)
+
+
+@case("chain_index")
+def bench_chain_index(n, ctx):
+    from pypi_index import PyPIIndex, build_index
+    from validation import SnapshotIndexBackend
+
+    path = os.path.join(ctx.workdir, f"index-{n}.bin")
+    names = ctx.names(n)
+    build_index(names, path)
+    chain = _chain([SnapshotIndexBackend(PyPIIndex(path), authoritative=True)])
+    # Половина — есть в снимке, половина — нет (отсекает фильтр Блума)
+    queries = [names[i % n] if i % 2 else f"missing-{i}" for i in range(2_000)]
+
+    def run():
+        for name in queries:
+            chain.is_real_package(name)
+    return run, len(queries)
+
+
+@case("chain_stub_network", sized=False)
+def bench_chain_network(n, ctx):
+    from pypi_probe import PyPIProbe
+    from validation import ProbeBackend
+
+    server = ctx.stub_server()
+    chain = _chain([ProbeBackend(PyPIProbe(index_url=server.url + "/simple/"))])
+    names = ctx.names(1_000)[:100] + [f"missing-{i}" for i in range(100)]
+
+    def run():
+        for name in names:
+            chain.is_real_package(name)
+    return run, len(names)
+
+
+@case("bot_move")
+def bench_bot_move(n, ctx):
+    from bot_pool import IndexedPool
+    from bot_strategy import BotStrategy
+
+    kb = ctx.knowledge_base(n)
+    strategies = [BotStrategy(kb, d, random.Random(SEED)) for d in ("easy", "hard", "random")]
+    moves = min(n, 3_000)
+
+    def run():
+        for strategy in strategies:
+            pool = IndexedPool(kb, kb.index_of)
+            for _ in range(moves):
+                strategy.choose(pool)
+    return run, moves * len(strategies)
+
+
+@case("fuzzy_suggest")
+def bench_fuzzy_suggest(n, ctx):
+    from fuzzy import FuzzyIndex
+    from validator import canonical_names
+
+    names = sorted(set(canonical_names(ctx.names(n))))
+    fuzzy = FuzzyIndex.build(names.__getitem__, len(names))
+    rng = random.Random(SEED)
+    # Опечатки в настоящих именах: перестановка соседних букв или пропуск
+    queries = []
+    for _ in range(1_000):
+        name = rng.choice(names)
+        i = rng.randrange(max(1, len(name) - 1))
+        queries.append(name[:i] + name[i + 1:i + 2] + name[i] + name[i + 2:] if rng.random() < 0.5
+                       else name[:i] + name[i + 1:])
+
+    def run():
+        for name in queries:
+            fuzzy.suggest(name)
+    return run, len(queries)
+
+
+@case("history_append")
+def bench_history_append(n, ctx):
+    import history_view
+
+    with stub_tk(history_view):
+        view = history_view.HistoryView(None, lambda player, name: name)
+    names = ctx.names(n)
+    for i, name in enumerate(names):
+        view.store.append(i % 2, name)
+    view.jump_to(len(names))
+    moves = 2_000
+
+    def run():
+        for i in range(moves):
+            view.append(i % 2, names[i % n])
+    return run, moves
+
+
+# === Макрозамер ===
+@case("selfplay_game")
+def bench_selfplay(n, ctx):
+    from bot_strategy import BotStrategy
+    from selfplay import play_game
+
+    kb = ctx.knowledge_base(n)
+    rng = random.Random(SEED)
+    strategies = [BotStrategy(kb, "easy", rng), BotStrategy(kb, "hard", rng)]
+    # Малые базы играем до конца, большие — до 5000 ходов за партию
+    max_moves = 0 if n <= 5_000 else 5_000
+    games = max(1, 20_000 // min(n, 5_000))
+    counted = {"moves": 0}
+
+    def run():
+        moves = 0
+        for _ in range(games):
+            engine, _ = play_game(kb, strategies, 1.0, rng, max_moves)
+            moves += len(engine.state.history) + 1
+        counted["moves"] = moves
+
+    # Ходов в партии заранее не знаем — один пробный прогон
+    run()
+    return run, counted["moves"]
+
+
+# === Прогон ===
+def time_once(run: Callable[[], None], ops: int) -> float:
+    # Один прогон, нс на операцию; сборщик мусора не вмешивается
+    gc.collect()
+    gc.disable()
+    try:
+        started = time.perf_counter()
+        run()
+        elapsed = time.perf_counter() - started
+    finally:
+        gc.enable()
+    return elapsed / ops * 1e9
+
+
+def summarize(timings: List[float], ops: int) -> Dict:
+    median = statistics.median(timings)
+    return {
+        "ns_per_op": round(median, 2), "min": round(min(timings), 2), "max": round(max(timings), 2),
+        "ops_per_s": round(1e9 / median, 1) if median else None, "ops": ops, "repeat": len(timings),
+    }
+
+
+def measure(run: Callable[[], None], ops: int, repeat: int) -> Dict:
+    return summarize([time_once(run, ops) for _ in range(repeat)], ops)
+
+
+def _calibration_loop():
+    total = 0
+    for i in range(CALIBRATION_LOOPS):
+        total += i & 7
+
+
+def calibrate(repeat: int = REPEAT) -> float:
+    # Эталон скорости машины: нс на шаг простого цикла на Python (лучший из повторов)
+    return measure(_calibration_loop, CALIBRATION_LOOPS, repeat)["min"]
+
+
+def _git_commit() -> Optional[str]:
+    try:
+        return subprocess.run(["git", "rev-parse", "--short", "HEAD"], capture_output=True, text=True,
+                              cwd=os.path.dirname(os.path.abspath(__file__)), timeout=5).stdout.strip() or None
+    except (OSError, subprocess.SubprocessError):
+        return None
+
+
+def run_suite(sizes=SIZES, repeat=REPEAT, name_filter: Optional[str] = None, progress=print) -> Dict:
+    results = {}
+    calibrations = []
+    with tempfile.TemporaryDirectory() as workdir:
+        ctx = Context(workdir)
+        try:
+            # Кейсы одного размера меряются вперемешку, повтор за повтором:
+            # если машина на несколько секунд замедлилась, это задевает по
+            # одному повтору многих кейсов, а не все повторы одного. В каждом
+            # повторе меряется и эталонный цикл — скорость машины именно в то
+            # время, когда мерялись эти кейсы
+            for n in (None,) + tuple(sizes):
+                prepared = []
+                for name, sized, setup in CASES:
+                    if sized == (n is None) or (name_filter and name_filter not in name):
+                        continue
+                    key = f"{name}[n={n}]" if sized else name
+                    try:
+                        run, ops = setup(n, ctx)
+                    except ImportError as e:
+                        results[key] = {"skipped": str(e)}
+                        progress(format_result(key, results[key]))
+                        continue
+                    prepared.append((key, run, ops))
+                if not prepared:
+                    continue
+                timings = {key: [] for key, _, _ in prepared}
+                reference = []
+                for _ in range(repeat):
+                    reference.append(time_once(_calibration_loop, CALIBRATION_LOOPS))
+                    for key, run, ops in prepared:
+                        timings[key].append(time_once(run, ops))
+                calibration = summarize(reference, CALIBRATION_LOOPS)
+                calibrations.append(calibration["min"])
+                for key, _, ops in prepared:
+                    results[key] = summarize(timings[key], ops)
+                    results[key]["calibration_ns"] = calibration["min"]
+                    # Как «гуляла» машина, пока мерялись кейсы этого размера
+                    results[key]["calibration_noise"] = round(_noise(calibration), 3)
+                    progress(format_result(key, results[key]))
+                del prepared
+        finally:
+            ctx.close()
+    calibration = min(calibrations) if calibrations else calibrate(repeat)
+    return {
+        "meta": {
+            "time": time.strftime("%Y-%m-%dT%H:%M:%S"), "commit": _git_commit(),
+            "python": platform.python_version(), "implementation": platform.python_implementation(),
+            "platform": platform.platform(), "machine": platform.machine(), "cpus": os.cpu_count(),
+            "sizes": list(sizes), "repeat": repeat, "seed": SEED, "calibration_ns": calibration,
+        },
+        "results": results,
+    }
+
+
+def format_result(key: str, result: Dict) -> str:
+    if "skipped" in result:
+        return f"{key:<32} пропущен: {result['skipped']}"
+    return (f"{key:<32} {format_ns(result['ns_per_op']):>10}/оп  "
+            f"(мин {format_ns(result['min'])}, макс {format_ns(result['max'])}, {result['ops_per_s']:>12,.0f} оп/с)")
+
+
+def format_ns(ns: float) -> str:
+    if ns >= 1e6:
+        return f"{ns / 1e6:.2f} мс"
+    if ns >= 1e3:
+        return f"{ns / 1e3:.2f} мкс"
+    return f"{ns:.0f} нс"
+
+
+def _best(result: Dict) -> float:
+    return result.get("min") or result["ns_per_op"]
+
+
+def _noise(result: Dict) -> float:
+    # Разброс повторов: насколько медиана хуже лучшего (и насколько в это
+    # время «гулял» эталонный цикл)
+    best = _best(result)
+    return max((result["ns_per_op"] - best) / best if best else 0.0, result.get("calibration_noise", 0.0))
+
+
+def speed_ratio(old: Dict, new: Dict) -> float:
+    # Во сколько раз машина медленнее, чем при базовом замере (1.0 — эталона нет);
+    # old и new — замеры кейса или meta прогонов целиком
+    old, new = old.get("calibration_ns"), new.get("calibration_ns")
+    return new / old if old and new else 1.0
+
+
+def compare(base: Dict, new: Dict, threshold: float = THRESHOLD) -> Tuple[List[str], List[str], List[str]]:
+    # (строки отчёта, ключи с регрессией, ключи с шумом выше допуска)
+    lines, regressions, noisy = [], [], []
+    cap = NOISE_CAP * threshold
+    base_results, new_results = base["results"], new["results"]
+    for key in sorted(set(base_results) | set(new_results)):
+        old, cur = base_results.get(key, {}), new_results.get(key, {})
+        if "ns_per_op" not in old or "ns_per_op" not in cur:
+            state = "новый" if "ns_per_op" in cur else "нет в новом прогоне"
+            lines.append(f"  {key:<32} {state}")
+            continue
+        speed = speed_ratio(old, cur) if "calibration_ns" in old else speed_ratio(base["meta"], new["meta"])
+        ratio = _best(cur) / speed / _best(old) if _best(old) else 1.0
+        # Порог не ниже шума самого кейса в любом из прогонов, но не выше cap:
+        # иначе шумный прогон молча пропускает любое замедление
+        noise = max(_noise(old), _noise(cur))
+        if noise > cap:
+            noisy.append(key)
+        limit = max(threshold, min(noise, cap))
+        mark = " "
+        if ratio > 1 + limit:
+            mark = "✗"
+            regressions.append(key)
+        elif ratio < 1 - limit:
+            mark = "✓"
+        lines.append(f"{mark} {key:<32} {format_ns(_best(old)):>10} → {format_ns(_best(cur)):>10}"
+                     f"  {(ratio - 1) * 100:+6.1f}%  (порог {limit:.0%}{', шум ' + format(noise, '.0%') if noise > cap else ''})")
+    return lines, regressions, noisy
+
+
+if __name__ == "__main__":
+    import argparse
+    import json
+
+    parser = argparse.ArgumentParser(description="Замеры горячих путей игры")
+    sub = parser.add_subparsers(dest="command", required=True)
+    run_cmd = sub.add_parser("run", help="прогнать замеры")
+    run_cmd.add_argument("--quick", action="store_true", help=f"размеры {QUICK_SIZES}, {QUICK_REPEAT} повтора")
+    run_cmd.add_argument("--sizes", type=int, nargs="+", default=None, help=f"размеры баз (по умолчанию {SIZES})")
+    run_cmd.add_argument("--repeat", type=int, default=None)
+    run_cmd.add_argument("--filter", default=None, help="только кейсы с этой подстрокой")
+    run_cmd.add_argument("--out", default=None, help="сохранить результаты в JSON")
+    run_cmd.add_argument("--compare", default=None, metavar="BASELINE", help="сразу сравнить с базовым прогоном")
+    run_cmd.add_argument("--threshold", type=float, default=THRESHOLD)
+    run_cmd.add_argument("--fail-on-noise", action="store_true", help="считать провалом шум выше допуска")
+    cmp_cmd = sub.add_parser("compare", help="сравнить два прогона")
+    cmp_cmd.add_argument("base")
+    cmp_cmd.add_argument("new")
+    cmp_cmd.add_argument("--threshold", type=float, default=THRESHOLD,
+                         help="доля замедления, которая считается регрессией")
+    cmp_cmd.add_argument("--fail-on-noise", action="store_true", help="считать провалом шум выше допуска")
+    args = parser.parse_args()
+
+    sys.path.insert(0, os.path.dirname(os.path.abspath(__file__)))
+    if args.command == "run":
+        sizes = tuple(args.sizes or (QUICK_SIZES if args.quick else SIZES))
+        repeat = args.repeat or (QUICK_REPEAT if args.quick else REPEAT)
+        report = run_suite(sizes, repeat, args.filter)
+        if args.out:
+            with open(args.out, "w", encoding="utf-8") as f:
+                json.dump(report, f, ensure_ascii=False, indent=1)
+            print(f"Сохранено: {args.out}")
+        if not args.compare:
+            raise SystemExit(0)
+        with open(args.compare, encoding="utf-8") as f:
+            base, new = json.load(f), report
+    else:
+        with open(args.base, encoding="utf-8") as f:
+            base = json.load(f)
+        with open(args.new, encoding="utf-8") as f:
+            new = json.load(f)
+
+    for side, report in (("база", base), ("новый", new)):
+        meta = report["meta"]
+        print(f"{side}: {meta['time']} {meta.get('commit') or ''} Python {meta['python']} {meta['platform']}")
+    if base["meta"].get("python") != new["meta"].get("python") or base["meta"].get("machine") != new["meta"].get("machine"):
+        print("⚠ прогоны сделаны в разном окружении — сравнение приблизительное")
+    speed = speed_ratio(base["meta"], new["meta"])
+    if abs(speed - 1) > 0.02:
+        print(f"Эталонный цикл: {(speed - 1) * 100:+.1f}% — времена нового прогона поправлены "
+              f"на скорость машины (по каждому размеру отдельно)")
+    cap = NOISE_CAP * args.threshold
+    print(f"Порог регрессии: {args.threshold:.0%}, с учётом шума повторов — не больше {cap:.0%}")
+    lines, regressions, noisy = compare(base, new, args.threshold)
+    print("\n".join(lines))
+    if noisy:
+        print(f"⚠ шум повторов выше допуска {cap:.0%} — результаты ненадёжны, "
+              f"повторите на спокойной машине: {', '.join(noisy)}")
+    if regressions:
+        print(f"Регрессии (> {args.threshold:.0%}–{cap:.0%} с учётом шума): {', '.join(regressions)}")
+    raise SystemExit(1 if regressions else 2 if noisy and args.fail_on_noise else 0)
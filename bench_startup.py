@@ -0,0 +1,152 @@
+# bench_startup.py
+# Холодный старт: сколько проходит от запуска интерпретатора до готового
+# меню и готовой к первому ходу партии.
+#
+# Каждый сценарий запускается в свежем процессе с -X importtime: время
+# «до готовности» считается от Popen до отметки, которую печатает дочерний
+# процесс, а по логу импорта видно, какие модули дороже всего. Заодно
+# проверяется, что тяжёлые зависимости (requests, asyncio, SSL) не
+# попадают в меню и офлайн-игру.
+#
+#   python bench_startup.py
+#   python bench_startup.py --runs 9 --budget-ms 200
+import argparse
+import os
+import re
+import statistics
+import subprocess
+import sys
+import time
+
+HERE = os.path.dirname(os.path.abspath(__file__))
+
+# Эти модули в меню и офлайн-партии должны импортироваться лениво
+HEAVY_MODULES = ("requests", "urllib3", "ssl", "asyncio", "charset_normalizer", "idna")
+
+# Код сценария выполняется в дочернем процессе; READY печатается, когда
+# экран готов к вводу. С дисплеем создаются настоящие окна Tk.
+_PRELUDE = """
+import os, sys, time
+sys.path.insert(0, {here!r})
+HAS_DISPLAY = bool(os.environ.get("DISPLAY")) or sys.platform in ("win32", "darwin")
+"""
+
+_READY = """
+print("READY", repr(time.time()), ",".join(m for m in {heavy!r} if m in sys.modules), flush=True)
+"""
+
+SCENARIOS = {
+    "menu": (
+        "Главное меню",
+        True,
+        """
+import main_menu
+if HAS_DISPLAY:
+    root = main_menu.tk.Tk()
+    app = main_menu.GameApp(root)
+    root.update()
+""",
+    ),
+    "local": (
+        "Меню → игра вдвоём (офлайн)",
+        True,
+        """
+import main_menu, local_game
+from validation import build_validation_chain
+settings = {"sound": False, "pypi_check": True, "offline_mode": True, "pypi_mirror": ""}
+build_validation_chain(settings)
+if HAS_DISPLAY:
+    root = main_menu.tk.Tk()
+    game = local_game.LocalGameApp(root, settings)
+    root.update()
+""",
+    ),
+    "bot": (
+        "Меню → игра с ботом",
+        False,
+        """
+import main_menu, bot_game
+from bot_knowledge import get_knowledge_base
+from bot_strategy import DEFAULT_DIFFICULTY, get_alias_table
+get_alias_table(get_knowledge_base(), DEFAULT_DIFFICULTY)
+""",
+    ),
+}
+
+_IMPORT_LINE = re.compile(r"^import time:\s+(\d+)\s+\|\s+(\d+)\s+\|( *)(\S+)")
+
+
+def run_scenario(code: str, data_dir: str):
+    # (мс до готовности, загруженные тяжёлые модули, {модуль: собственное время, мкс})
+    script = _PRELUDE.format(here=HERE) + code + _READY.format(heavy=HEAVY_MODULES)
+    env = dict(os.environ, PYDEVBATTLE_DATA_DIR=data_dir)
+    started = time.time()
+    proc = subprocess.run([sys.executable, "-X", "importtime", "-c", script],
+                          capture_output=True, text=True, env=env, cwd=HERE)
+    ready = None
+    heavy = []
+    for line in proc.stdout.splitlines():
+        if line.startswith("READY "):
+            _, stamp, loaded = (line.split(" ", 2) + [""])[:3]
+            ready = (float(stamp) - started) * 1000
+            heavy = [m for m in loaded.split(",") if m]
+    if proc.returncode != 0 or ready is None:
+        raise RuntimeError(proc.stderr.strip().splitlines()[-1] if proc.stderr.strip() else "нет отметки READY")
+
+    modules = {}
+    for line in proc.stderr.splitlines():
+        match = _IMPORT_LINE.match(line)
+        if match:
+            modules[match.group(4)] = modules.get(match.group(4), 0) + int(match.group(1))
+    return ready, heavy, modules
+
+
+def format_report(name, title, times, heavy, modules, top):
+    lines = [f"{title} [{name}]: медиана {statistics.median(times):.0f} мс "
+             f"(мин {min(times):.0f}, макс {max(times):.0f}, запусков {len(times)})"]
+    total = sum(modules.values()) / 1000
+    lines.append(f"  импорт: {total:.0f} мс суммарно, самые дорогие:")
+    for module, self_us in sorted(modules.items(), key=lambda item: -item[1])[:top]:
+        lines.append(f"    {self_us / 1000:7.1f} мс  {module}")
+    if heavy:
+        lines.append(f"  ⚠ загружены тяжёлые модули: {', '.join(heavy)}")
+    return "\n".join(lines)
+
+
+if __name__ == "__main__":
+    import tempfile
+
+    parser = argparse.ArgumentParser(description="Время холодного старта меню и игровых режимов")
+    parser.add_argument("scenarios", nargs="*", metavar="scenario",
+                        help=f"сценарии: {', '.join(SCENARIOS)} (по умолчанию — все)")
+    parser.add_argument("--runs", type=int, default=5, help="запусков на сценарий (отчёт по медиане)")
+    parser.add_argument("--budget-ms", type=float, default=200.0, help="бюджет на сценарий, мс")
+    parser.add_argument("--top", type=int, default=8, help="сколько модулей показать")
+    args = parser.parse_args()
+    unknown = set(args.scenarios) - set(SCENARIOS)
+    if unknown:
+        parser.error(f"неизвестные сценарии: {', '.join(sorted(unknown))}")
+
+    failed = []
+    with tempfile.TemporaryDirectory() as data_dir:
+        for name in args.scenarios or SCENARIOS:
+            title, light_only, code = SCENARIOS[name]
+            times = []
+            heavy = []
+            modules = {}
+            try:
+                for _ in range(args.runs):
+                    ready, heavy, modules = run_scenario(code, data_dir)
+                    times.append(ready)
+            except RuntimeError as e:
+                print(f"{title} [{name}]: ошибка — {e}")
+                failed.append(name)
+                continue
+            print(format_report(name, title, times, heavy, modules, args.top))
+            if statistics.median(times) > args.budget_ms:
+                print(f"  ✗ превышен бюджет {args.budget_ms:.0f} мс")
+                failed.append(name)
+            elif light_only and heavy:
+                failed.append(name)
+
+    sys.exit(1 if failed else 0)
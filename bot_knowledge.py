@@ -0,0 +1,197 @@
+# bot_knowledge.py
+# База знаний бота в упакованном файле: имена, популярность и категории.
+#
+# Формат файла (little-endian):
+#   заголовок   — MAGIC, версия формата, версия данных, число имён, число категорий
+#   категории   — (n_categories + 1) × uint32 смещений + UTF-8 имена категорий
+#   смещения    — (count + 1) × uint32, начало каждого имени в блоке имён
+#   популярность — count × uint32 (относительный вес)
+#   категория   — count × uint8 (номер категории)
+#   выравнивание до 4 байт, затем блок имён: отсортированные UTF-8 строки подряд
+#
+# Файл открывается через mmap один раз на процесс и делится между всеми
+# партиями против бота, поэтому размер базы не влияет ни на запуск, ни на
+# память отдельной партии.
+#
+#   python bot_knowledge.py build data/bot_knowledge.csv [out.bin]
+#   python bot_knowledge.py info [file.bin]
+import csv
+import mmap
+import os
+import struct
+import sys
+import threading
+from typing import Iterable, Optional, Tuple
+
+from pypi_cache import DATA_DIR
+from validator import canonical_name, name_keys
+
+MAGIC = b"PDBKB\x00\x00\x01"
+HEADER = struct.Struct("<8sIIII")  # magic, format, data_version, count, n_categories
+FORMAT_VERSION = 1
+
+BUNDLED_KB_PATH = os.path.join(os.path.dirname(os.path.abspath(__file__)), "data", "bot_knowledge.bin")
+USER_KB_PATH = os.path.join(DATA_DIR, "bot_knowledge.bin")
+
+
+class KnowledgeBase:
+    def __init__(self, path: str):
+        self.path = path
+        with open(path, "rb") as f:
+            self._mm = mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ)
+
+        magic, fmt, data_version, count, n_categories = HEADER.unpack_from(self._mm, 0)
+        if magic != MAGIC or fmt != FORMAT_VERSION:
+            self._mm.close()
+            raise ValueError(f"{path}: не является базой знаний бота формата {FORMAT_VERSION}")
+        self.data_version = data_version
+        self.count = count
+
+        view = memoryview(self._mm)
+        pos = HEADER.size
+        cat_offsets = view[pos:pos + 4 * (n_categories + 1)].cast("I")
+        pos += 4 * (n_categories + 1)
+        cat_blob = bytes(view[pos:pos + cat_offsets[-1]])
+        self.categories = [
+            cat_blob[cat_offsets[i]:cat_offsets[i + 1]].decode("utf-8") for i in range(n_categories)
+        ]
+        cat_offsets.release()
+        pos += len(cat_blob)
+        pos += -pos % 4
+
+        self._offsets = view[pos:pos + 4 * (count + 1)].cast("I")
+        pos += 4 * (count + 1)
+        self._popularity = view[pos:pos + 4 * count].cast("I")
+        pos += 4 * count
+        self._category = view[pos:pos + count]
+        pos += count
+        pos += -pos % 4
+        self._names = view[pos:]
+
+    def __len__(self):
+        return self.count
+
+    def __getitem__(self, i: int) -> str:
+        return self._names[self._offsets[i]:self._offsets[i + 1]].tobytes().decode("utf-8")
+
+    def __iter__(self):
+        for i in range(self.count):
+            yield self[i]
+
+    def index_of(self, name: str) -> Optional[int]:
+        # Бинарный поиск по отсортированным ключам; None — бот такого не знает
+        key = canonical_name(name).encode("utf-8")
+        offsets, names = self._offsets, self._names
+        lo, hi = 0, self.count
+        while lo < hi:
+            mid = (lo + hi) // 2
+            current = names[offsets[mid]:offsets[mid + 1]].tobytes()
+            if current < key:
+                lo = mid + 1
+            elif current > key:
+                hi = mid
+            else:
+                return mid
+        return None
+
+    def __contains__(self, name: str) -> bool:
+        return self.index_of(name) is not None
+
+    def popularity(self, i: int) -> int:
+        return self._popularity[i]
+
+    def category(self, i: int) -> str:
+        return self.categories[self._category[i]]
+
+    def category_id(self, i: int) -> int:
+        return self._category[i]
+
+
+# === Сборка файла ===
+def build_knowledge_base(entries: Iterable[Tuple[str, int, str]], path: str, data_version: int = 1) -> int:
+    # entries — (имя, популярность, категория). Имена хранятся каноническими
+    # ключами, повторы схлопываются, недопустимые для хода отбрасываются
+    entries = list(entries)
+    merged = {}
+    for key, (_, popularity, category) in zip(name_keys([e[0] for e in entries]), entries):
+        if key is not None and key not in merged:
+            merged[key] = (max(1, int(popularity)), category.strip())
+
+    categories = sorted({category for _, category in merged.values()})
+    if len(categories) > 255:
+        raise ValueError("не больше 255 категорий")
+    cat_ids = {c: i for i, c in enumerate(categories)}
+    keys = sorted(merged, key=lambda n: n.encode("utf-8"))
+    count = len(keys)
+
+    cat_blobs = [c.encode("utf-8") for c in categories]
+    cat_offsets = [0]
+    for blob in cat_blobs:
+        cat_offsets.append(cat_offsets[-1] + len(blob))
+
+    name_blobs = [k.encode("utf-8") for k in keys]
+    offsets = [0]
+    for blob in name_blobs:
+        offsets.append(offsets[-1] + len(blob))
+
+    def pad(f):
+        f.write(b"\x00" * (-f.tell() % 4))
+
+    os.makedirs(os.path.dirname(os.path.abspath(path)), exist_ok=True)
+    tmp_path = path + ".tmp"
+    with open(tmp_path, "wb") as f:
+        f.write(HEADER.pack(MAGIC, FORMAT_VERSION, data_version, count, len(categories)))
+        f.write(struct.pack(f"<{len(cat_offsets)}I", *cat_offsets))
+        f.write(b"".join(cat_blobs))
+        pad(f)
+        f.write(struct.pack(f"<{count + 1}I", *offsets))
+        f.write(struct.pack(f"<{count}I", *(merged[k][0] for k in keys)))
+        f.write(bytes(cat_ids[merged[k][1]] for k in keys))
+        pad(f)
+        f.write(b"".join(name_blobs))
+    os.replace(tmp_path, path)
+    return count
+
+
+def read_csv(path: str):
+    # Столбцы: name,popularity,category
+    with open(path, encoding="utf-8", newline="") as f:
+        for row in csv.DictReader(f):
+            yield row["name"], int(row["popularity"]), row["category"]
+
+
+# === Общие экземпляры на процесс ===
+_loaded = {}
+_loaded_lock = threading.Lock()
+
+
+def default_knowledge_path() -> str:
+    # Подменить базу без правки кода: переменная окружения или файл в DATA_DIR
+    path = os.environ.get("PYDEVBATTLE_BOT_KB")
+    if path:
+        return path
+    return USER_KB_PATH if os.path.exists(USER_KB_PATH) else BUNDLED_KB_PATH
+
+
+def get_knowledge_base(path: Optional[str] = None) -> KnowledgeBase:
+    path = os.path.abspath(path or default_knowledge_path())
+    kb = _loaded.get(path)
+    if kb is None:
+        with _loaded_lock:
+            kb = _loaded.get(path)
+            if kb is None:
+                kb = _loaded[path] = KnowledgeBase(path)
+    return kb
+
+
+if __name__ == "__main__":
+    command = sys.argv[1] if len(sys.argv) > 1 else "info"
+    if command == "build" and len(sys.argv) > 2:
+        out = sys.argv[3] if len(sys.argv) > 3 else BUNDLED_KB_PATH
+        total = build_knowledge_base(read_csv(sys.argv[2]), out)
+        print(f"Сохранено {total} имён → {out}")
+    elif command == "info":
+        kb = KnowledgeBase(sys.argv[2] if len(sys.argv) > 2 else default_knowledge_path())
+        print(f"{kb.path}: {len(kb)} имён, данные v{kb.data_version}, категории: {', '.join(kb.categories)}")
+    else:
+        sys.exit("Использование: python bot_knowledge.py [build CSV [OUT] | info [FILE]]")
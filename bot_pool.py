@@ -0,0 +1,159 @@
+# bot_pool.py
+# Имена, которые бот ещё может назвать.
+# Удаление названного имени и случайный выбор — за O(1) при любом размере базы:
+# «виртуальный» массив слотов, из которого удаляем обменом с последним
+# (swap-remove). Переставленные слоты хранятся в словаре, поэтому память
+# растёт с числом ходов, а не с размером базы знаний.
+#
+# Замер на большой базе:
+#   python bot_pool.py [число_имён]
+import random
+import sys
+import time
+from typing import Callable, Optional, Sequence
+
+# Сколько раз пробуем взвешенный выбор, прежде чем взять любое оставшееся имя
+WEIGHTED_ATTEMPTS = 32
+
+
+class AliasTable:
+    # Взвешенный выбор за O(1): таблица алиасов Уолкера (алгоритм Воуза)
+    def __init__(self, weights: Sequence[float]):
+        n = len(weights)
+        if n == 0:
+            raise ValueError("пустой набор весов")
+        total = float(sum(weights))
+        if total <= 0:
+            raise ValueError("сумма весов должна быть положительной")
+
+        scaled = [w * n / total for w in weights]
+        self.prob = [0.0] * n
+        self.alias = list(range(n))
+
+        small = [i for i, p in enumerate(scaled) if p < 1.0]
+        large = [i for i, p in enumerate(scaled) if p >= 1.0]
+        while small and large:
+            s, l = small.pop(), large.pop()
+            self.prob[s] = scaled[s]
+            self.alias[s] = l
+            scaled[l] -= 1.0 - scaled[s]
+            (small if scaled[l] < 1.0 else large).append(l)
+        for i in large + small:
+            self.prob[i] = 1.0
+
+    def __len__(self):
+        return len(self.prob)
+
+    def sample(self, rng=random) -> int:
+        i = int(rng.random() * len(self.prob))
+        return i if rng.random() < self.prob[i] else self.alias[i]
+
+
+class IndexedPool:
+    def __init__(self, items: Sequence[str], index_of: Optional[Callable[[str], Optional[int]]] = None):
+        # items — имена по номерам; index_of(name) → номер или None
+        self._items = items
+        self._size = len(items)
+        if index_of is None:
+            positions = {name: i for i, name in enumerate(items)}
+            index_of = positions.get
+        self._index_of = index_of
+        # Только отличающиеся от тождественного слоты: slot → id и id → slot
+        self._slot_to_id = {}
+        self._id_to_slot = {}
+
+    def __len__(self):
+        return self._size
+
+    def __bool__(self):
+        return self._size > 0
+
+    def _id_at(self, slot):
+        return self._slot_to_id.get(slot, slot)
+
+    def _slot_of(self, item_id):
+        return self._id_to_slot.get(item_id, item_id)
+
+    def _place(self, slot, item_id):
+        if slot == item_id:
+            self._slot_to_id.pop(slot, None)
+            self._id_to_slot.pop(item_id, None)
+        else:
+            self._slot_to_id[slot] = item_id
+            self._id_to_slot[item_id] = slot
+
+    def _remove_slot(self, slot):
+        last = self._size - 1
+        removed_id, last_id = self._id_at(slot), self._id_at(last)
+        self._place(slot, last_id)
+        self._place(last, removed_id)
+        self._size = last
+        return removed_id
+
+    def contains_id(self, item_id: int) -> bool:
+        return self._slot_of(item_id) < self._size
+
+    def __contains__(self, name: str) -> bool:
+        item_id = self._index_of(name)
+        return item_id is not None and self.contains_id(item_id)
+
+    def discard(self, name: str) -> bool:
+        # Имя назвали (бот или игрок) — больше его не предлагаем
+        item_id = self._index_of(name)
+        if item_id is None:
+            return False
+        slot = self._slot_of(item_id)
+        if slot >= self._size:
+            return False
+        self._remove_slot(slot)
+        return True
+
+    # === Выбор ===
+    def pick(self, rng=random) -> str:
+        return self._items[self._id_at(rng.randrange(self._size))]
+
+    def pop(self, rng=random) -> str:
+        return self._items[self._remove_slot(rng.randrange(self._size))]
+
+    def pick_weighted(self, table: AliasTable, rng=random) -> str:
+        # Таблица строится один раз на всю базу; уже названные имена
+        # отбрасываем и тянем снова — в среднем O(1), пока база не исчерпана
+        for _ in range(WEIGHTED_ATTEMPTS):
+            item_id = table.sample(rng)
+            if self.contains_id(item_id):
+                return self._items[item_id]
+        return self.pick(rng)
+
+    def pop_weighted(self, table: AliasTable, rng=random) -> str:
+        name = self.pick_weighted(table, rng)
+        self.discard(name)
+        return name
+
+
+if __name__ == "__main__":
+    n = int(sys.argv[1]) if len(sys.argv) > 1 else 600_000
+    moves = 10_000
+    names = [f"package-{i}" for i in range(n)]
+    rng = random.Random(42)
+
+    started = time.perf_counter()
+    pool = IndexedPool(names)
+    print(f"IndexedPool({n:,}): {time.perf_counter() - started:.3f} с")
+
+    started = time.perf_counter()
+    table = AliasTable([1.0 / (i + 1) for i in range(n)])  # закон Ципфа
+    print(f"AliasTable({n:,}): {time.perf_counter() - started:.3f} с")
+
+    started = time.perf_counter()
+    for _ in range(moves):
+        pool.discard(pool.pick(rng))   # ход игрока
+        pool.pop(rng)                  # ход бота
+    elapsed = time.perf_counter() - started
+    print(f"равномерный выбор: {elapsed / moves * 1e6:.2f} мкс/пара ходов")
+
+    started = time.perf_counter()
+    for _ in range(moves):
+        pool.pop_weighted(table, rng)
+    elapsed = time.perf_counter() - started
+    print(f"взвешенный выбор: {elapsed / moves * 1e6:.2f} мкс/ход")
+    print(f"переставлено слотов: {len(pool._slot_to_id):,} (осталось имён {len(pool):,})")
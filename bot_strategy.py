@@ -0,0 +1,110 @@
+# bot_strategy.py
+# Как бот выбирает следующий пакет.
+# Вес имени = популярность ** alpha × вес категории. Для каждого уровня
+# сложности строится таблица алиасов (один раз на процесс и базу знаний),
+# поэтому выбор хода стоит O(1) независимо от размера базы:
+#   alpha > 0 — лёгкий бот называет известные пакеты,
+#   alpha < 0 — сложный бот уходит в «длинный хвост».
+# close_call — как часто бот отвечает именем, которое на одну-две правки
+# отличается от только что названного (requests → requests2): кандидатов
+# даёт таблица опечаток по базе знаний (fuzzy.py), без перебора базы.
+import random
+import threading
+from typing import Optional
+
+from bot_pool import AliasTable, IndexedPool
+
+DIFFICULTIES = {
+    "easy": {
+        "title": "Лёгкий",
+        "alpha": 1.0,
+        "categories": {"core": 2.0, "web": 1.5, "data-ml": 1.5},
+        "close_call": 0.0,
+    },
+    "normal": {
+        "title": "Средний",
+        "alpha": 0.5,
+        "categories": {},
+        "close_call": 0.1,
+    },
+    "hard": {
+        "title": "Сложный",
+        "alpha": -0.5,
+        "categories": {"niche": 2.0, "fun": 1.5},
+        "close_call": 0.25,
+    },
+    "random": {
+        "title": "Случайный",
+        "alpha": 0.0,
+        "categories": {},
+        "close_call": 0.0,
+    },
+}
+DEFAULT_DIFFICULTY = "normal"
+
+_tables = {}
+_tables_lock = threading.Lock()
+
+
+def get_alias_table(kb, difficulty: str):
+    # Таблица на (файл базы, сложность); None — выбор и так равномерный
+    profile = DIFFICULTIES[difficulty]
+    if profile["alpha"] == 0 and not profile["categories"]:
+        return None
+    key = (getattr(kb, "path", id(kb)), difficulty)
+    table = _tables.get(key)
+    if table is None:
+        with _tables_lock:
+            table = _tables.get(key)
+            if table is None:
+                alpha = profile["alpha"]
+                cat_weights = [profile["categories"].get(c, 1.0) for c in kb.categories]
+                weights = [
+                    kb.popularity(i) ** alpha * cat_weights[kb.category_id(i)]
+                    for i in range(len(kb))
+                ]
+                table = _tables[key] = AliasTable(weights)
+    return table
+
+
+def prepare_tables(kb, difficulty: str):
+    # Всё, что бот строит при первом ходе, — заранее (меню делает это в фоне,
+    # чтобы окно партии не ждало сборки на большой базе)
+    if difficulty not in DIFFICULTIES:
+        difficulty = DEFAULT_DIFFICULTY
+    get_alias_table(kb, difficulty)
+    if DIFFICULTIES[difficulty].get("close_call", 0.0):
+        from fuzzy import get_knowledge_fuzzy
+
+        get_knowledge_fuzzy(kb)
+
+
+class BotStrategy:
+    def __init__(self, kb, difficulty: str = DEFAULT_DIFFICULTY, rng=None):
+        if difficulty not in DIFFICULTIES:
+            difficulty = DEFAULT_DIFFICULTY
+        self.difficulty = difficulty
+        self.rng = rng or random.Random()
+        self.kb = kb
+        self.table = get_alias_table(kb, difficulty)
+        self.close_call = DIFFICULTIES[difficulty].get("close_call", 0.0)
+
+    def choose(self, pool: IndexedPool, last: Optional[str] = None) -> str:
+        # Выбирает имя и сразу убирает его из пула; last — предыдущий ход
+        if last and self.close_call and self.rng.random() < self.close_call:
+            name = self.close_to(last, pool)
+            if name is not None:
+                return name
+        if self.table is None:
+            return pool.pop(self.rng)
+        return pool.pop_weighted(self.table, self.rng)
+
+    def close_to(self, last: str, pool: IndexedPool) -> Optional[str]:
+        from fuzzy import get_knowledge_fuzzy
+
+        # Таблица опечаток строится один раз на базу: заранее (prepare_tables)
+        # или при первом таком ходе
+        for name in get_knowledge_fuzzy(self.kb).suggest(last, weight=self.kb.popularity):
+            if pool.discard(name):
+                return name
+        return None
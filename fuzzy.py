@@ -0,0 +1,336 @@
+# fuzzy.py
+# «Может быть, вы имели в виду…»: поиск близких имён без перебора всего
+# каталога. Таблица удалений в духе SymSpell: для каждого имени храним
+# хеши его самого и всех вариантов без одной буквы. У запроса берём те же
+# варианты и ищем их хеши бинарным поиском, поэтому находится всё на
+# расстоянии 1 — замена, вставка, пропуск и перестановка соседних букв
+# (reqeusts → requests) — и часть имён на расстоянии 2. Кандидатов
+# единицы, их сверяет точное расстояние (Дамерау — Левенштейн, OSA).
+#
+# Формат файла (little-endian):
+#   заголовок — MAGIC, версия, число имён каталога, отпечаток каталога, число записей
+#   хеши      — entries × uint32 (crc32 варианта), по возрастанию
+#   номера    — entries × uint32, номер имени в каталоге для каждого хеша
+#
+# Имён в файле нет: номера указывают в каталог, по которому таблица
+# строилась (офлайн-снимок PyPI, pypi_index.py). Для базы знаний бота
+# таблица строится в памяти при первом обращении.
+#
+#   python fuzzy.py build                 # таблица для снимка PyPI (DATA_DIR)
+#   python fuzzy.py suggest reqeusts djnago
+#   python fuzzy.py bench --names 600000
+import bisect
+import mmap
+import os
+import struct
+import sys
+import threading
+import zlib
+from array import array
+from typing import Callable, List, Optional, Sequence, Tuple
+
+from pypi_cache import DATA_DIR
+from validator import canonical_name
+
+MAGIC = b"PDBFZY\x00\x01"
+HEADER = struct.Struct("<8sIIII")  # magic, version, count, fingerprint, entries
+VERSION = 1
+
+DEFAULT_FUZZY_PATH = os.path.join(DATA_DIR, "pypi_fuzzy.bin")
+MAX_DISTANCE = 2
+SUGGESTIONS = 3
+# Таблица сортируется по корзинам старших бит хеша: пиковая память —
+# одна корзина списком Python, а не все записи сразу
+SORT_BUCKET_BITS = 8
+
+
+def _variants(key: str) -> set:
+    # Само имя и все варианты без одной буквы
+    variants = {key[:i] + key[i + 1:] for i in range(len(key))}
+    variants.add(key)
+    variants.discard("")
+    return variants
+
+
+def _hash(variant: str) -> int:
+    return zlib.crc32(variant.encode("utf-8"))
+
+
+def osa_distance(a: str, b: str, limit: int = MAX_DISTANCE) -> int:
+    # Расстояние Дамерау — Левенштейна (перестановка соседних букв — одна
+    # правка); больше limit не считаем — возвращаем limit + 1
+    if a == b:
+        return 0
+    if abs(len(a) - len(b)) > limit:
+        return limit + 1
+    previous2 = None
+    previous = list(range(len(b) + 1))
+    for i in range(1, len(a) + 1):
+        current = [i] + [0] * len(b)
+        ca = a[i - 1]
+        for j in range(1, len(b) + 1):
+            cb = b[j - 1]
+            cost = 0 if ca == cb else 1
+            value = min(previous[j] + 1, current[j - 1] + 1, previous[j - 1] + cost)
+            if previous2 is not None and j > 1 and ca == b[j - 2] and a[i - 2] == cb:
+                value = min(value, previous2[j - 2] + 1)
+            current[j] = value
+        if min(current) > limit:
+            return limit + 1
+        previous2, previous = previous, current
+    return min(previous[-1], limit + 1)
+
+
+def fingerprint(name_at: Callable[[int], str], count: int) -> int:
+    # Таблица годится только для того каталога, по которому строилась
+    probe = [str(count)] + [name_at(i) for i in sorted({0, count // 2, count - 1}) if count]
+    return zlib.crc32("\n".join(probe).encode("utf-8"))
+
+
+class FuzzyIndex:
+    def __init__(self, name_at: Callable[[int], str], count: int, hashes: Sequence[int], ids: Sequence[int]):
+        # name_at(i) — имя каталога по номеру (PyPIIndex.name_at, KnowledgeBase.__getitem__)
+        self.name_at = name_at
+        self.count = count
+        self._hashes = hashes
+        self._ids = ids
+        self._mm = None
+
+    @classmethod
+    def build(cls, name_at: Callable[[int], str], count: int) -> "FuzzyIndex":
+        hashes, ids = build_table(name_at, count)
+        return cls(name_at, count, hashes, ids)
+
+    @classmethod
+    def load(cls, path: str, name_at: Callable[[int], str], count: int) -> "FuzzyIndex":
+        with open(path, "rb") as f:
+            mm = mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ)
+        magic, version, stored_count, stored_print, entries = HEADER.unpack_from(mm, 0)
+        if magic != MAGIC or version != VERSION:
+            mm.close()
+            raise ValueError(f"{path}: не является таблицей опечаток версии {VERSION}")
+        if stored_count != count or stored_print != fingerprint(name_at, count):
+            mm.close()
+            raise ValueError(f"{path}: таблица построена для другого каталога")
+        view = memoryview(mm)
+        start = HEADER.size
+        index = cls(name_at, count, view[start:start + 4 * entries].cast("I"),
+                    view[start + 4 * entries:start + 8 * entries].cast("I"))
+        index._mm = mm
+        return index
+
+    def __len__(self):
+        return len(self._hashes)
+
+    def candidates(self, name: str, max_distance: int = MAX_DISTANCE) -> List[Tuple[int, int]]:
+        # (расстояние, номер имени) по возрастанию расстояния; само имя не входит
+        key = canonical_name(name.strip())
+        hashes, ids = self._hashes, self._ids
+        total = len(hashes)
+        found = set()
+        for variant in _variants(key):
+            h = _hash(variant)
+            i = bisect.bisect_left(hashes, h)
+            while i < total and hashes[i] == h:
+                found.add(ids[i])
+                i += 1
+        result = []
+        for item_id in found:
+            distance = osa_distance(key, self.name_at(item_id), max_distance)
+            if 0 < distance <= max_distance:
+                result.append((distance, item_id))
+        result.sort()
+        return result
+
+    def suggest(self, name: str, limit: int = SUGGESTIONS, max_distance: int = MAX_DISTANCE,
+                weight: Optional[Callable[[int], float]] = None) -> List[str]:
+        # Ближайшие имена; при равном расстоянии — более «весомые» (популярность)
+        found = self.candidates(name, max_distance)
+        if weight is not None:
+            found.sort(key=lambda item: (item[0], -weight(item[1])))
+        return [self.name_at(item_id) for _, item_id in found[:limit]]
+
+    def save(self, path: str):
+        write_table(path, self.count, fingerprint(self.name_at, self.count), self._hashes, self._ids)
+
+    def close(self):
+        if self._mm is not None:
+            self._hashes.release()
+            self._ids.release()
+            self._mm.close()
+            self._mm = None
+
+
+# === Сборка таблицы ===
+def build_table(name_at: Callable[[int], str], count: int) -> Tuple[array, array]:
+    # Записи (хеш << 32 | номер) раскладываются по корзинам старших бит
+    # хеша, каждая корзина сортируется отдельно
+    shift = 64 - SORT_BUCKET_BITS
+    buckets = [array("Q") for _ in range(1 << SORT_BUCKET_BITS)]
+    for item_id in range(count):
+        for variant in _variants(canonical_name(name_at(item_id))):
+            entry = _hash(variant) << 32 | item_id
+            buckets[entry >> shift].append(entry)
+
+    hashes, ids = array("I"), array("I")
+    for i, bucket in enumerate(buckets):
+        ordered = sorted(bucket)
+        buckets[i] = None
+        hashes.extend(entry >> 32 for entry in ordered)
+        ids.extend(entry & 0xFFFFFFFF for entry in ordered)
+    return hashes, ids
+
+
+def write_table(path: str, count: int, catalog_print: int, hashes: Sequence[int], ids: Sequence[int]):
+    os.makedirs(os.path.dirname(os.path.abspath(path)), exist_ok=True)
+    tmp_path = path + ".tmp"
+    with open(tmp_path, "wb") as f:
+        f.write(HEADER.pack(MAGIC, VERSION, count, catalog_print, len(hashes)))
+        f.write(memoryview(hashes).cast("B") if isinstance(hashes, memoryview) else array("I", hashes).tobytes())
+        f.write(memoryview(ids).cast("B") if isinstance(ids, memoryview) else array("I", ids).tobytes())
+    os.replace(tmp_path, path)
+
+
+def build_index_table(index, path: str = DEFAULT_FUZZY_PATH) -> int:
+    # Таблица для офлайн-снимка PyPI; число записей
+    fuzzy = FuzzyIndex.build(index.name_at, len(index))
+    fuzzy.save(path)
+    return len(fuzzy)
+
+
+# === Общие экземпляры на процесс ===
+_knowledge = {}
+_shared_fuzzy = None
+_shared_loaded = False
+_shared_lock = threading.Lock()
+
+
+def get_knowledge_fuzzy(kb) -> FuzzyIndex:
+    # Таблица по базе знаний бота: строится в памяти один раз на файл базы
+    key = getattr(kb, "path", id(kb))
+    fuzzy = _knowledge.get(key)
+    if fuzzy is None:
+        with _shared_lock:
+            fuzzy = _knowledge.get(key)
+            if fuzzy is None:
+                fuzzy = _knowledge[key] = FuzzyIndex.build(kb.__getitem__, len(kb))
+    return fuzzy
+
+
+def get_shared_fuzzy() -> Optional[FuzzyIndex]:
+    # Снимок PyPI с готовой таблицей (python fuzzy.py build), иначе — база бота
+    global _shared_fuzzy, _shared_loaded
+    if not _shared_loaded:
+        from pypi_index import get_shared_index
+
+        index = get_shared_index()
+        fuzzy = None
+        if index is not None and os.path.exists(DEFAULT_FUZZY_PATH):
+            try:
+                fuzzy = FuzzyIndex.load(DEFAULT_FUZZY_PATH, index.name_at, len(index))
+            except (OSError, ValueError):
+                fuzzy = None
+        if fuzzy is None:
+            from bot_knowledge import get_knowledge_base
+
+            try:
+                fuzzy = get_knowledge_fuzzy(get_knowledge_base())
+            except (OSError, ValueError):
+                fuzzy = None
+        with _shared_lock:
+            if not _shared_loaded:
+                _shared_fuzzy, _shared_loaded = fuzzy, True
+    return _shared_fuzzy
+
+
+def suggest_names(name: str, limit: int = SUGGESTIONS) -> List[str]:
+    fuzzy = get_shared_fuzzy()
+    return fuzzy.suggest(name, limit) if fuzzy is not None else []
+
+
+def _bench(count: int, queries: int, seed: int):
+    import random
+    import tempfile
+    import time
+
+    sys.path.insert(0, os.path.dirname(os.path.abspath(__file__)))
+    from bench import make_names
+
+    names = sorted({canonical_name(n) for n in make_names(count, seed)})
+    rng = random.Random(seed)
+    started = time.perf_counter()
+    fuzzy = FuzzyIndex.build(names.__getitem__, len(names))
+    built = time.perf_counter() - started
+
+    with tempfile.TemporaryDirectory() as tmp:
+        path = os.path.join(tmp, "fuzzy.bin")
+        fuzzy.save(path)
+        size = os.path.getsize(path)
+        loaded = FuzzyIndex.load(path, names.__getitem__, len(names))
+
+        typos = []
+        for _ in range(queries):
+            word = rng.choice(names)
+            i = rng.randrange(len(word))
+            edit = rng.choice(("swap", "drop", "add", "change"))
+            if edit == "swap" and i + 1 < len(word):
+                word = word[:i] + word[i + 1] + word[i] + word[i + 2:]
+            elif edit == "drop" and len(word) > 1:
+                word = word[:i] + word[i + 1:]
+            elif edit == "add":
+                word = word[:i] + rng.choice("abcdefghijklmnopqrstuvwxyz") + word[i:]
+            else:
+                word = word[:i] + rng.choice("abcdefghijklmnopqrstuvwxyz") + word[i + 1:]
+            typos.append(word)
+
+        timings = []
+        hits = 0
+        for word in typos:
+            started = time.perf_counter()
+            found = loaded.suggest(word)
+            timings.append(time.perf_counter() - started)
+            hits += bool(found)
+        loaded.close()
+    timings.sort()
+    return {"names": len(names), "entries": len(fuzzy), "build_s": built, "bytes": size, "queries": queries,
+            "hits": hits, "p50_ms": timings[len(timings) // 2] * 1000,
+            "p99_ms": timings[int(len(timings) * 0.99)] * 1000, "max_ms": timings[-1] * 1000}
+
+
+if __name__ == "__main__":
+    import argparse
+
+    parser = argparse.ArgumentParser(description="Поиск близких имён пакетов")
+    sub = parser.add_subparsers(dest="command", required=True)
+    build_cmd = sub.add_parser("build", help="построить таблицу для офлайн-снимка PyPI")
+    build_cmd.add_argument("--out", default=DEFAULT_FUZZY_PATH)
+    suggest_cmd = sub.add_parser("suggest", help="подсказки для имён")
+    suggest_cmd.add_argument("names", nargs="+")
+    suggest_cmd.add_argument("--limit", type=int, default=SUGGESTIONS)
+    bench_cmd = sub.add_parser("bench", help="синтетический каталог: сборка и время запроса")
+    bench_cmd.add_argument("--names", type=int, default=600_000)
+    bench_cmd.add_argument("--queries", type=int, default=2_000)
+    bench_cmd.add_argument("--seed", type=int, default=1234)
+    args = parser.parse_args()
+
+    if args.command == "build":
+        from pypi_index import get_shared_index
+
+        index = get_shared_index()
+        if index is None:
+            sys.exit("Снимок не найден: выполните `python pypi_index.py fetch`")
+        entries = build_index_table(index, args.out)
+        print(f"{len(index):,} имён, {entries:,} записей → {args.out} ({os.path.getsize(args.out) / 1e6:.1f} МБ)")
+    elif args.command == "suggest":
+        fuzzy = get_shared_fuzzy()
+        if fuzzy is None:
+            sys.exit("Нет ни снимка PyPI, ни базы знаний бота")
+        for name in args.names:
+            found = fuzzy.suggest(name, args.limit)
+            print(f"{name}: {', '.join(found) if found else '—'}")
+    else:
+        r = _bench(args.names, args.queries, args.seed)
+        print(f"каталог: {r['names']:,} имён, {r['entries']:,} записей, {r['bytes'] / 1e6:.1f} МБ, "
+              f"сборка {r['build_s']:.1f} с")
+        print(f"запросы с опечаткой: {r['queries']:,}, с подсказкой {r['hits'] / r['queries']:.1%}; "
+              f"p50 {r['p50_ms']:.3f} мс, p99 {r['p99_ms']:.3f} мс, макс {r['max_ms']:.3f} мс")
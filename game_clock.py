@@ -0,0 +1,144 @@
+# game_clock.py
+# Часы партии без отдельного потока на каждый ход.
+# Время считается от дедлайна по time.monotonic(), а не суммой sleep(1),
+# поэтому не дрейфует; перерисовка идёт через root.after с шагом tick_ms,
+# а тайм-аут срабатывает ровно в момент дедлайна.
+import math
+import time
+from typing import Callable, List, Optional
+
+from metrics import get_shared_metrics
+
+TICK_MS = 100
+
+
+class GameClock:
+    def __init__(self, root, turn_time: float, players: int = 2, bank: float = 0.0,
+                 tick_ms: int = TICK_MS,
+                 on_tick: Optional[Callable[[float], None]] = None,
+                 on_timeout: Optional[Callable[[int], None]] = None):
+        self.root = root
+        self.turn_time = turn_time
+        self.tick_ms = tick_ms
+        self.on_tick = on_tick
+        self.on_timeout = on_timeout
+
+        # Запас времени каждого игрока: тратится, когда вышло время хода
+        self.banks: List[float] = [bank] * players
+        self.player = 0
+
+        self._deadline = 0.0      # конец основного времени хода
+        self._bank_at_start = 0.0
+        self._paused_left = None  # остаток на момент паузы
+        self._running = False
+        self._after_id = None
+        self._next_tick_at = 0.0
+
+        # Статистика опоздания тиков (для замеров джиттера)
+        self.ticks = 0
+        self.jitter_max = 0.0
+        self.jitter_total = 0.0
+        self._jitter_ms = get_shared_metrics().histogram("clock_jitter_ms")
+
+    # === Управление ===
+    def start_turn(self, player: int, time_left: Optional[float] = None):
+        # Прошлый ход (если он ещё не закрыт) сначала списываем с банка.
+        # time_left — остаток, известный извне (онлайн-режим: время считает сервер)
+        self.stop()
+        self.player = player
+        self._deadline = time.monotonic() + (self.turn_time if time_left is None else time_left)
+        self._bank_at_start = self.banks[player]
+        self._paused_left = None
+        self._running = True
+        self._tick()
+
+    def pause(self):
+        # Например, пока проверяется ход: время игрока не идёт
+        if not self._running:
+            return
+        self._paused_left = self.remaining()
+        self._running = False
+        self._cancel()
+
+    def resume(self):
+        if self._paused_left is None:
+            return
+        left, self._paused_left = self._paused_left, None
+        self._set_remaining(left)
+        self._running = True
+        self._tick()
+
+    def stop(self):
+        # Конец хода: списываем из банка то, что игрок потратил сверх времени хода
+        if self._running or self._paused_left is not None:
+            self.banks[self.player] = min(self._bank_at_start, self.remaining())
+        self._running = False
+        self._paused_left = None
+        self._cancel()
+
+    @property
+    def running(self) -> bool:
+        return self._running
+
+    # === Время ===
+    def remaining(self) -> float:
+        # Остаток хода вместе с банком, в секундах
+        if self._paused_left is not None:
+            return self._paused_left
+        if not self._running:
+            return 0.0
+        return max(0.0, self._deadline + self._bank_at_start - time.monotonic())
+
+    def deadline(self) -> float:
+        # Момент time.monotonic(), к которому ход должен быть сделан
+        return time.monotonic() + self.remaining()
+
+    def _set_remaining(self, left):
+        self._deadline = time.monotonic() + left - self._bank_at_start
+
+    # === Планирование ===
+    def _cancel(self):
+        self._next_tick_at = 0.0
+        if self._after_id is not None:
+            try:
+                self.root.after_cancel(self._after_id)
+            except Exception:
+                pass
+            self._after_id = None
+
+    def _tick(self):
+        self._after_id = None
+        if not self._running:
+            return
+
+        now = time.monotonic()
+        if self._next_tick_at:
+            late = max(0.0, now - self._next_tick_at)
+            self.ticks += 1
+            self.jitter_total += late
+            self.jitter_max = max(self.jitter_max, late)
+            self._jitter_ms.observe(late * 1000)
+
+        left = self.remaining()
+        if left <= 0:
+            self._running = False
+            self._next_tick_at = 0.0
+            self.banks[self.player] = 0.0
+            if self.on_tick:
+                self.on_tick(0.0)
+            if self.on_timeout:
+                self.on_timeout(self.player)
+            return
+
+        if self.on_tick:
+            self.on_tick(left)
+
+        # Следующий тик — на границе шага, но не позже дедлайна
+        step = self.tick_ms / 1000
+        delay = min(left, step - (self.turn_time + self._bank_at_start - left) % step or step)
+        self._next_tick_at = now + delay
+        self._after_id = self.root.after(max(1, math.ceil(delay * 1000)), self._tick)
+
+    @property
+    def jitter_avg(self) -> float:
+        return self.jitter_total / self.ticks if self.ticks else 0.0
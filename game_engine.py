@@ -0,0 +1,135 @@
+# game_engine.py
+# Правила игры без Tk: очередь ходов, счёт, названные библиотеки, итог.
+# Экраны (локальный, против бота, онлайн), симулятор и сервер работают
+# поверх одного и того же GameEngine. Проверка «есть ли пакет на PyPI»
+# сюда не входит: движок получает её результат готовым (exists=...).
+# Журнал (journal.py) подключается через recorder: движок сообщает ему
+# о каждом ходе и итоге, а повтор тех же вызовов восстанавливает партию.
+# Названные имена хранятся по каноническому ключу (validator.py):
+# Django_REST после django-rest — повтор.
+from typing import List, Optional, Sequence, Tuple
+
+from validator import name_key, normalize_name
+
+# Причины, по которым ход не принят или партия закончилась
+INVALID_NAME = "invalid"
+ALREADY_USED = "used"
+NOT_FOUND = "not_found"
+TIMEOUT = "timeout"
+GAVE_UP = "gave_up"
+TRUNCATED = "truncated"   # партию оборвали снаружи (лимит ходов в самоигре): без проигравшего
+
+class MoveResult:
+    def __init__(self, player: int, name: str, accepted: bool, reason: Optional[str] = None):
+        self.player = player
+        self.name = name
+        self.accepted = accepted
+        self.reason = reason
+
+    def __repr__(self):
+        status = "ok" if self.accepted else self.reason
+        return f"MoveResult(player={self.player}, name={self.name!r}, {status})"
+
+
+class GameResult:
+    def __init__(self, scores: Tuple[int, ...], loser: Optional[int], reason: Optional[str], moves: int):
+        self.scores = scores
+        self.loser = loser
+        self.reason = reason
+        self.moves = moves
+        # Побеждает тот, кто сделал больше ходов; None — ничья (и оборванная партия)
+        best = max(scores)
+        leaders = [i for i, s in enumerate(scores) if s == best]
+        self.winner = leaders[0] if len(leaders) == 1 and reason != TRUNCATED else None
+
+    def __repr__(self):
+        return f"GameResult(winner={self.winner}, scores={self.scores}, reason={self.reason})"
+
+
+class GameState:
+    def __init__(self, players: Sequence[str]):
+        self.players = list(players)
+        self.current_turn = 0
+        self.used_libs = set()  # канонические ключи
+        self.scores = [0] * len(self.players)
+        self.history: List[Tuple[int, str]] = []  # (игрок, имя) принятых ходов
+        self.finished = False
+        self.loser: Optional[int] = None
+        self.reason: Optional[str] = None
+
+    @property
+    def current_player(self) -> str:
+        return self.players[self.current_turn]
+
+
+class GameEngine:
+    def __init__(self, players: Sequence[str] = ("Игрок 1", "Игрок 2"), recorder=None):
+        self.state = GameState(players)
+        self.recorder = recorder
+        if recorder is not None:
+            recorder.start(self.state.players)
+
+    # === Ходы ===
+    def check_move(self, name: str) -> Optional[str]:
+        # Локальные проверки без изменения состояния; None — ход допустим
+        return self._check_key(name_key(name))
+
+    def _check_key(self, key: Optional[str]) -> Optional[str]:
+        if key is None:
+            return INVALID_NAME
+        if key in self.state.used_libs:
+            return ALREADY_USED
+        return None
+
+    def submit_move(self, name: str, exists: bool = True) -> MoveResult:
+        # exists — ответ проверки PyPI; ошибочный ход заканчивает партию
+        state = self.state
+        if state.finished:
+            raise RuntimeError("партия уже окончена")
+
+        name = normalize_name(name)
+        key = name_key(name)
+        player = state.current_turn
+        reason = self._check_key(key)
+        if reason is None and not exists:
+            reason = NOT_FOUND
+        if self.recorder is not None:
+            self.recorder.move(player, name, exists, reason)
+        if reason is not None:
+            self._finish(player, reason)
+            return MoveResult(player, name, False, reason)
+
+        state.used_libs.add(key)
+        state.scores[player] += 1
+        state.history.append((player, name))
+        self.advance_turn()
+        return MoveResult(player, name, True)
+
+    def advance_turn(self):
+        self.state.current_turn = (self.state.current_turn + 1) % len(self.state.players)
+
+    # === Конец партии ===
+    def timeout(self) -> GameResult:
+        self._finish(self.state.current_turn, TIMEOUT)
+        return self.result()
+
+    def give_up(self, player: Optional[int] = None) -> GameResult:
+        self._finish(self.state.current_turn if player is None else player, GAVE_UP)
+        return self.result()
+
+    def finish(self, loser: Optional[int], reason: str) -> GameResult:
+        # Итог, решённый снаружи (онлайн-режим: решает сервер)
+        self._finish(loser, reason)
+        return self.result()
+
+    def _finish(self, loser, reason):
+        if not self.state.finished:
+            self.state.finished = True
+            self.state.loser = loser
+            self.state.reason = reason
+            if self.recorder is not None:
+                self.recorder.end(loser, reason, self.state.scores)
+
+    def result(self) -> GameResult:
+        state = self.state
+        return GameResult(tuple(state.scores), state.loser, state.reason, len(state.history))
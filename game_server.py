@@ -0,0 +1,414 @@
+# game_server.py
+# Сервер онлайн-режима: один asyncio-цикл, тысячи комнат по коду.
+# Правила — тот же GameEngine, что и в окне; время хода и проверку пакета
+# ведёт сервер (клиенту нельзя верить ни в том, ни в другом).
+#   • таймер хода — loop.call_at на дедлайн, без потока и задачи на комнату;
+#   • проверка существования — общая для всех комнат цепочка источников
+#     в пуле потоков ValidationEngine (одинаковые имена склеиваются);
+#   • медленный клиент не держит сервер: если его буфер отправки переполнен,
+#     соединение закрывается.
+#
+#   python game_server.py [--port 8765] [--turn-time 10] [--pypi-url URL | --no-check]
+import argparse
+import asyncio
+import random
+import time
+from typing import Dict, List, Optional
+
+from game_engine import GameEngine
+from journal import Journal, default_journal_path
+from online_protocol import (
+    ALREADY_IN_ROOM, BAD_REQUEST, DEFAULT_HOST, DEFAULT_PORT, MAX_LINE, MAX_NAME_LEN,
+    MAX_PLAYER_NAME_LEN, NOT_IN_GAME, NOT_YOUR_TURN, ROOM_FULL, ROOM_NOT_FOUND, SERVER_FULL,
+    decode, encode,
+)
+from validation import build_validation_chain
+from validation_engine import ValidationEngine
+from validator import normalize_name
+
+TURN_TIME = 10.0
+MAX_ROOMS = 50_000
+PLAYERS_PER_ROOM = 2
+# Код комнаты: без похожих символов (0/O, 1/I)
+CODE_ALPHABET = "ABCDEFGHJKLMNPQRSTUVWXYZ23456789"
+CODE_LENGTH = 5
+# Сколько байт может ждать отправки одному клиенту
+MAX_WRITE_BUFFER = 256 * 1024
+VALIDATION_WORKERS = 16
+VALIDATION_PENDING = 256
+# Общий для всех комнат кэш проверок и лимит запросов к PyPI / зеркалу:
+# нагрузка на индекс растёт с числом разных имён, а не игроков
+SERVER_CACHE_SIZE = 200_000
+UPSTREAM_RATE = 20.0
+UPSTREAM_BURST = 40
+
+ERROR_MESSAGES = {
+    BAD_REQUEST: "Некорректный запрос",
+    ROOM_NOT_FOUND: "Комната с таким кодом не найдена",
+    ROOM_FULL: "В комнате уже два игрока",
+    SERVER_FULL: "Сервер переполнен, попробуйте позже",
+    NOT_YOUR_TURN: "Сейчас не ваш ход",
+    NOT_IN_GAME: "Вы не в партии",
+    ALREADY_IN_ROOM: "Вы уже в комнате",
+}
+
+
+class Connection:
+    __slots__ = ("writer", "name", "room", "player")
+
+    def __init__(self, writer):
+        self.writer = writer
+        self.name = ""
+        self.room: Optional["Room"] = None
+        self.player = -1
+
+    def send(self, message: dict):
+        transport = self.writer.transport
+        if transport.is_closing():
+            return
+        if transport.get_write_buffer_size() > MAX_WRITE_BUFFER:
+            # Клиент не читает — не копим для него память
+            transport.abort()
+            return
+        self.writer.write(encode(message))
+
+
+class Room:
+    def __init__(self, code: str, turn_time: float):
+        self.code = code
+        self.turn_time = turn_time
+        self.connections: List[Connection] = []
+        self.engine: Optional[GameEngine] = None
+        self.timer: Optional[asyncio.TimerHandle] = None
+        self.deadline = 0.0       # loop.time() конца текущего хода
+        self.validating = False   # ход отправлен и проверяется — часы стоят
+        self.closed = False
+
+    @property
+    def started(self) -> bool:
+        return self.engine is not None
+
+    def broadcast(self, message: dict):
+        for conn in self.connections:
+            conn.send(message)
+
+    def cancel_timer(self):
+        if self.timer is not None:
+            self.timer.cancel()
+            self.timer = None
+
+
+class GameServer:
+    def __init__(self, host: str = DEFAULT_HOST, port: int = DEFAULT_PORT, settings: Optional[Dict] = None,
+                 turn_time: float = TURN_TIME, max_rooms: int = MAX_ROOMS,
+                 validation_engine: Optional[ValidationEngine] = None, journal: Optional[Journal] = None):
+        self.host = host
+        self.port = port
+        self.turn_time = turn_time
+        self.max_rooms = max_rooms
+        # Одна цепочка на сервер: одновременные проверки одного имени из разных
+        # комнат склеиваются в один запрос, ответы живут в общем LRU-кэше
+        self.chain = build_validation_chain(dict({
+            "memory_cache_size": SERVER_CACHE_SIZE,
+            "upstream_rate": UPSTREAM_RATE,
+            "upstream_burst": UPSTREAM_BURST,
+        }, **(settings or {})))
+        self.validation_engine = validation_engine or ValidationEngine(VALIDATION_WORKERS, VALIDATION_PENDING)
+        # Журнал партий для разбора споров; пишет фоновый поток, цикл не ждёт диска
+        self.journal = journal
+
+        self.rooms: Dict[str, Room] = {}
+        self.connections = set()
+        self.stats = {
+            "connections": 0, "rooms": 0, "games": 0, "finished": 0,
+            "moves": 0, "rejected": 0, "timeouts": 0, "errors": 0,
+        }
+        self._server = None
+        self._handlers = {
+            "create": self._on_create,
+            "join": self._on_join,
+            "typing": self._on_typing,
+            "move": self._on_move,
+            "leave": self._on_leave,
+            "ping": self._on_ping,
+        }
+
+    # === Жизненный цикл ===
+    async def start(self):
+        self._server = await asyncio.start_server(self._handle, self.host, self.port, limit=MAX_LINE)
+        # port=0 — взять свободный (тесты, нагрузка)
+        self.port = self._server.sockets[0].getsockname()[1]
+
+    async def serve_forever(self):
+        if self._server is None:
+            await self.start()
+        async with self._server:
+            await self._server.serve_forever()
+
+    async def close(self):
+        for room in list(self.rooms.values()):
+            self._close_room(room)
+        if self._server is not None:
+            self._server.close()
+            await self._server.wait_closed()
+        for conn in list(self.connections):
+            conn.writer.close()
+
+    # === Соединения ===
+    async def _handle(self, reader, writer):
+        conn = Connection(writer)
+        self.connections.add(conn)
+        self.stats["connections"] += 1
+        try:
+            while True:
+                try:
+                    line = await reader.readline()
+                except (asyncio.LimitOverrunError, ValueError):
+                    self._error(conn, BAD_REQUEST)
+                    break
+                except ConnectionError:
+                    break
+                if not line:
+                    break
+                try:
+                    message = decode(line)
+                except ValueError:
+                    self._error(conn, BAD_REQUEST)
+                    continue
+                handler = self._handlers.get(message["type"])
+                if handler is None:
+                    self._error(conn, BAD_REQUEST)
+                    continue
+                await handler(conn, message)
+        except asyncio.CancelledError:
+            pass  # сервер останавливается
+        finally:
+            self.connections.discard(conn)
+            self._leave(conn)
+            writer.close()
+
+    def _error(self, conn: Connection, code: str):
+        self.stats["errors"] += 1
+        conn.send({"type": "error", "code": code, "message": ERROR_MESSAGES[code]})
+
+    @staticmethod
+    def _player_name(message: dict, default: str) -> str:
+        name = message.get("name")
+        if not isinstance(name, str) or not name.strip():
+            return default
+        return name.strip()[:MAX_PLAYER_NAME_LEN]
+
+    # === Комнаты ===
+    def _new_code(self) -> str:
+        while True:
+            code = "".join(random.choices(CODE_ALPHABET, k=CODE_LENGTH))
+            if code not in self.rooms:
+                return code
+
+    def _seat(self, conn: Connection, room: Room, message: dict):
+        conn.room = room
+        conn.player = len(room.connections)
+        conn.name = self._player_name(message, f"Игрок {conn.player + 1}")
+        room.connections.append(conn)
+        conn.send({"type": "room", "code": room.code, "player": conn.player})
+
+    async def _on_create(self, conn: Connection, message: dict):
+        if conn.room is not None:
+            return self._error(conn, ALREADY_IN_ROOM)
+        if len(self.rooms) >= self.max_rooms:
+            return self._error(conn, SERVER_FULL)
+        room = Room(self._new_code(), self.turn_time)
+        self.rooms[room.code] = room
+        self.stats["rooms"] += 1
+        self._seat(conn, room, message)
+
+    async def _on_join(self, conn: Connection, message: dict):
+        if conn.room is not None:
+            return self._error(conn, ALREADY_IN_ROOM)
+        code = message.get("code")
+        room = self.rooms.get(code.strip().upper()) if isinstance(code, str) else None
+        if room is None:
+            return self._error(conn, ROOM_NOT_FOUND)
+        if room.started or len(room.connections) >= PLAYERS_PER_ROOM:
+            return self._error(conn, ROOM_FULL)
+        self._seat(conn, room, message)
+        if len(room.connections) == PLAYERS_PER_ROOM:
+            self._start_game(room)
+
+    def _start_game(self, room: Room):
+        recorder = self.journal.game("server") if self.journal is not None else None
+        room.engine = GameEngine([c.name for c in room.connections], recorder)
+        self.stats["games"] += 1
+        self._start_turn(room)
+        room.broadcast({
+            "type": "start", "code": room.code, "players": room.engine.state.players,
+            "turn": room.engine.state.current_turn, "turn_time": room.turn_time,
+            "time_left": room.turn_time,
+        })
+
+    def _leave(self, conn: Connection):
+        room = conn.room
+        if room is None:
+            return
+        conn.room = None
+        if room.closed:
+            return
+        if room.started and not room.engine.state.finished:
+            # Ушёл посреди партии — это поражение
+            room.engine.give_up(conn.player)
+            self._end_game(room)
+        else:
+            room.connections.remove(conn)
+            if not room.connections:
+                self._close_room(room)
+
+    async def _on_leave(self, conn: Connection, message: dict):
+        self._leave(conn)
+
+    def _close_room(self, room: Room):
+        room.closed = True
+        room.cancel_timer()
+        self.rooms.pop(room.code, None)
+        for conn in room.connections:
+            if conn.room is room:
+                conn.room = None
+
+    # === Часы ===
+    def _start_turn(self, room: Room):
+        loop = asyncio.get_running_loop()
+        room.cancel_timer()
+        room.deadline = loop.time() + room.turn_time
+        room.timer = loop.call_at(room.deadline, self._on_timeout, room)
+
+    def _on_timeout(self, room: Room):
+        room.timer = None
+        if room.closed or room.validating:
+            return
+        self.stats["timeouts"] += 1
+        room.engine.timeout()
+        self._end_game(room)
+
+    # === Ходы ===
+    def _current(self, conn: Connection) -> Optional[Room]:
+        # Комната, если сейчас ход этого игрока и ход ещё не отправлен
+        room = conn.room
+        if room is None or not room.started or room.engine.state.finished:
+            self._error(conn, NOT_IN_GAME)
+            return None
+        if room.engine.state.current_turn != conn.player or room.validating:
+            self._error(conn, NOT_YOUR_TURN)
+            return None
+        return room
+
+    def _validation_deadline(self, room: Room) -> float:
+        # Дедлайн хода в шкале time.monotonic() для цепочки проверок
+        return time.monotonic() + max(0.0, room.deadline - asyncio.get_running_loop().time())
+
+    async def _on_typing(self, conn: Connection, message: dict):
+        # Заранее прогреваем кэш цепочки; ответ клиенту не нужен
+        room = conn.room
+        name = message.get("name")
+        if (room is None or not room.started or room.validating or room.engine.state.finished
+                or room.engine.state.current_turn != conn.player or not isinstance(name, str)):
+            return
+        name = normalize_name(name)
+        if len(name) <= MAX_NAME_LEN and room.engine.check_move(name) is None:
+            self.validation_engine.check(self.chain, name, self._validation_deadline(room), speculative=True)
+
+    async def _on_move(self, conn: Connection, message: dict):
+        room = self._current(conn)
+        if room is None:
+            return
+        name = message.get("name")
+        if not isinstance(name, str):
+            return self._error(conn, BAD_REQUEST)
+
+        name = normalize_name(name)
+        engine = room.engine
+        exists = True
+        if len(name) > MAX_NAME_LEN:
+            exists = False
+        elif engine.check_move(name) is None:
+            # Пока ход проверяется, время игрока не идёт
+            room.cancel_timer()
+            room.validating = True
+            future = self.validation_engine.check(self.chain, name, self._validation_deadline(room))
+            try:
+                exists = await asyncio.wrap_future(future)
+            except Exception:
+                exists = None
+            room.validating = False
+            if room.closed or engine.state.finished:
+                return  # соперник ушёл, пока шла проверка
+            # Нет однозначного ответа — не ломаем игру
+            if exists is None:
+                exists = True
+
+        move = engine.submit_move(name, exists)
+        if not move.accepted:
+            self.stats["rejected"] += 1
+            self._end_game(room, name)
+            return
+
+        self.stats["moves"] += 1
+        self._start_turn(room)
+        state = engine.state
+        room.broadcast({
+            "type": "move", "player": move.player, "name": move.name, "turn": state.current_turn,
+            "scores": state.scores, "time_left": room.turn_time,
+        })
+
+    async def _on_ping(self, conn: Connection, message: dict):
+        conn.send({"type": "pong"})
+
+    def _end_game(self, room: Room, name: Optional[str] = None):
+        result = room.engine.result()
+        self.stats["finished"] += 1
+        room.broadcast({
+            "type": "end", "reason": result.reason, "loser": result.loser, "winner": result.winner,
+            "scores": list(result.scores), "name": name,
+        })
+        self._close_room(room)
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Сервер онлайн-режима Python Developer Battle")
+    parser.add_argument("--host", default=DEFAULT_HOST)
+    parser.add_argument("--port", type=int, default=DEFAULT_PORT)
+    parser.add_argument("--turn-time", type=float, default=TURN_TIME)
+    parser.add_argument("--max-rooms", type=int, default=MAX_ROOMS)
+    parser.add_argument("--pypi-url", default="", help="Simple API вместо pypi.org (например, pypi_stub)")
+    parser.add_argument("--mirror", default="", help="зеркало Simple API перед основным индексом")
+    parser.add_argument("--offline", action="store_true", help="проверять только по кэшу и снимку индекса")
+    parser.add_argument("--no-check", action="store_true", help="не проверять существование пакетов")
+    parser.add_argument("--rate", type=float, default=UPSTREAM_RATE,
+                        help="запросов в секунду к каждому индексу (0 — без лимита)")
+    parser.add_argument("--cache-size", type=int, default=SERVER_CACHE_SIZE, help="имён в кэше проверок")
+    parser.add_argument("--validation-workers", type=int, default=VALIDATION_WORKERS,
+                        help="потоков для запросов к индексу")
+    parser.add_argument("--journal", nargs="?", const=default_journal_path(), default=None,
+                        help="вести журнал партий (по умолчанию — в DATA_DIR/journal)")
+    args = parser.parse_args()
+    journal = Journal(args.journal) if args.journal else None
+
+    server = GameServer(args.host, args.port, {
+        "pypi_check": not args.no_check,
+        "offline_mode": args.offline,
+        "pypi_url": args.pypi_url,
+        "pypi_mirror": args.mirror,
+        "upstream_rate": args.rate,
+        "memory_cache_size": args.cache_size,
+    }, args.turn_time, args.max_rooms, ValidationEngine(args.validation_workers, VALIDATION_PENDING), journal)
+
+    async def main():
+        await server.start()
+        print(f"Сервер слушает {server.host}:{server.port}")
+        await server.serve_forever()
+
+    try:
+        asyncio.run(main())
+    except KeyboardInterrupt:
+        pass
+    finally:
+        if journal is not None:
+            journal.close()
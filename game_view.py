@@ -0,0 +1,319 @@
+# game_view.py
+# Общий Tk-экран партии: поле ввода, таймер, счёт, список ходов.
+# Правила живут в game_engine.GameEngine, экран только показывает его
+# состояние и передаёт ходы. Режимы (локальный, против бота) — подклассы.
+import tkinter as tk
+from tkinter import messagebox
+import math
+
+from audio import get_shared_audio
+from fuzzy import suggest_names
+from game_clock import GameClock
+from game_engine import ALREADY_USED, INVALID_NAME, NOT_FOUND, GameEngine
+from history_view import HistoryView
+from journal import get_shared_journal
+from speculative import SpeculativeValidator
+from validation import build_validation_chain
+from validation_engine import CompletionQueue, get_shared_engine
+from validator import normalize_name
+
+# Цвета (VS Code Dark+)
+BG = "#1e1e1e"
+ACCENT = "#4ec9b0"
+WARNING = "#d7ba7d"
+DANGER = "#f44747"
+
+
+class GameView:
+    TITLE = "🐍 Python Developer Battle"
+    TITLE_FONT = ("Consolas", 20, "bold")
+    HINT = "Введите имя библиотеки (как в pip install)"
+    PLAYERS = ("Игрок 1", "Игрок 2")
+    TURN_COLORS = ("white", "white")
+    TIME_LIMIT = 10
+    MODE = "local"  # метка режима в журнале партий
+
+    ERRORS = {
+        INVALID_NAME: "'{lib}' — некорректное имя (должно быть валидным для pip).",
+        ALREADY_USED: "'{lib}' уже называли!",
+        NOT_FOUND: "'{lib}' не найдена в PyPI (https://pypi.org)!",
+    }
+
+    def __init__(self, root, settings):
+        self.root = root
+        self.settings = settings
+
+        # Настройки из меню
+        self.use_sound = settings.get("sound", True)
+        # Опечатка в несуществующем имени: подсказка и ещё попытка вместо поражения
+        self.typo_recovery = settings.get("typo_recovery", False)
+        self._typo_offered = False
+
+        # Правила и состояние партии
+        self.game = GameEngine(self.PLAYERS, self.make_recorder())
+
+        # Проверка существования пакета: кэши → снимок → зеркало → PyPI
+        self.validation = build_validation_chain(settings)
+        # Общий движок проверок; результаты возвращаются в Tk через очередь
+        self.validation_engine = get_shared_engine()
+        self.completions = CompletionQueue(self.root)
+        self.completions.start()
+        # Проверка начинается ещё во время набора имени
+        self.speculative = SpeculativeValidator(self.root, self.validation_engine, self.validation)
+
+        # Часы: дедлайн по time.monotonic(), тики через root.after
+        self.clock = GameClock(self.root, self.TIME_LIMIT, players=len(self.PLAYERS),
+                               bank=settings.get("time_bank", 0.0),
+                               on_tick=self.update_timer_display, on_timeout=self.on_timeout)
+
+        # Окно закрыли крестиком: часы и догадки не должны тикать в удалённые виджеты
+        self.root.bind("<Destroy>", self._on_destroy, add="+")
+
+        self.setup_ui()
+        self.update_turn_display()
+        self.start_timer()
+
+    # === Состояние (только чтение, правила — в self.game) ===
+    @property
+    def state(self):
+        return self.game.state
+
+    def is_human_turn(self) -> bool:
+        return True
+
+    def make_recorder(self):
+        # Журнал партий пишется в фоне (journal.py); None — не вести
+        if not self.settings.get("journal", True):
+            return None
+        return get_shared_journal().game(self.MODE)
+
+    # === Подклассы переопределяют ===
+    def format_history(self, player: int, name: str) -> str:
+        # Подпись хода в списке; номер хода список добавляет сам
+        return name
+
+    def result_text(self, result) -> str:
+        if result.winner is None:
+            return "🤝 Ничья!"
+        return f"🏆 Победил(а) {self.state.players[result.winner]}!"
+
+    def after_move(self, move):
+        # Ход принят: по умолчанию — передать ход следующему игроку
+        self.update_turn_display()
+        self.start_timer()
+
+    # === Звуки ===
+    def play_sound(self, sound_type="beep"):
+        # Звук играет поток диспетчера (audio.py), окно не ждёт
+        if self.use_sound:
+            get_shared_audio().play(sound_type)
+
+    # === UI ===
+    def setup_ui(self):
+        # Заголовок
+        self.title_label = tk.Label(
+            self.root, text=self.TITLE, font=self.TITLE_FONT, fg=ACCENT, bg=BG
+        )
+        self.title_label.pack(pady=(20, 10))
+
+        # Информация о ходе и счёте
+        self.info_frame = tk.Frame(self.root, bg=BG)
+        self.info_frame.pack(pady=5)
+
+        self.turn_label = tk.Label(
+            self.info_frame, text="", font=("Consolas", 14), fg="white", bg=BG
+        )
+        self.turn_label.pack()
+
+        self.score_label = tk.Label(
+            self.info_frame, text="", font=("Consolas", 12), fg=WARNING, bg=BG
+        )
+        self.score_label.pack()
+
+        # Таймер
+        self.timer_canvas = tk.Canvas(self.root, width=220, height=36, bg="#2d2d2d", highlightthickness=0)
+        self.timer_canvas.pack(pady=10)
+        self.timer_text = self.timer_canvas.create_text(110, 18, text=str(self.TIME_LIMIT), fill="white", font=("Consolas", 18, "bold"))
+
+        # Поле ввода
+        self.input_frame = tk.Frame(self.root, bg=BG)
+        self.input_frame.pack(pady=10)
+
+        self.entry = tk.Entry(
+            self.input_frame, font=("Consolas", 14), width=30, justify="center",
+            bg="#2d2d2d", fg="white", insertbackground="white"
+        )
+        self.entry.pack(side=tk.LEFT, padx=(0, 10))
+        self.entry.bind("<Return>", self.on_submit)
+        self.entry.bind("<KeyRelease>", self.on_typing)
+
+        self.submit_btn = tk.Button(
+            self.input_frame, text="✅ Отправить", font=("Consolas", 12),
+            command=self.on_submit, bg=ACCENT, fg="black", relief="flat"
+        )
+        self.submit_btn.pack(side=tk.LEFT)
+
+        # Список
+        self.lib_label = tk.Label(
+            self.root, text="✅ Названо:", font=("Consolas", 12, "underline"),
+            fg="#c586c0", bg=BG
+        )
+        self.lib_label.pack(pady=(12, 2))
+
+        # Рисуются только видимые строки, длина партии не важна
+        self.history_view = HistoryView(self.root, self.format_history)
+        self.history_view.pack(pady=5)
+
+        self.hint_label = tk.Label(
+            self.root, text=self.HINT, font=("Consolas", 9), fg="#6a9955", bg=BG
+        )
+        self.hint_label.pack(pady=(10, 0))
+
+    def update_turn_display(self):
+        state = self.state
+        self.turn_label.config(
+            text=f"→ Ход: {state.current_player}", fg=self.TURN_COLORS[state.current_turn]
+        )
+        self.score_label.config(
+            text="Счёт: " + " | ".join(f"{name} — {score}" for name, score in zip(state.players, state.scores))
+        )
+
+        self.entry.config(state="normal")
+        self.entry.delete(0, tk.END)
+        if self.is_human_turn():
+            self.entry.focus()
+            self.submit_btn.config(state="normal")
+        else:
+            self.entry.config(state="disabled")
+            self.submit_btn.config(state="disabled")
+
+    def start_timer(self):
+        self.speculative.reset()
+        if self._typo_offered:
+            self._typo_offered = False
+            self.hint_label.config(text=self.HINT, fg="#6a9955")
+        self.clock.start_turn(self.state.current_turn)
+
+    def update_timer_display(self, time_left):
+        if time_left > 5:
+            color = ACCENT       # зелёный
+        elif time_left > 2:
+            color = WARNING      # жёлтый
+        else:
+            color = DANGER       # красный
+
+        # На последних секундах показываем десятые доли
+        text = f"{time_left:.1f}" if time_left < 3 else str(math.ceil(time_left))
+        self.timer_canvas.itemconfig(self.timer_text, text=text, fill=color)
+        # Пульсация фона при <3 сек (дважды в секунду)
+        bg_color = "#3e2a2a" if time_left <= 2 and int(time_left * 2) % 2 else "#2d2d2d"
+        self.timer_canvas.config(bg=bg_color)
+
+    def on_timeout(self, player=None):
+        self.play_sound("timeout")
+        current_player = self.state.current_player
+        self.game.timeout()
+        messagebox.showerror("⏰ Тайм-аут!", f"{current_player} не успел(а) назвать библиотеку!")
+        self.end_game()
+
+    # === Ходы ===
+    def on_typing(self, event=None):
+        if not self.is_human_turn() or not self.clock.running:
+            return
+
+        lib = normalize_name(self.entry.get())
+        # Заранее проверяем только то, что и так прошло бы локальные проверки
+        if self.game.check_move(lib) is None:
+            self.speculative.on_text_changed(lib, self.clock.deadline())
+        else:
+            self.speculative.on_text_changed("", self.clock.deadline())
+
+    def on_submit(self, event=None):
+        if not self.is_human_turn() or not self.clock.running:
+            return
+
+        lib = self.entry.get().strip()
+        if not lib:
+            return
+
+        # Пока ход проверяется, время игрока не идёт
+        self.clock.pause()
+        self.process_submission(lib)
+
+    def process_submission(self, lib):
+        lib_clean = normalize_name(lib)
+
+        # Локальные проверки — сразу, в сеть идём только за существованием пакета
+        if self.game.check_move(lib_clean) is not None:
+            self.finish_submission(lib, True)
+        else:
+            self.speculative.reset()
+            self.validation_engine.submit(
+                self.validation, lib_clean, self.clock.deadline(), self.completions,
+                lambda exists: self.finish_submission(lib, exists)
+            )
+
+    def finish_submission(self, lib, exists):
+        # Вызывается в основном потоке Tk
+        if exists is None:
+            # Проверка упала (ошибка уже в журнале ошибок): ход не засчитан, можно повторить
+            self.hint_label.config(text=f"⚠ Не удалось проверить '{lib}' — попробуйте ещё раз", fg=WARNING)
+            self.clock.resume()
+            return
+        suggestions = self.suggest(lib) if exists is False else []
+        if suggestions and self.typo_recovery and not self._typo_offered:
+            self.offer_correction(lib, suggestions)
+            return
+        move = self.game.submit_move(lib, exists)
+        if not move.accepted:
+            self.play_sound()
+            message = self.ERRORS[move.reason].format(lib=lib)
+            if suggestions:
+                message += f"\nВозможно, имелось в виду: {', '.join(suggestions)}"
+            messagebox.showerror("❌ Ошибка", message)
+            self.end_game()
+        else:
+            self.play_sound("success")
+            self.on_move_accepted(move)
+
+    def suggest(self, lib):
+        # Близкие настоящие имена, которые ещё можно назвать (fuzzy.py, доли мс)
+        return [name for name in suggest_names(lib) if self.game.check_move(name) is None]
+
+    def offer_correction(self, lib, suggestions):
+        # Одна подсказка за ход: ход не засчитан, часы идут дальше
+        self._typo_offered = True
+        self.play_sound()
+        self.hint_label.config(text=f"🤔 '{lib}' нет в PyPI. Может быть: {', '.join(suggestions)}?", fg=WARNING)
+        self.entry.delete(0, tk.END)
+        self.entry.insert(0, suggestions[0])
+        self.entry.select_range(0, tk.END)
+        self.entry.focus()
+        self.clock.resume()
+
+    def on_move_accepted(self, move):
+        self.history_view.append(move.player, move.name)
+        self.after_move(move)
+
+    def shutdown(self):
+        # Останавливаем всё, что может прийти в окно после конца партии
+        self.clock.stop()
+        self.speculative.reset()
+        self.completions.stop()
+
+    def _on_destroy(self, event):
+        if event.widget is self.root:
+            self.shutdown()
+
+    def end_game(self):
+        self.shutdown()
+
+        result = self.game.result()
+        players = self.state.players
+        summary = (
+            "Итог: " + ", ".join(f"{name} — {score}" for name, score in zip(players, result.scores)) + "\n\n"
+            f"Всего названо: {len(self.state.used_libs)} библиотек\n"
+            f"{self.result_text(result)}"
+        )
+        messagebox.showinfo("🎮 Игра окончена", summary)
+        self.root.destroy()  # Закрываем окно → возвращаемся в меню
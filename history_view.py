@@ -0,0 +1,190 @@
+# history_view.py
+# Список ходов партии, которому всё равно, сколько в ней ходов.
+# Ходы лежат в компактном хранилище (номер игрока — байт в array, имя —
+# ссылка на ту же строку, что и в движке), а на экране всегда ровно ROWS
+# текстовых элементов Canvas: прокрутка и новый ход лишь меняют их текст.
+# Поиск по подстроке (Enter — следующее совпадение, Shift+Enter —
+# предыдущее) и переход к ходу по номеру ("#120" или "120").
+import tkinter as tk
+import tkinter.font as tkfont
+from array import array
+from typing import Callable, Optional
+
+ROWS = 8
+WIDTH_CHARS = 60
+FONT = ("Consolas", 10)
+BG = "#1e1e1e"
+ROW_BG = "#2d2d2d"
+FG = "white"
+SELECT_BG = "#3e3e3e"
+MATCH_FG = "#d7ba7d"
+
+
+class HistoryStore:
+    def __init__(self):
+        self.players = array("B")
+        self.names = []
+
+    def append(self, player: int, name: str):
+        self.players.append(player)
+        self.names.append(name)
+
+    def __len__(self):
+        return len(self.names)
+
+    def find(self, text: str, start: int, step: int = 1) -> Optional[int]:
+        # Следующее совпадение по кругу, начиная со start
+        text = text.lower()
+        count = len(self.names)
+        for offset in range(count):
+            index = (start + step * offset) % count
+            if text in self.names[index]:
+                return index
+        return None
+
+
+class HistoryView:
+    def __init__(self, parent, format_row: Callable[[int, str], str], rows=ROWS, width_chars=WIDTH_CHARS,
+                 font=FONT):
+        self.store = HistoryStore()
+        self.format_row = format_row
+        self.rows = rows
+        self.top = 0             # первая видимая строка
+        self.follow = True       # прокручивать за последним ходом
+        self.selected: Optional[int] = None
+
+        self.frame = tk.Frame(parent, bg=BG)
+
+        # Поиск и переход к ходу
+        bar = tk.Frame(self.frame, bg=BG)
+        bar.pack(fill="x", pady=(0, 3))
+        tk.Label(bar, text="🔍", font=font, fg=FG, bg=BG).pack(side=tk.LEFT)
+        self.search_entry = tk.Entry(bar, font=font, width=24, bg=ROW_BG, fg=FG, insertbackground=FG)
+        self.search_entry.pack(side=tk.LEFT, padx=(4, 0))
+        self.search_entry.bind("<Return>", self.on_search)
+        self.search_entry.bind("<Shift-Return>", lambda event: self.on_search(event, step=-1))
+        self.status_label = tk.Label(bar, text="", font=font, fg="#808080", bg=BG)
+        self.status_label.pack(side=tk.RIGHT)
+
+        measure = tkfont.Font(font=font)
+        self.line = measure.metrics("linespace") + 2
+        body = tk.Frame(self.frame, bg=BG)
+        body.pack()
+        self.canvas = tk.Canvas(body, width=measure.measure("0") * width_chars, height=self.line * rows,
+                                bg=ROW_BG, highlightthickness=0)
+        self.canvas.pack(side=tk.LEFT)
+        self.scrollbar = tk.Scrollbar(body, orient="vertical", command=self.yview)
+        self.scrollbar.pack(side=tk.LEFT, fill="y")
+
+        self._selection = self.canvas.create_rectangle(0, -self.line, 0, 0, fill=SELECT_BG, outline="")
+        self._items = [
+            self.canvas.create_text(6, i * self.line + 1, anchor="nw", text="", fill=FG, font=font)
+            for i in range(rows)
+        ]
+
+        for widget in (self.canvas, self.scrollbar):
+            widget.bind("<MouseWheel>", self.on_wheel)
+            widget.bind("<Button-4>", lambda event: self.scroll(-3))
+            widget.bind("<Button-5>", lambda event: self.scroll(3))
+        self.canvas.bind("<Button-1>", self.on_click)
+        self.scrollbar.set(0, 1)
+
+    def pack(self, **kwargs):
+        self.frame.pack(**kwargs)
+
+    def __len__(self):
+        return len(self.store)
+
+    # === Ходы ===
+    def append(self, player: int, name: str):
+        # Стоимость не зависит от длины партии: не больше ROWS строк текста
+        self.store.append(player, name)
+        count = len(self.store)
+        if self.follow:
+            self._show(max(0, count - self.rows))
+        else:
+            row = count - 1 - self.top
+            if row < self.rows:
+                self._render_row(row)
+            self._update_scrollbar()
+        self.status_label.config(text=f"ходов: {count}")
+
+    def jump_to(self, index: int):
+        # Выделить ход и показать его посередине
+        if not self.store:
+            return
+        index = max(0, min(index, len(self.store) - 1))
+        self.selected = index
+        self._show(index - self.rows // 2)
+
+    # === Прокрутка ===
+    def scroll(self, rows: int):
+        self._show(self.top + rows)
+
+    def yview(self, *args):
+        # Протокол команды Scrollbar: moveto доля | scroll n units/pages
+        if args[0] == "moveto":
+            self._show(round(float(args[1]) * len(self.store)))
+        elif args[0] == "scroll":
+            step = self.rows if args[2] == "pages" else 1
+            self.scroll(int(args[1]) * step)
+
+    def on_wheel(self, event):
+        self.scroll(-3 if event.delta > 0 else 3)
+
+    def on_click(self, event):
+        index = self.top + int(event.y // self.line)
+        if index < len(self.store):
+            self.selected = index
+            self._render()
+
+    # === Поиск ===
+    def on_search(self, event=None, step=1):
+        text = self.search_entry.get().strip()
+        if not text or not self.store:
+            return "break"
+        number = text.lstrip("#")
+        if number.isdigit():
+            self.jump_to(int(number) - 1)
+            return "break"
+        start = self.selected + step if self.selected is not None else (0 if step > 0 else len(self.store) - 1)
+        index = self.store.find(text, start, step)
+        if index is None:
+            self.status_label.config(text=f"«{text}» не найдено")
+        else:
+            self.jump_to(index)
+            self.status_label.config(text=f"ход {index + 1} из {len(self.store)}")
+        return "break"
+
+    # === Отрисовка ===
+    def _show(self, top: int):
+        count = len(self.store)
+        self.top = max(0, min(top, count - self.rows))
+        self.follow = self.top + self.rows >= count
+        self._render()
+
+    def _render(self):
+        for row in range(self.rows):
+            self._render_row(row)
+        if self.selected is not None and 0 <= self.selected - self.top < self.rows:
+            y = (self.selected - self.top) * self.line
+            self.canvas.coords(self._selection, 0, y, self.canvas.winfo_reqwidth(), y + self.line)
+        else:
+            self.canvas.coords(self._selection, 0, -self.line, 0, 0)
+        self._update_scrollbar()
+
+    def _render_row(self, row: int):
+        index = self.top + row
+        if index < len(self.store):
+            text = f"{index + 1:3}. {self.format_row(self.store.players[index], self.store.names[index])}"
+            fill = MATCH_FG if index == self.selected else FG
+        else:
+            text, fill = "", FG
+        self.canvas.itemconfig(self._items[row], text=text, fill=fill)
+
+    def _update_scrollbar(self):
+        count = len(self.store)
+        if count <= self.rows:
+            self.scrollbar.set(0, 1)
+        else:
+            self.scrollbar.set(self.top / count, (self.top + self.rows) / count)
@@ -0,0 +1,422 @@
+# journal.py
+# Журнал партий: каждый ход, ответ проверки PyPI и итог — строкой JSON в
+# файл, который только дописывается.
+#
+# Запись ничего не стоит ходу: record() кладёт кортеж в очередь, а JSON,
+# запись в буферизованный файл и fsync (не чаще раза в FSYNC_INTERVAL)
+# делает фоновый поток. GameRecorder подключается к GameEngine и пишет
+# ровно те вызовы, которые меняли состояние, поэтому повтор тех же
+# вызовов на новом движке восстанавливает партию на любом ходе.
+#
+# Записи (g — id партии, ms — от начала партии):
+#   {"g", "e": "start", "ts", "mode", "players"}
+#   {"g", "e": "move", "ms", "p", "n", "v"}          v — ответ проверки PyPI
+#   {"g", "e": "end", "ms", "loser", "r", "s"}       r — причина, s — счёт
+#
+#   python journal.py replay                       # все журналы в DATA_DIR/journal
+#   python journal.py show 3f9c0a1b7e2d --move 10  # состояние партии после 10-го хода
+#   python journal.py bench --games 20000          # записать архив самоигры и повторить
+import json
+import os
+import queue
+import re
+import threading
+import time
+from typing import Dict, Iterable, Iterator, List, Optional, Tuple
+
+from game_engine import GameEngine
+from pypi_cache import DATA_DIR
+from validator import name_keys
+
+JOURNAL_DIR = os.path.join(DATA_DIR, "journal")
+FSYNC_INTERVAL = 1.0      # с; дольше этого подтверждённый ход не живёт только в памяти
+WRITE_BUFFER = 64 * 1024
+# Имя хода, который не был отвергнут PyPI (v — true или null): такие имена
+# стоит держать в кэше. JSON не разбираем — строка пишется всегда одинаково
+_PLAYED_NAME = re.compile(r'"e":"move",.*?"n":"([^"\\]*)","v":(?:true|null)')
+
+_STOP = object()
+
+
+def default_journal_path() -> str:
+    # Файл на день и на процесс: окно, сервер и самоигра пишут в буферизованные
+    # файлы одновременно, и общий файл перемешал бы их строки на сбросах буфера
+    return os.path.join(JOURNAL_DIR, time.strftime(f"games-%Y-%m-%d-{os.getpid()}.jsonl"))
+
+
+class Journal:
+    def __init__(self, path: Optional[str] = None, fsync_interval=FSYNC_INTERVAL):
+        self.path = path or default_journal_path()
+        self.fsync_interval = fsync_interval
+        self._queue = queue.SimpleQueue()
+        self._thread = None
+        self._lock = threading.Lock()
+        self._closed = False
+        self.stats = {"records": 0, "written": 0, "fsyncs": 0, "errors": 0}
+
+    def record(self, game_id: str, event: str, fields: dict):
+        # Из любого потока; не ждёт ни диска, ни сериализации
+        if self._closed:
+            return
+        if self._thread is None:
+            self._start()
+        self.stats["records"] += 1
+        self._queue.put((game_id, event, fields))
+
+    def game(self, mode: str) -> "GameRecorder":
+        return GameRecorder(self, mode)
+
+    def _start(self):
+        with self._lock:
+            if self._thread is None:
+                self._thread = threading.Thread(target=self._run, name="journal", daemon=True)
+                self._thread.start()
+
+    def _run(self):
+        try:
+            os.makedirs(os.path.dirname(self.path) or ".", exist_ok=True)
+            out = open(self.path, "a", encoding="utf-8", buffering=WRITE_BUFFER)
+        except OSError:
+            # Журнал не обязателен для игры: без диска просто не пишем
+            self.stats["errors"] += 1
+            self._closed = True
+            return
+
+        dirty = False
+        last_sync = time.monotonic()
+        with out:
+            while True:
+                timeout = self.fsync_interval - (time.monotonic() - last_sync) if dirty else None
+                try:
+                    item = self._queue.get(timeout=max(0.0, timeout) if timeout is not None else None)
+                except queue.Empty:
+                    item = None
+                if item is _STOP:
+                    break
+                if item is not None:
+                    game_id, event, fields = item
+                    try:
+                        out.write(json.dumps(dict({"g": game_id, "e": event}, **fields),
+                                             ensure_ascii=False, separators=(",", ":")) + "\n")
+                        self.stats["written"] += 1
+                        dirty = True
+                    except (OSError, TypeError, ValueError):
+                        self.stats["errors"] += 1
+                if dirty and time.monotonic() - last_sync >= self.fsync_interval:
+                    self._sync(out)
+                    dirty = False
+                    last_sync = time.monotonic()
+            self._sync(out)
+
+    def _sync(self, out):
+        try:
+            out.flush()
+            os.fsync(out.fileno())
+            self.stats["fsyncs"] += 1
+        except OSError:
+            self.stats["errors"] += 1
+
+    def close(self, timeout: float = 5.0):
+        # Дописать очередь на диск (вызывается и при выходе из процесса)
+        if self._closed:
+            return
+        self._closed = True
+        if self._thread is not None:
+            self._queue.put(_STOP)
+            self._thread.join(timeout)
+
+
+class GameRecorder:
+    # Подключается к GameEngine(recorder=...): движок сам сообщает о ходах и итоге
+    def __init__(self, journal: Journal, mode: str):
+        self.journal = journal
+        self.mode = mode
+        self.game_id = os.urandom(6).hex()
+        self._started = time.monotonic()
+
+    def _ms(self) -> int:
+        return int((time.monotonic() - self._started) * 1000)
+
+    def start(self, players: List[str]):
+        self._started = time.monotonic()
+        self.journal.record(self.game_id, "start", {
+            "ts": round(time.time(), 3), "mode": self.mode, "players": list(players),
+        })
+
+    def move(self, player: int, name: str, exists: Optional[bool], reason: Optional[str]):
+        # reason не пишем: движок выведет его заново из имени и ответа проверки
+        self.journal.record(self.game_id, "move", {"ms": self._ms(), "p": player, "n": name, "v": exists})
+
+    def end(self, loser: Optional[int], reason: str, scores: List[int]):
+        self.journal.record(self.game_id, "end", {"ms": self._ms(), "loser": loser, "r": reason,
+                                                  "s": list(scores)})
+
+
+# === Общий журнал на процесс ===
+_shared_journal = None
+_shared_lock = threading.Lock()
+
+
+def get_shared_journal() -> Journal:
+    global _shared_journal
+    if _shared_journal is None:
+        with _shared_lock:
+            if _shared_journal is None:
+                import atexit
+
+                _shared_journal = Journal()
+                atexit.register(_shared_journal.close)
+    return _shared_journal
+
+
+# === Повтор ===
+class ReplayedGame:
+    def __init__(self, game_id: str, start: dict):
+        self.game_id = game_id
+        self.mode = start.get("mode")
+        self.ts = start.get("ts")
+        self.engine = GameEngine(start["players"])
+        self.moves = 0
+        self.duration_ms = 0
+        self.recorded_end: Optional[dict] = None
+        self.mismatch = False
+
+    def apply(self, record: dict):
+        state = self.engine.state
+        event = record["e"]
+        self.duration_ms = record.get("ms", self.duration_ms)
+        if event == "move":
+            if state.current_turn != record["p"] or state.finished:
+                self.mismatch = True
+                return
+            self.engine.submit_move(record["n"], record["v"])
+            self.moves += 1
+        elif event == "end":
+            self.recorded_end = record
+            # Таймаут, сдача, решение сервера — в ходах их нет, берём из записи
+            if not state.finished:
+                self.engine.finish(record["loser"], record["r"])
+            elif state.loser != record["loser"] or state.reason != record["r"]:
+                self.mismatch = True
+            if list(state.scores) != record["s"]:
+                self.mismatch = True
+
+    @property
+    def finished(self) -> bool:
+        return self.recorded_end is not None
+
+
+def read_records(paths: Iterable[str], game_id: Optional[str] = None) -> Iterator[dict]:
+    # Недописанная последняя строка (падение процесса) пропускается.
+    # С game_id чужие строки отсеиваются до разбора JSON
+    for path in paths:
+        with open(path, encoding="utf-8") as f:
+            for line in f:
+                if game_id is not None and game_id not in line:
+                    continue
+                try:
+                    yield json.loads(line)
+                except ValueError:
+                    continue
+
+
+def replay(records: Iterable[dict], game_id: Optional[str] = None,
+           upto_move: Optional[int] = None) -> Iterator[ReplayedGame]:
+    # Партии по мере завершения; партии разных комнат в журнале перемешаны.
+    # upto_move — остановить партию после этого хода (разбор спорных ситуаций)
+    games: Dict[str, ReplayedGame] = {}
+    for record in records:
+        gid = record.get("g")
+        if game_id is not None and gid != game_id:
+            continue
+        if record.get("e") == "start":
+            games[gid] = ReplayedGame(gid, record)
+            continue
+        game = games.get(gid)
+        if game is None:
+            continue
+        if upto_move is not None and record.get("e") == "move" and game.moves >= upto_move:
+            yield games.pop(gid)
+            continue
+        game.apply(record)
+        if game.finished:
+            yield games.pop(gid)
+    # Партии без итога: окно закрыли или процесс упал
+    yield from games.values()
+
+
+def journal_files(directory: str = JOURNAL_DIR, days: Optional[int] = None) -> List[str]:
+    # По дате в имени; days — только файлы за столько последних дней с записями
+    if not os.path.isdir(directory):
+        return []
+    paths = sorted(os.path.join(directory, name) for name in os.listdir(directory) if name.endswith(".jsonl"))
+    if days is None:
+        return paths
+    dates = sorted({_journal_date(path) for path in paths})[-days:] if days > 0 else []
+    return [path for path in paths if _journal_date(path) in dates]
+
+
+def _journal_date(path: str) -> str:
+    # games-2024-05-01-1234.jsonl → 2024-05-01 (и старые games-2024-05-01.jsonl)
+    return os.path.basename(path)[len("games-"):len("games-") + 10]
+
+
+def played_names(paths: Iterable[str], limit: Optional[int] = None) -> List[Tuple[str, int]]:
+    # Самые частые имена из журналов: (канонический ключ, сколько раз), по убыванию
+    counts: Dict[str, int] = {}
+    for path in paths:
+        try:
+            with open(path, encoding="utf-8") as f:
+                names = _PLAYED_NAME.findall(f.read())
+        except OSError:
+            continue
+        for key in name_keys(names):
+            if key is not None:
+                counts[key] = counts.get(key, 0) + 1
+    ranked = sorted(counts.items(), key=lambda item: (-item[1], item[0]))
+    return ranked[:limit] if limit is not None else ranked
+
+
+def _merge(total: Dict, part: Dict):
+    for key in ("games", "moves", "unfinished"):
+        total[key] += part[key]
+    total["mismatches"].extend(part["mismatches"])
+    for key in ("reasons", "modes"):
+        for name, count in part[key].items():
+            total[key][name] = total[key].get(name, 0) + count
+
+
+def summarize_file(path: str) -> Dict:
+    return summarize(replay(read_records([path])))
+
+
+def summarize_files(paths: List[str], workers: Optional[int] = None) -> Dict:
+    # Журнал по умолчанию — свой файл у каждого процесса (default_journal_path),
+    # и партия не переходит между файлами, поэтому большой архив повторяется
+    # по файлу на рабочий процесс. Файл, заданный явно (--journal ПУТЬ),
+    # не должны открывать на запись два процесса сразу
+    total = summarize(())
+    if len(paths) < 2 or workers == 1:
+        for path in paths:
+            _merge(total, summarize_file(path))
+        return total
+
+    from concurrent.futures import ProcessPoolExecutor
+
+    with ProcessPoolExecutor(max_workers=workers) as pool:
+        for part in pool.map(summarize_file, paths):
+            _merge(total, part)
+    return total
+
+
+def summarize(games: Iterable[ReplayedGame]) -> Dict:
+    summary = {"games": 0, "moves": 0, "unfinished": 0, "mismatches": [], "reasons": {}, "modes": {}}
+    for game in games:
+        summary["games"] += 1
+        summary["moves"] += game.moves
+        summary["modes"][game.mode] = summary["modes"].get(game.mode, 0) + 1
+        if not game.finished:
+            summary["unfinished"] += 1
+        else:
+            reason = game.engine.state.reason
+            summary["reasons"][reason] = summary["reasons"].get(reason, 0) + 1
+        if game.mismatch:
+            summary["mismatches"].append(game.game_id)
+    return summary
+
+
+def format_state(game: ReplayedGame) -> str:
+    state = game.engine.state
+    lines = [f"партия {game.game_id} ({game.mode}), ходов: {game.moves}, {game.duration_ms / 1000:.1f} с"]
+    lines.append("счёт: " + ", ".join(f"{name} — {score}" for name, score in zip(state.players, state.scores)))
+    for number, (player, name) in enumerate(state.history, 1):
+        lines.append(f"{number:4}. [{state.players[player]}] {name}")
+    if state.finished:
+        loser = state.players[state.loser] if state.loser is not None else "—"
+        lines.append(f"итог: {state.reason}, проиграл(а) {loser}")
+    else:
+        lines.append(f"ход: {state.current_player}")
+    if game.mismatch:
+        lines.append("⚠ повтор расходится с записанным итогом")
+    return "\n".join(lines)
+
+
+def _bench(games: int, seed: int, path: str) -> Dict:
+    import random
+
+    from bot_knowledge import get_knowledge_base
+    from bot_strategy import BotStrategy
+    from selfplay import play_game
+
+    kb = get_knowledge_base()
+    rng = random.Random(seed)
+    strategies = [BotStrategy(kb, "easy", rng), BotStrategy(kb, "hard", rng)]
+    journal = Journal(path)
+
+    # Самоигра пишет через тот же GameRecorder, что и окна
+    started = time.perf_counter()
+    for _ in range(games):
+        play_game(kb, strategies, 0.9, rng, recorder=journal.game("selfplay"))
+    played = time.perf_counter() - started
+    journal.close(timeout=600)
+
+    started = time.perf_counter()
+    summary = summarize(replay(read_records([path])))
+    replayed = time.perf_counter() - started
+    return {
+        "games": games, "play_s": played, "records": journal.stats["written"],
+        "bytes": os.path.getsize(path), "replay_s": replayed, "summary": summary,
+    }
+
+
+if __name__ == "__main__":
+    import argparse
+
+    parser = argparse.ArgumentParser(description="Журнал партий: повтор, разбор, замер")
+    sub = parser.add_subparsers(dest="command", required=True)
+    replay_cmd = sub.add_parser("replay", help="повторить архив и сверить итоги")
+    replay_cmd.add_argument("paths", nargs="*", help=f"файлы журнала (по умолчанию — {JOURNAL_DIR})")
+    replay_cmd.add_argument("--workers", type=int, default=None, help="процессов (по умолчанию — все ядра)")
+    show_cmd = sub.add_parser("show", help="восстановить партию")
+    show_cmd.add_argument("game_id")
+    show_cmd.add_argument("--move", type=int, default=None, help="остановиться после этого хода")
+    show_cmd.add_argument("paths", nargs="*")
+    bench_cmd = sub.add_parser("bench", help="записать самоигру во временный журнал и повторить")
+    bench_cmd.add_argument("--games", type=int, default=10_000)
+    bench_cmd.add_argument("--seed", type=int, default=0)
+    args = parser.parse_args()
+
+    if args.command == "bench":
+        import tempfile
+
+        with tempfile.TemporaryDirectory() as tmp:
+            report = _bench(args.games, args.seed, os.path.join(tmp, "bench.jsonl"))
+        summary = report["summary"]
+        print(f"запись: {report['games']:,} партий, {report['records']:,} записей, "
+              f"{report['bytes'] / 1e6:.1f} МБ за {report['play_s']:.2f} с")
+        print(f"повтор: {summary['games']:,} партий, {summary['moves']:,} ходов за {report['replay_s']:.2f} с "
+              f"({summary['games'] / report['replay_s']:,.0f} партий/с), расхождений: {len(summary['mismatches'])}")
+        raise SystemExit(1 if summary["mismatches"] or summary["games"] != report["games"] else 0)
+
+    paths = args.paths or journal_files()
+    if not paths:
+        parser.error(f"нет журналов в {JOURNAL_DIR}")
+
+    if args.command == "show":
+        found = False
+        for game in replay(read_records(paths, args.game_id), args.game_id, args.move):
+            print(format_state(game))
+            found = True
+        if not found:
+            raise SystemExit(f"партия {args.game_id} не найдена")
+    else:
+        started = time.perf_counter()
+        summary = summarize_files(paths, args.workers)
+        elapsed = time.perf_counter() - started
+        print(f"партий: {summary['games']:,} (без итога: {summary['unfinished']:,}), ходов: {summary['moves']:,}, "
+              f"{summary['games'] / max(elapsed, 1e-9):,.0f} партий/с")
+        print("режимы: " + ", ".join(f"{mode}: {count}" for mode, count in sorted(summary["modes"].items())))
+        print("итоги: " + ", ".join(f"{reason}: {count}" for reason, count in sorted(summary["reasons"].items())))
+        for game_id in summary["mismatches"]:
+            print(f"⚠ расхождение: {game_id}")
+        raise SystemExit(1 if summary["mismatches"] else 0)
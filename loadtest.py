@@ -0,0 +1,405 @@
+# loadtest.py
+# Нагрузочный тест онлайн-режима: тысячи клиентов протокола OnlineGameApp
+# на asyncio против одного процесса game_server.py.
+#
+# Сервер запускается в отдельном процессе (чтобы его CPU и память мерились
+# отдельно от генератора нагрузки), pypi_stub с заданной задержкой ответа —
+# в третьем. Кэши на диске и снимок индекса у сервера пустые, поэтому
+# каждое новое имя действительно идёт в «сеть».
+#
+# Каждая комната — два клиента: создают комнату по коду, играют партии
+# именами из корпуса (по умолчанию — база знаний бота плюс синтетические
+# имена), иногда ошибаются (повтор или несуществующий пакет), после конца
+# партии начинают новую.
+#
+#   python loadtest.py --rooms 1000 --duration 30 --think 300 --stub-latency 0.05
+#   python loadtest.py --connect 10.0.0.5:8765 --rooms 200 --json result.json
+import argparse
+import asyncio
+import json
+import multiprocessing
+import os
+import random
+import resource
+import sys
+import tempfile
+import time
+from typing import Dict, List, Optional
+
+from online_protocol import MAX_LINE, decode, encode, parse_address
+
+# Клиент отправляет догадку, когда игрок «допечатал» имя (как OnlineGameApp)
+TYPING_DEBOUNCE = 0.25
+RECV_TIMEOUT = 30.0
+
+
+# === Процесс сервера ===
+def _rss_bytes() -> int:
+    try:
+        with open("/proc/self/statm") as f:
+            return int(f.read().split()[1]) * os.sysconf("SC_PAGE_SIZE")
+    except (OSError, ValueError, AttributeError):
+        # Не Linux: только пиковое значение (килобайты на Linux, байты на macOS)
+        peak = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+        return peak if sys.platform == "darwin" else peak * 1024
+
+
+def _stub_process(pipe, names, latency):
+    from pypi_stub import PyPIStubServer
+
+    with PyPIStubServer(names, latency=latency, json_size=0) as stub:
+        pipe.send(stub.url + "/simple/")
+        pipe.recv()  # ждём команды остановиться
+
+
+def _server_process(pipe, index_url, turn_time, rate, workers):
+    # Запускается через spawn: импорты здесь видят временный DATA_DIR
+    from game_server import VALIDATION_PENDING, GameServer
+    from validation_engine import ValidationEngine
+
+    server = GameServer("127.0.0.1", 0, {"pypi_url": index_url, "upstream_rate": rate}, turn_time=turn_time,
+                        validation_engine=ValidationEngine(workers, VALIDATION_PENDING))
+
+    def snapshot():
+        cpu = resource.getrusage(resource.RUSAGE_SELF)
+        return {
+            "rss": _rss_bytes(), "cpu": cpu.ru_utime + cpu.ru_stime, "wall": time.monotonic(),
+            "rooms": len(server.rooms), "connections": len(server.connections),
+            "server": dict(server.stats), "validation": dict(server.chain.stats),
+        }
+
+    async def main():
+        await server.start()
+        loop = asyncio.get_running_loop()
+        stopped = loop.create_future()
+
+        def on_command():
+            command = pipe.recv()
+            if command == "stats":
+                pipe.send(snapshot())
+            elif command == "stop" and not stopped.done():
+                stopped.set_result(None)
+
+        loop.add_reader(pipe.fileno(), on_command)
+        pipe.send(server.port)
+        await stopped
+        loop.remove_reader(pipe.fileno())
+        await server.close()
+
+    asyncio.run(main())
+
+
+class ServerHandle:
+    def __init__(self, names, stub_latency, turn_time, rate, workers):
+        ctx = multiprocessing.get_context("spawn")
+        self._stub_pipe, child = ctx.Pipe()
+        self.stub_process = ctx.Process(target=_stub_process, args=(child, names, stub_latency), daemon=True)
+        self.stub_process.start()
+        index_url = self._stub_pipe.recv()
+
+        self._pipe, child = ctx.Pipe()
+        self._data_dir = tempfile.TemporaryDirectory(prefix="pdb-loadtest-")
+        saved = os.environ.get("PYDEVBATTLE_DATA_DIR")
+        os.environ["PYDEVBATTLE_DATA_DIR"] = self._data_dir.name
+        try:
+            self.process = ctx.Process(target=_server_process,
+                                       args=(child, index_url, turn_time, rate, workers), daemon=True)
+            self.process.start()
+        finally:
+            if saved is None:
+                del os.environ["PYDEVBATTLE_DATA_DIR"]
+            else:
+                os.environ["PYDEVBATTLE_DATA_DIR"] = saved
+        self.port = self._pipe.recv()
+        # Пустой сервер — точка отсчёта для памяти на комнату
+        self.baseline = self.stats()
+
+    def stats(self) -> Dict:
+        self._pipe.send("stats")
+        return self._pipe.recv()
+
+    def stop(self):
+        self._pipe.send("stop")
+        self.process.join(5)
+        self._stub_pipe.send("stop")
+        self.stub_process.join(5)
+        self._data_dir.cleanup()
+
+
+# === Клиенты ===
+class SimClient:
+    def __init__(self, reader, writer):
+        self.reader = reader
+        self.writer = writer
+
+    @classmethod
+    async def connect(cls, host, port):
+        reader, writer = await asyncio.open_connection(host, port, limit=MAX_LINE)
+        return cls(reader, writer)
+
+    def send(self, message):
+        self.writer.write(encode(message))
+
+    async def recv(self, *types) -> dict:
+        # Следующее сообщение нужного типа (ошибки пробрасываем)
+        while True:
+            line = await asyncio.wait_for(self.reader.readline(), RECV_TIMEOUT)
+            if not line:
+                raise ConnectionError("сервер закрыл соединение")
+            message = decode(line)
+            if message["type"] in types or message["type"] == "error":
+                return message
+
+    def close(self):
+        self.writer.close()
+
+
+class LoadStats:
+    def __init__(self):
+        self.rtts: List[float] = []   # секунды: ход отправлен → сервер ответил
+        self.moves = 0
+        self.games = 0
+        self.errors = 0
+        self.reasons: Dict[str, int] = {}
+        self.rooms_active = 0
+        self.rooms_peak = 0
+
+
+class Simulation:
+    def __init__(self, host, port, corpus: List[str], args):
+        self.host = host
+        self.port = port
+        self.corpus = corpus
+        self.args = args
+        self.stats = LoadStats()
+        self.stopping = False
+
+    def think_time(self, rng) -> float:
+        jitter = self.args.think_jitter
+        return self.args.think / 1000 * rng.uniform(1 - jitter, 1 + jitter)
+
+    def pick_name(self, rng, used) -> str:
+        # Иногда ошибаемся — так партии заканчиваются, как у людей
+        roll = rng.random()
+        if used and roll < self.args.mistake / 2:
+            return rng.choice(list(used))
+        if roll < self.args.mistake:
+            return f"no-such-package-{rng.randrange(10 ** 9)}"
+        for _ in range(20):
+            name = rng.choice(self.corpus)
+            if name not in used:
+                return name
+        return rng.choice(list(used))
+
+    async def play_room(self, index: int):
+        rng = random.Random(self.args.seed * 100_003 + index)
+        stats = self.stats
+        try:
+            players = [await SimClient.connect(self.host, self.port) for _ in range(2)]
+        except OSError:
+            stats.errors += 1
+            return
+        stats.rooms_active += 1
+        stats.rooms_peak = max(stats.rooms_peak, stats.rooms_active)
+        try:
+            # Играем до конца замера; недоигранную партию run() отменит
+            while not self.stopping:
+                await self.play_game(players, rng)
+        except (ConnectionError, asyncio.TimeoutError, ValueError, KeyError):
+            stats.errors += 1
+        finally:
+            stats.rooms_active -= 1
+            for client in players:
+                client.close()
+
+    async def play_game(self, players, rng):
+        stats = self.stats
+        host, guest = players
+        host.send({"type": "create", "name": "host"})
+        room = await host.recv("room")
+        guest.send({"type": "join", "code": room["code"], "name": "guest"})
+        await guest.recv("room")
+        start = await host.recv("start")
+        await guest.recv("start")
+
+        used = set()
+        turn = start["turn"]
+        while True:
+            mover, other = players[turn], players[1 - turn]
+            name = self.pick_name(rng, used)
+            think = self.think_time(rng)
+            if think > TYPING_DEBOUNCE:
+                await asyncio.sleep(think - TYPING_DEBOUNCE)
+                mover.send({"type": "typing", "name": name})
+                await asyncio.sleep(TYPING_DEBOUNCE)
+            else:
+                await asyncio.sleep(think)
+
+            if self.args.max_moves and len(used) >= self.args.max_moves and used:
+                name = rng.choice(list(used))  # длинная партия — пора заканчивать
+            sent = time.perf_counter()
+            mover.send({"type": "move", "name": name})
+            reply = await mover.recv("move", "end")
+            stats.rtts.append(time.perf_counter() - sent)
+            await other.recv("move", "end")
+
+            if reply["type"] == "move":
+                stats.moves += 1
+                used.add(reply["name"])
+                turn = reply["turn"]
+            elif reply["type"] == "end":
+                stats.games += 1
+                stats.reasons[reply["reason"]] = stats.reasons.get(reply["reason"], 0) + 1
+                return
+            else:
+                raise ValueError(reply.get("message"))
+
+    async def run(self, server: Optional[ServerHandle]):
+        args = self.args
+        started = time.monotonic()
+        tasks = []
+        for i in range(args.rooms):
+            # Плавный разгон, чтобы не устроить шторм подключений
+            await asyncio.sleep(max(0.0, started + args.ramp * i / args.rooms - time.monotonic()))
+            tasks.append(asyncio.create_task(self.play_room(i)))
+
+        # Замер — только после разгона
+        await asyncio.sleep(max(0.0, started + args.ramp - time.monotonic()))
+        measure_from = len(self.stats.rtts), self.stats.moves, self.stats.games
+        cpu_from = resource.getrusage(resource.RUSAGE_SELF)
+        server_from = server.stats() if server else None
+        wall_from = time.monotonic()
+
+        await asyncio.sleep(args.duration / 2)
+        server_mid = server.stats() if server else None
+        await asyncio.sleep(max(0.0, wall_from + args.duration - time.monotonic()))
+
+        wall = time.monotonic() - wall_from
+        cpu_to = resource.getrusage(resource.RUSAGE_SELF)
+        server_to = server.stats() if server else None
+        measured = self.stats.rtts[measure_from[0]:], self.stats.moves, self.stats.games
+        # Недоигранные партии не ждём. Флаг нужен и при отмене: wait_for
+        # в Python 3.11 иногда проглатывает её, если ответ пришёл одновременно
+        self.stopping = True
+        for task in tasks:
+            task.cancel()
+        await asyncio.gather(*tasks, return_exceptions=True)
+
+        return {
+            "rooms": args.rooms, "duration": wall, "think_ms": args.think, "stub_latency": args.stub_latency,
+            "moves": measured[1] - measure_from[1], "games": measured[2] - measure_from[2],
+            "rtt": percentiles(measured[0]), "errors": self.stats.errors, "reasons": self.stats.reasons,
+            "rooms_peak": self.stats.rooms_peak,
+            "client_cpu": (cpu_to.ru_utime + cpu_to.ru_stime - cpu_from.ru_utime - cpu_from.ru_stime) / wall,
+            "server": server_report(server.baseline, server_from, server_mid, server_to) if server else None,
+        }
+
+
+def percentiles(samples: List[float]) -> Dict[str, float]:
+    # Миллисекунды
+    if not samples:
+        return {}
+    ordered = sorted(samples)
+
+    def at(q):
+        return ordered[min(len(ordered) - 1, int(q * len(ordered)))] * 1000
+
+    return {"count": len(ordered), "p50": at(0.50), "p95": at(0.95), "p99": at(0.99), "max": ordered[-1] * 1000}
+
+
+def server_report(baseline, before, mid, after) -> Dict:
+    wall = after["wall"] - before["wall"]
+    # Память на комнату: прирост RSS от пустого сервера к середине замера
+    rooms = mid["rooms"] or 1
+    return {
+        "cpu": (after["cpu"] - before["cpu"]) / wall,
+        "rss_mb": mid["rss"] / 2 ** 20,
+        "rooms": mid["rooms"],
+        "connections": mid["connections"],
+        "bytes_per_room": (mid["rss"] - baseline["rss"]) / rooms,
+        "upstream": after["validation"]["upstream"] - before["validation"]["upstream"],
+        "checks": after["validation"]["checks"] - before["validation"]["checks"],
+        "shared": after["validation"]["shared"] - before["validation"]["shared"],
+        "limited": after["validation"]["limited"] - before["validation"]["limited"],
+        "unknown": after["validation"]["unknown"] - before["validation"]["unknown"],
+    }
+
+
+def format_report(r: Dict) -> str:
+    rtt = r["rtt"]
+    lines = [
+        f"Комнат: {r['rooms']} (пик {r['rooms_peak']}), замер {r['duration']:.1f} с, "
+        f"раздумье {r['think_ms']} мс, задержка индекса {r['stub_latency'] * 1000:.0f} мс",
+        f"Ходов: {r['moves']:,} ({r['moves'] / r['duration']:,.0f}/с), партий: {r['games']:,}, ошибок клиентов: {r['errors']}",
+    ]
+    if rtt:
+        lines.append(
+            f"Задержка хода, мс: p50 {rtt['p50']:.1f}  p95 {rtt['p95']:.1f}  p99 {rtt['p99']:.1f}  "
+            f"max {rtt['max']:.1f}  (n={rtt['count']:,})"
+        )
+    lines.append("Итоги партий: " + ", ".join(f"{k}: {v}" for k, v in sorted(r["reasons"].items())))
+    s = r["server"]
+    if s:
+        lines += [
+            f"Сервер: CPU {s['cpu']:.0%} ядра, RSS {s['rss_mb']:.1f} МБ, {s['rooms']} комнат / "
+            f"{s['connections']} соединений, ~{s['bytes_per_room'] / 1024:.1f} КБ на комнату",
+            f"Проверки: {s['checks']:,}, в индекс ушло {s['upstream']:,}, склеено {s['shared']:,}, "
+            f"упёрлось в лимит {s['limited']:,}, без ответа (ход засчитан) {s['unknown']:,}",
+        ]
+    lines.append(f"Генератор нагрузки: CPU {r['client_cpu']:.0%} ядра")
+    if r["client_cpu"] > 0.9:
+        lines.append("⚠ генератор упёрся в CPU — задержки завышены, запустите несколько генераторов")
+    return "\n".join(lines)
+
+
+def load_corpus(path: Optional[str], synthetic: int) -> List[str]:
+    if path:
+        with open(path, encoding="utf-8") as f:
+            names = [line.strip() for line in f if line.strip() and not line.startswith("#")]
+    else:
+        from bot_knowledge import get_knowledge_base
+        names = list(get_knowledge_base())
+    return names + [f"loadtest-pkg-{i}" for i in range(synthetic)]
+
+
+async def _main(args):
+    corpus = load_corpus(args.corpus, args.synthetic)
+    server = None
+    if args.connect:
+        host, port = parse_address(args.connect)
+    else:
+        server = ServerHandle(corpus, args.stub_latency, args.turn_time, args.rate, args.validation_workers)
+        host, port = "127.0.0.1", server.port
+
+    try:
+        return await Simulation(host, port, corpus, args).run(server)
+    finally:
+        if server:
+            server.stop()
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Нагрузочный тест онлайн-сервера")
+    parser.add_argument("--rooms", type=int, default=500)
+    parser.add_argument("--duration", type=float, default=20.0, help="секунд замера после разгона")
+    parser.add_argument("--ramp", type=float, default=5.0, help="секунд на подключение всех комнат")
+    parser.add_argument("--think", type=float, default=500.0, help="среднее раздумье над ходом, мс")
+    parser.add_argument("--think-jitter", type=float, default=0.5, help="разброс раздумья, доля")
+    parser.add_argument("--mistake", type=float, default=0.02, help="вероятность ошибочного хода")
+    parser.add_argument("--max-moves", type=int, default=60, help="после стольких ходов партию заканчивают")
+    parser.add_argument("--stub-latency", type=float, default=0.05, help="задержка ответа индекса, сек")
+    parser.add_argument("--turn-time", type=float, default=10.0)
+    parser.add_argument("--rate", type=float, default=0.0, help="лимит запросов сервера к индексу (0 — нет)")
+    parser.add_argument("--validation-workers", type=int, default=16, help="потоков проверки у сервера")
+    parser.add_argument("--synthetic", type=int, default=5000, help="синтетических имён в корпусе")
+    parser.add_argument("--corpus", default=None, help="файл с именами пакетов, по одному на строку")
+    parser.add_argument("--connect", default=None, help="нагружать уже запущенный сервер host:port")
+    parser.add_argument("--seed", type=int, default=0)
+    parser.add_argument("--json", default=None, help="сохранить результат в JSON")
+    args = parser.parse_args()
+
+    report = asyncio.run(_main(args))
+    print(format_report(report))
+    if args.json:
+        with open(args.json, "w", encoding="utf-8") as f:
+            json.dump(report, f, ensure_ascii=False, indent=2)
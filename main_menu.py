@@ -1,11 +1,15 @@
 import tkinter as tk
 from tkinter import messagebox
+import importlib
 import sys
 import os
-import webbrowser
+import threading
 
 sys.path.append(os.path.dirname(__file__))
 
+from metrics import LoopLagProbe, get_shared_metrics
+import profiling
+
 # Цвета (VS Code Dark+)
 BG = "#1e1e1e"
 FG = "white"
@@ -15,6 +19,13 @@ WARNING = "#d7ba7d"  # жёлтый
 DANGER = "#f44747"   # красный (quit)
 DARK_BG = "#2d2d2d"
 
+# Сколько держится надпись о профиле в углу окна, мс (ошибка — дольше)
+STATUS_MS = 4000
+ERROR_STATUS_MS = 10000
+
+# Режимы, которые подгружаются в фоне, пока игрок в меню
+PRELOAD_MODULES = ("game_view", "local_game", "bot_game", "online_game")
+
 
 class GameApp:
     def __init__(self, root):
@@ -31,15 +42,118 @@ class GameApp:
         self.settings = {
             "sound": True,
             "pypi_check": True,
-            "offline_mode": False
+            "offline_mode": False,
+            # Зеркало Simple API (devpi, корпоративный прокси); пусто — только pypi.org
+            "pypi_mirror": os.environ.get("PYPI_MIRROR", ""),
+            "bot_difficulty": "normal",
+            # Сервер онлайн-режима (python game_server.py) и имя игрока в комнате
+            "online_server": os.environ.get("PYDEVBATTLE_SERVER", "127.0.0.1:8765"),
+            "player_name": "",
+            # Журнал партий для разбора и повтора (python journal.py replay)
+            "journal": True,
+            # Прогрев кэша PyPI, пока открыто меню (python warmup.py — то же вручную)
+            "warmup_cache": True,
+            # Опечатка в несуществующем имени: подсказка и вторая попытка вместо поражения
+            "typo_recovery": False,
+            # Профиль каждой партии (иначе — по F4); sample или cprofile, секунд
+            "profile_games": False,
+            "profiler": os.environ.get("PYDEVBATTLE_PROFILER", "sample"),
+            "profile_seconds": profiling.PROFILE_SECONDS
         }
 
+        # Задержка цикла Tk меряется всё время: окна игр живут в том же цикле
+        self.metrics = get_shared_metrics()
+        self.lag_probe = LoopLagProbe(self.root, self.metrics)
+        self.lag_probe.start()
+        self.metrics_overlay = None
+        self.active_game = None
+        self.warmer = None
+        # Прогрев готовится в фоновом потоке, а партию начинают в основном:
+        # состояние прогрева меняется только под замком
+        self._warmup_lock = threading.Lock()
+        self._warmup_generation = 0
+        self._warmup_started = False
+        self._in_menu = True
+        self._profile_after = None
+        self._status_label = None
+        self._status_after = None
+
         self.bind_keys()
         self.show_main_menu()
+        # Меню уже нарисовано — остальное подгружаем в фоне
+        self.root.after_idle(self.preload_modes)
 
     def bind_keys(self):
         self.root.bind("<F11>", self.toggle_fullscreen)
         self.root.bind("<Escape>", self.on_escape)
+        # Отладочные метрики — из любого окна, в том числе из игры
+        self.root.bind_all("<F3>", self.toggle_metrics)
+        self.root.bind_all("<F4>", self.toggle_profiling)
+
+    def toggle_metrics(self, event=None):
+        if self.metrics_overlay is not None and self.metrics_overlay.is_open:
+            self.metrics_overlay.close()
+            self.metrics_overlay = None
+            return
+        from metrics_overlay import MetricsOverlay
+
+        self.metrics_overlay = MetricsOverlay(self.root, self.metrics)
+
+    # === Профиль ===
+    def toggle_profiling(self, event=None):
+        if profiling.active_capture() is not None:
+            self.stop_profiling()
+        else:
+            self.start_profiling()
+
+    def _describe_session(self):
+        # (режим, номер текущего хода) для имени файла профиля
+        game = self.active_game
+        if game is None or getattr(game, "game", None) is None:
+            return "menu", 0
+        return game.MODE, len(game.state.history) + 1
+
+    def start_profiling(self):
+        try:
+            profiling.start_capture(self.settings["profiler"], self._describe_session)
+        except (RuntimeError, ValueError) as e:
+            self.show_status(f"Профиль не запущен: {e}", DANGER, ERROR_STATUS_MS)
+            return
+        self._profile_after = self.root.after(int(self.settings["profile_seconds"] * 1000), self.stop_profiling)
+        self.show_status(f"⏺ Профиль ({self.settings['profiler']}) на {self.settings['profile_seconds']} с", WARNING)
+
+    def stop_profiling(self, status_window=None):
+        if self._profile_after is not None:
+            self.root.after_cancel(self._profile_after)
+            self._profile_after = None
+        try:
+            path = profiling.stop_capture()
+        except OSError as e:
+            self.show_status(f"Профиль не сохранён: {e}", DANGER, ERROR_STATUS_MS, status_window)
+            return
+        if path:
+            self.show_status(f"⏹ Профиль сохранён: {path}", ACCENT, window=status_window)
+
+    def show_status(self, text, color, duration_ms=STATUS_MS, window=None):
+        # Надпись в углу того окна, которое сейчас видно: в партии меню скрыто
+        self.hide_status()
+        if window is None:
+            window = getattr(self.active_game, "root", None) or self.root
+        self._status_label = tk.Label(window, text=text, font=("Consolas", 9), fg=color, bg=DARK_BG,
+                                      padx=8, pady=4, wraplength=500, justify="left")
+        self._status_label.place(relx=1.0, rely=1.0, x=-8, y=-8, anchor="se")
+        self._status_after = self.root.after(duration_ms, self.hide_status)
+
+    def hide_status(self):
+        if self._status_after is not None:
+            self.root.after_cancel(self._status_after)
+            self._status_after = None
+        if self._status_label is not None:
+            try:
+                self._status_label.destroy()
+            except tk.TclError:
+                pass  # окно партии уже закрыто вместе с надписью
+            self._status_label = None
 
     def toggle_fullscreen(self, event=None):
         self.is_fullscreen = not self.is_fullscreen
@@ -71,6 +185,8 @@ class GameApp:
         if hasattr(self, 'current_screen') and self.current_screen:
             self.current_screen.destroy()
         self.current_screen = ScreenClass(self.root, self)
+        if self._status_label is not None and self._status_label.winfo_exists():
+            self._status_label.lift()  # новый экран не перекрывает надпись о профиле
 
     # === Запуск режимов (заглушки) ===
     def start_local(self):
@@ -82,24 +198,128 @@ class GameApp:
     def start_vs_bot(self):
         self._launch_game("bot_game", "🤖 Режим против бота", "720x520")
 
+    # === Фоновая подгрузка режимов ===
+    def preload_modes(self):
+        threading.Thread(target=self._preload, name="preload", daemon=True).start()
+
+    def _preload(self):
+        # Только импорты и файлы, без Tk: виджеты создаются в основном потоке
+        for name in PRELOAD_MODULES:
+            try:
+                importlib.import_module(name)
+            except Exception:
+                return  # ошибку покажет _launch_game
+        try:
+            from audio import get_shared_audio
+            from fuzzy import get_shared_fuzzy
+            from validation import build_validation_chain
+
+            get_shared_audio()  # тоны генерируются здесь, а не при первом звуке
+            self._prepare_bot(self.settings["bot_difficulty"])
+            get_shared_fuzzy()  # таблица опечаток: снимок PyPI или база бота
+            # Снимок индекса, кэш на диске и (если нужна сеть) пул соединений
+            build_validation_chain(self.settings)
+        except Exception:
+            return
+        self.start_warmup()
+
+    def _prepare_bot(self, difficulty):
+        # База знаний, таблица алиасов уровня и (если бот ошибается «почти
+        # верно») таблица опечаток по базе — на большой базе это секунды,
+        # пусть их ждёт фон, а не окно партии
+        from bot_knowledge import get_knowledge_base
+        from bot_strategy import prepare_tables
+
+        prepare_tables(get_knowledge_base(), difficulty)
+
+    def prepare_bot(self, difficulty):
+        # Сменили сложность в настройках — таблицы нового уровня строятся в фоне
+        def run():
+            try:
+                self._prepare_bot(difficulty)
+            except Exception:
+                pass  # ошибку покажет окно партии
+
+        threading.Thread(target=run, name="preload", daemon=True).start()
+
+    # === Прогрев кэша PyPI ===
+    # Идёт, пока игрок в меню: партия его останавливает, возврат в меню
+    # продолжает (уже прогретые имена второй раз в сеть не уходят).
+    # Имена и отбор ключей готовятся в потоке "warmup"; если за это время
+    # началась партия или прогрев выключили, поколение сменилось, и
+    # подготовленный прогрев выбрасывается, не запустив потоков
+    def start_warmup(self, entering_menu=False):
+        with self._warmup_lock:
+            if entering_menu:
+                self._in_menu = True
+            if not self.settings["warmup_cache"] or not self._in_menu or self._warmup_started:
+                return
+            self._warmup_started = True
+            self._warmup_generation += 1
+            generation = self._warmup_generation
+        threading.Thread(target=self._warmup, args=(generation,), name="warmup", daemon=True).start()
+
+    def _warmup(self, generation):
+        try:
+            from warmup import prepare_warmup
+
+            warmer = prepare_warmup(self.settings)
+        except Exception:
+            warmer = None
+        with self._warmup_lock:
+            if generation != self._warmup_generation:
+                return
+            if warmer is None:
+                self._warmup_started = False
+                return
+            self.warmer = warmer.start()
+
+    def stop_warmup(self, leaving_menu=False):
+        with self._warmup_lock:
+            if leaving_menu:
+                self._in_menu = False
+            self._warmup_generation += 1
+            self._warmup_started = False
+            warmer, self.warmer = self.warmer, None
+        if warmer is not None:
+            warmer.stop()
+
     def _launch_game(self, module_name, title, geometry):
+        self.stop_warmup(leaving_menu=True)
         self.root.withdraw()
         try:
-            module = __import__(module_name)
+            module = importlib.import_module(module_name)
             game_win = tk.Toplevel()
             game_win.title(title)
             game_win.geometry(geometry)
             game_win.configure(bg=BG)
             game_win.protocol("WM_DELETE_WINDOW", lambda: self._on_game_close(game_win))
-            getattr(module, f"{module_name.replace('_', ' ').title().replace(' ', '')}App")(game_win, self.settings)
+            # Окно закрывается и крестиком, и в конце партии (end_game)
+            game_win.bind("<Destroy>", lambda event: event.widget is game_win and self._on_game_destroyed(),
+                          add="+")
+            self.active_game = getattr(module, f"{module_name.replace('_', ' ').title().replace(' ', '')}App")(
+                game_win, self.settings)
+            if self.settings["profile_games"] and profiling.active_capture() is None:
+                self.start_profiling()
         except Exception as e:
             messagebox.showerror("Ошибка", f"Не удалось запустить:\n{e}")
             self.root.deiconify()
+            self.start_warmup(entering_menu=True)
 
     def _on_game_close(self, win):
         win.destroy()
-        self.root.deiconify()
-        self.show_main_menu()
+
+    def _on_game_destroyed(self):
+        if profiling.active_capture() is not None:
+            # Окно партии уже закрывается — итог профиля показываем в меню
+            self.stop_profiling(status_window=self.root)
+        self.active_game = None
+        try:
+            self.root.deiconify()
+            self.show_main_menu()
+        except tk.TclError:
+            return  # закрывается всё приложение
+        self.start_warmup(entering_menu=True)
 
 
 # === Экран 1: Главное меню (4 кнопки) ===
@@ -177,10 +397,29 @@ class SettingsScreen:
         self.sound_var = tk.BooleanVar(value=app.settings["sound"])
         self.pypi_var = tk.BooleanVar(value=app.settings["pypi_check"])
         self.offline_var = tk.BooleanVar(value=app.settings["offline_mode"])
+        self.journal_var = tk.BooleanVar(value=app.settings["journal"])
+        self.warmup_var = tk.BooleanVar(value=app.settings["warmup_cache"])
+        self.typo_var = tk.BooleanVar(value=app.settings["typo_recovery"])
+        self.profile_var = tk.BooleanVar(value=app.settings["profile_games"])
 
         check_cfg = {"font": ("Consolas", 12), "bg": BG, "fg": FG, "selectcolor": "#3a3a3a"}
 
         tk.Checkbutton(self.frame, text="🔊 Звуки", variable=self.sound_var, command=self.apply, **check_cfg).pack(pady=6)
+        tk.Checkbutton(self.frame, text="📝 Журнал партий", variable=self.journal_var, command=self.apply, **check_cfg).pack(pady=6)
+        tk.Checkbutton(self.frame, text="🔥 Прогревать кэш PyPI в меню", variable=self.warmup_var, command=self.apply, **check_cfg).pack(pady=6)
+        tk.Checkbutton(self.frame, text="🤔 Подсказка при опечатке (одна за ход)", variable=self.typo_var, command=self.apply, **check_cfg).pack(pady=6)
+        tk.Checkbutton(self.frame, text="⏱ Профилировать партии (F4 — вручную)", variable=self.profile_var, command=self.apply, **check_cfg).pack(pady=6)
+
+        # Сложность бота
+        self.difficulty_var = tk.StringVar(value=app.settings["bot_difficulty"])
+        difficulty_frame = tk.Frame(self.frame, bg=BG)
+        difficulty_frame.pack(pady=6)
+        tk.Label(difficulty_frame, text="🤖 Бот:", font=("Consolas", 12), fg=FG, bg=BG).pack(side="left", padx=(0, 8))
+        for key, title in (("easy", "Лёгкий"), ("normal", "Средний"), ("hard", "Сложный")):
+            tk.Radiobutton(
+                difficulty_frame, text=title, value=key, variable=self.difficulty_var,
+                command=self.apply, **check_cfg
+            ).pack(side="left")
 
         # Кнопка полного экрана
         self.fs_btn = tk.Button(
@@ -199,11 +438,23 @@ class SettingsScreen:
         self.fs_btn.config(text="Полный экран")
 
     def apply(self):
+        difficulty = self.app.settings["bot_difficulty"]
         self.app.settings.update({
             "sound": self.sound_var.get(),
             "pypi_check": self.pypi_var.get(),
-            "offline_mode": self.offline_var.get()
+            "offline_mode": self.offline_var.get(),
+            "journal": self.journal_var.get(),
+            "warmup_cache": self.warmup_var.get(),
+            "typo_recovery": self.typo_var.get(),
+            "profile_games": self.profile_var.get(),
+            "bot_difficulty": self.difficulty_var.get()
         })
+        if self.app.settings["bot_difficulty"] != difficulty:
+            self.app.prepare_bot(self.app.settings["bot_difficulty"])
+        if self.app.settings["warmup_cache"]:
+            self.app.start_warmup()
+        else:
+            self.app.stop_warmup()
 
     def destroy(self):
         self.frame.destroy()
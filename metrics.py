@@ -0,0 +1,217 @@
+# metrics.py
+# Встроенные метрики: куда уходит время хода.
+# Гистограммы с фиксированными корзинами (мс) — запись стоит один bisect
+# под локом, память не растёт с числом наблюдений. Что меряем:
+#   validation_check_ms{source}   — вся проверка имени, source — кто ответил
+#                                   (memory / disk / index / pypi / mirror,
+#                                   shared — ждали чужую проверку, unknown)
+#   validation_backend_ms{backend} — один запрос к одному источнику
+#   clock_jitter_ms               — опоздание тика часов хода
+#   tk_loop_lag_ms                — задержка цикла Tk (проба через after)
+#   bot_move_ms{difficulty}       — выбор хода ботом
+#   threads{group}                — живые потоки по назначению
+# Так видно, «медленный PyPI» это или «занят поток окна».
+# Снимок выгружается в текст Prometheus или JSON (export()); оверлей
+# с этими же цифрами — metrics_overlay.py.
+import bisect
+import json
+import os
+import threading
+import time
+from typing import Callable, Dict, List, Optional, Tuple
+
+from pypi_cache import DATA_DIR
+
+METRICS_DIR = os.path.join(DATA_DIR, "metrics")
+# Верхние границы корзин, мс
+BUCKETS = (0.05, 0.1, 0.25, 0.5, 1, 2.5, 5, 10, 25, 50, 100, 250, 500, 1000, 2500, 5000, 10000)
+LAG_PROBE_MS = 100
+
+# Префикс имени потока → группа в метрике threads
+THREAD_GROUPS = ("validation", "audio", "journal", "preload", "warmup", "online-client", "asyncio")
+
+
+class Histogram:
+    def __init__(self, buckets=BUCKETS):
+        self.buckets = buckets
+        self.counts = [0] * (len(buckets) + 1)  # последняя — больше всех границ
+        self.count = 0
+        self.total = 0.0
+        self.max = 0.0
+        self._lock = threading.Lock()
+
+    def observe(self, value: float):
+        index = bisect.bisect_left(self.buckets, value)
+        with self._lock:
+            self.counts[index] += 1
+            self.count += 1
+            self.total += value
+            if value > self.max:
+                self.max = value
+
+    def percentile(self, q: float) -> float:
+        # Оценка по корзинам: линейно внутри корзины, в которую попал ранг
+        with self._lock:
+            counts, count, top = list(self.counts), self.count, self.max
+        if not count:
+            return 0.0
+        rank = q * count
+        seen = 0
+        for i, n in enumerate(counts):
+            if n and seen + n >= rank:
+                low = self.buckets[i - 1] if i else 0.0
+                high = self.buckets[i] if i < len(self.buckets) else top
+                return min(top, low + (high - low) * (rank - seen) / n)
+            seen += n
+        return top
+
+    def snapshot(self) -> Dict:
+        return {
+            "count": self.count, "sum": round(self.total, 3), "max": round(self.max, 3),
+            "p50": round(self.percentile(0.5), 3), "p95": round(self.percentile(0.95), 3),
+            "p99": round(self.percentile(0.99), 3),
+            "buckets": dict(zip([str(b) for b in self.buckets] + ["+Inf"], self.counts)),
+        }
+
+
+class Metrics:
+    def __init__(self):
+        self._histograms: Dict[Tuple[str, Tuple], Histogram] = {}
+        self._gauges: Dict[str, Callable[[], Dict[Tuple, float]]] = {}
+        self._lock = threading.Lock()
+        self.started = time.time()
+        self.gauge("threads", thread_counts)
+
+    def histogram(self, name: str, **labels) -> Histogram:
+        key = (name, tuple(sorted(labels.items())))
+        histogram = self._histograms.get(key)
+        if histogram is None:
+            with self._lock:
+                histogram = self._histograms.setdefault(key, Histogram())
+        return histogram
+
+    def observe(self, name: str, value: float, **labels):
+        self.histogram(name, **labels).observe(value)
+
+    def gauge(self, name: str, read: Callable[[], Dict[Tuple, float]]):
+        # read() → {метки (кортеж пар): значение}; вызывается только при снимке
+        self._gauges[name] = read
+
+    def histograms(self) -> List[Tuple[str, Tuple, Histogram]]:
+        with self._lock:
+            items = list(self._histograms.items())
+        return sorted((name, labels, h) for (name, labels), h in items)
+
+    # === Выгрузка ===
+    def snapshot(self) -> Dict:
+        data = {"time": round(time.time(), 3), "uptime": round(time.time() - self.started, 3),
+                "histograms": [], "gauges": []}
+        for name, labels, histogram in self.histograms():
+            data["histograms"].append(dict({"name": name, "labels": dict(labels)}, **histogram.snapshot()))
+        for name, read in sorted(self._gauges.items()):
+            for labels, value in sorted(read().items()):
+                data["gauges"].append({"name": name, "labels": dict(labels), "value": value})
+        return data
+
+    def to_json(self) -> str:
+        return json.dumps(self.snapshot(), ensure_ascii=False, indent=1)
+
+    def to_prometheus(self, prefix="pydevbattle_") -> str:
+        lines = []
+        typed = set()
+        for name, labels, histogram in self.histograms():
+            full = prefix + name
+            if full not in typed:
+                lines.append(f"# TYPE {full} histogram")
+                typed.add(full)
+            with histogram._lock:
+                counts, count, total = list(histogram.counts), histogram.count, histogram.total
+            cumulative = 0
+            for bound, n in zip([str(b) for b in histogram.buckets] + ["+Inf"], counts):
+                cumulative += n
+                lines.append(f"{full}_bucket{_labels(labels + (('le', bound),))} {cumulative}")
+            lines.append(f"{full}_sum{_labels(labels)} {total:.3f}")
+            lines.append(f"{full}_count{_labels(labels)} {count}")
+        for name, read in sorted(self._gauges.items()):
+            full = prefix + name
+            lines.append(f"# TYPE {full} gauge")
+            for labels, value in sorted(read().items()):
+                lines.append(f"{full}{_labels(labels)} {value}")
+        return "\n".join(lines) + "\n"
+
+    def export(self, path: Optional[str] = None) -> str:
+        # Формат — по расширению: .json → JSON, иначе текст Prometheus
+        if path is None:
+            path = os.path.join(METRICS_DIR, time.strftime("metrics-%Y%m%d-%H%M%S.prom"))
+        os.makedirs(os.path.dirname(path) or ".", exist_ok=True)
+        text = self.to_json() if path.endswith(".json") else self.to_prometheus()
+        tmp = path + ".tmp"
+        with open(tmp, "w", encoding="utf-8") as f:
+            f.write(text)
+        os.replace(tmp, path)
+        return path
+
+
+def _labels(labels: Tuple) -> str:
+    if not labels:
+        return ""
+    return "{" + ",".join(f'{key}="{value}"' for key, value in labels) + "}"
+
+
+def thread_counts() -> Dict[Tuple, float]:
+    counts = {}
+    for thread in threading.enumerate():
+        group = next((g for g in THREAD_GROUPS if thread.name.startswith(g)), "other")
+        if thread is threading.main_thread():
+            group = "main"
+        key = (("group", group),)
+        counts[key] = counts.get(key, 0) + 1
+    return counts
+
+
+class LoopLagProbe:
+    # Каждые interval_ms просим Tk разбудить нас; опоздание — время, которое
+    # цикл событий был занят чем-то другим (длинный обработчик, блокировка)
+    def __init__(self, root, metrics: "Metrics", interval_ms=LAG_PROBE_MS):
+        self.root = root
+        self.interval_ms = interval_ms
+        self.histogram = metrics.histogram("tk_loop_lag_ms")
+        self._after_id = None
+        self._expected = 0.0
+
+    def start(self):
+        if self._after_id is None:
+            self._schedule()
+
+    def _schedule(self):
+        self._expected = time.perf_counter() + self.interval_ms / 1000
+        self._after_id = self.root.after(self.interval_ms, self._fire)
+
+    def _fire(self):
+        self.histogram.observe(max(0.0, (time.perf_counter() - self._expected) * 1000))
+        self._schedule()
+
+    def stop(self):
+        if self._after_id is not None:
+            self.root.after_cancel(self._after_id)
+            self._after_id = None
+
+
+# === Общие метрики на процесс ===
+_shared_metrics = None
+_shared_lock = threading.Lock()
+
+
+def get_shared_metrics() -> Metrics:
+    global _shared_metrics
+    if _shared_metrics is None:
+        with _shared_lock:
+            if _shared_metrics is None:
+                _shared_metrics = Metrics()
+                # PYDEVBATTLE_METRICS=путь — выгрузить снимок при выходе
+                path = os.environ.get("PYDEVBATTLE_METRICS")
+                if path:
+                    import atexit
+
+                    atexit.register(_shared_metrics.export, path)
+    return _shared_metrics
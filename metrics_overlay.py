@@ -0,0 +1,90 @@
+# metrics_overlay.py
+# Отладочное окно с метриками (metrics.py) поверх игры: F3 в любом окне.
+# Обновляется раз в REFRESH_MS из потока Tk; кнопки выгружают снимок
+# в текст Prometheus или JSON в DATA_DIR/metrics.
+import os
+import time
+import tkinter as tk
+
+from metrics import METRICS_DIR, thread_counts
+
+REFRESH_MS = 500
+BG = "#1e1e1e"
+FG = "#d4d4d4"
+ACCENT = "#4ec9b0"
+FONT = ("Consolas", 9)
+
+TITLES = {
+    "validation_check_ms": "проверка",
+    "validation_backend_ms": "источник",
+    "clock_jitter_ms": "джиттер часов",
+    "tk_loop_lag_ms": "лаг цикла Tk",
+    "bot_move_ms": "ход бота",
+}
+
+
+def format_metrics(metrics) -> str:
+    lines = [f"{'':28} {'n':>7} {'p50':>8} {'p95':>8} {'p99':>8} {'max':>8}  мс"]
+    for name, labels, histogram in metrics.histograms():
+        title = TITLES.get(name, name)
+        if labels:
+            title += " [" + ",".join(str(value) for _, value in labels) + "]"
+        lines.append(f"{title[:28]:28} {histogram.count:7} {histogram.percentile(0.5):8.2f} "
+                     f"{histogram.percentile(0.95):8.2f} {histogram.percentile(0.99):8.2f} {histogram.max:8.2f}")
+    threads = ", ".join(f"{dict(labels)['group']}: {count}" for labels, count in sorted(thread_counts().items()))
+    lines.append("")
+    lines.append(f"потоки: {threads}")
+    return "\n".join(lines)
+
+
+class MetricsOverlay:
+    def __init__(self, root, metrics, refresh_ms=REFRESH_MS):
+        self.metrics = metrics
+        self.refresh_ms = refresh_ms
+        self._after_id = None
+
+        self.window = tk.Toplevel(root)
+        self.window.title("📊 Метрики")
+        self.window.configure(bg=BG)
+        self.window.attributes("-topmost", True)
+        self.window.protocol("WM_DELETE_WINDOW", self.close)
+
+        self.text_label = tk.Label(self.window, text="", font=FONT, fg=FG, bg=BG, justify="left", anchor="w")
+        self.text_label.pack(padx=10, pady=(10, 5), fill="x")
+
+        buttons = tk.Frame(self.window, bg=BG)
+        buttons.pack(pady=(0, 10))
+        for text, ext in (("⬇ Prometheus", ".prom"), ("⬇ JSON", ".json")):
+            tk.Button(buttons, text=text, font=FONT, bg="#3a3a3a", fg=FG, relief="flat",
+                      command=lambda ext=ext: self.export(ext)).pack(side=tk.LEFT, padx=5)
+        self.status_label = tk.Label(self.window, text="", font=FONT, fg=ACCENT, bg=BG)
+        self.status_label.pack(pady=(0, 8))
+
+        self.refresh()
+
+    @property
+    def is_open(self) -> bool:
+        return self.window is not None
+
+    def refresh(self):
+        self._after_id = None
+        if self.window is None:
+            return
+        self.text_label.config(text=format_metrics(self.metrics))
+        self._after_id = self.window.after(self.refresh_ms, self.refresh)
+
+    def export(self, ext):
+        path = os.path.join(METRICS_DIR, time.strftime("metrics-%Y%m%d-%H%M%S") + ext)
+        try:
+            self.status_label.config(text=f"сохранено: {self.metrics.export(path)}")
+        except OSError as e:
+            self.status_label.config(text=f"не удалось сохранить: {e}")
+
+    def close(self):
+        if self.window is None:
+            return
+        if self._after_id is not None:
+            self.window.after_cancel(self._after_id)
+            self._after_id = None
+        self.window.destroy()
+        self.window = None
@@ -1,6 +1,382 @@
-
+# online_game.py
+# Онлайн-режим: клиент сервера game_server.py (комнаты по коду).
+# Сеть живёт в фоновом потоке со своим asyncio-циклом, а сообщения сервера
+# попадают в Tk через CompletionQueue — окно никогда не ждёт сеть.
+# Правила и время хода решает сервер; у клиента — зеркало GameEngine для
+# отрисовки и мгновенных локальных подсказок.
+# asyncio импортируется в потоке клиента: окну он не нужен.
+import threading
 import tkinter as tk
-class OnlineGameApp:
+from tkinter import messagebox
+
+from game_clock import GameClock
+from fuzzy import suggest_names
+from game_engine import GAVE_UP, NOT_FOUND, TIMEOUT, GameEngine
+from game_view import ACCENT, BG, DANGER, WARNING, GameView
+from online_protocol import DEFAULT_ADDRESS, MAX_LINE, decode, encode, parse_address
+from validation_engine import CompletionQueue
+from validator import normalize_name
+
+CONNECT_TIMEOUT = 5.0
+TYPING_DEBOUNCE_MS = 250
+OPPONENT_COLOR = "#c586c0"
+
+
+class OnlineClient:
+    # Соединение с сервером; все колбэки вызываются в потоке Tk
+    def __init__(self, completions, on_message, on_disconnect, on_connected=None):
+        self.completions = completions
+        self.on_message = on_message
+        self.on_disconnect = on_disconnect
+        self.on_connected = on_connected
+        self._loop = None
+        self._writer = None
+        self._closing = False
+
+    def connect(self, host: str, port: int):
+        threading.Thread(target=self._run, args=(host, port), name="online-client", daemon=True).start()
+
+    def _run(self, host, port):
+        import asyncio
+
+        try:
+            asyncio.run(self._main(host, port))
+        except Exception as e:
+            self._report_disconnect(str(e))
+
+    async def _main(self, host, port):
+        import asyncio
+
+        try:
+            reader, writer = await asyncio.wait_for(
+                asyncio.open_connection(host, port, limit=MAX_LINE), CONNECT_TIMEOUT
+            )
+        except (OSError, asyncio.TimeoutError) as e:
+            self._report_disconnect(str(e) or "сервер не отвечает")
+            return
+
+        self._writer = writer
+        self._loop = asyncio.get_running_loop()
+        if self._closing:
+            writer.close()
+            return
+        if self.on_connected:
+            self.completions.put(self.on_connected)
+
+        error = None
+        try:
+            while True:
+                line = await reader.readline()
+                if not line:
+                    break
+                try:
+                    message = decode(line)
+                except ValueError:
+                    continue
+                self.completions.put(self.on_message, message)
+        except (ConnectionError, ValueError) as e:
+            error = str(e)
+        finally:
+            writer.close()
+        self._report_disconnect(error)
+
+    def _report_disconnect(self, error):
+        if not self._closing:
+            self.completions.put(self.on_disconnect, error)
+
+    def send(self, message: dict):
+        # Из потока Tk: запись выполнит цикл клиента
+        loop = self._loop
+        if loop is not None and not self._closing:
+            loop.call_soon_threadsafe(self._write, encode(message))
+
+    def _write(self, data):
+        if not self._writer.transport.is_closing():
+            self._writer.write(data)
+
+    def close(self):
+        if self._closing:
+            return
+        self._closing = True
+        loop = self._loop
+        if loop is not None:
+            try:
+                loop.call_soon_threadsafe(self._writer.close)
+            except RuntimeError:
+                pass  # цикл уже завершился
+
+
+class OnlineGameApp(GameView):
+    TITLE = "🐍 Python Developer Battle — Онлайн"
+    MODE = "online"
+    TITLE_FONT = ("Consolas", 18, "bold")
+    HINT = "Ходы проверяет сервер, время хода тоже считает он"
+
     def __init__(self, root, settings):
-        tk.Label(root, text="✅ Онлайн-режим запущен!\n(подключись к prosoft-people.online)", 
-                 font=("Consolas", 14), fg="white", bg="#1e1e1e").pack(expand=True)
+        # GameView.__init__ не вызываем: партия начнётся, когда сервер соберёт комнату
+        self.root = root
+        self.settings = settings
+        self.use_sound = settings.get("sound", True)
+        self.address = settings.get("online_server") or DEFAULT_ADDRESS
+
+        self.game = None
+        self.clock = None
+        self.my_player = None
+        self.waiting = False   # ход отправлен, ждём ответа сервера
+        self.finished = False
+        self._typing_after = None
+        self._sent_typing = ""
+        self._time_left = None
+
+        self.completions = CompletionQueue(self.root)
+        self.completions.start()
+        self.client = None
+        self.root.bind("<Destroy>", self._on_destroy, add="+")
+
+        self.setup_lobby()
+        self.connect()
+
+    # === Лобби ===
+    def setup_lobby(self):
+        self.lobby = tk.Frame(self.root, bg=BG)
+        self.lobby.pack(expand=True, fill="both")
+
+        tk.Label(self.lobby, text=self.TITLE, font=self.TITLE_FONT, fg=ACCENT, bg=BG).pack(pady=(30, 20))
+
+        self.status_label = tk.Label(self.lobby, text="", font=("Consolas", 11), fg=WARNING, bg=BG)
+        self.status_label.pack(pady=(0, 20))
+
+        name_frame = tk.Frame(self.lobby, bg=BG)
+        name_frame.pack(pady=6)
+        tk.Label(name_frame, text="Ваше имя:", font=("Consolas", 12), fg="white", bg=BG).pack(side=tk.LEFT, padx=(0, 10))
+        self.name_entry = tk.Entry(name_frame, font=("Consolas", 12), width=20, bg="#2d2d2d", fg="white",
+                                   insertbackground="white")
+        self.name_entry.insert(0, self.settings.get("player_name") or "Игрок")
+        self.name_entry.pack(side=tk.LEFT)
+
+        self.create_btn = tk.Button(
+            self.lobby, text="🆕 Создать комнату", font=("Consolas", 12, "bold"), width=24,
+            command=self.create_room, bg=ACCENT, fg="black", relief="flat", state="disabled"
+        )
+        self.create_btn.pack(pady=(20, 10))
+
+        code_frame = tk.Frame(self.lobby, bg=BG)
+        code_frame.pack(pady=6)
+        tk.Label(code_frame, text="Код:", font=("Consolas", 12), fg="white", bg=BG).pack(side=tk.LEFT, padx=(0, 10))
+        self.code_entry = tk.Entry(code_frame, font=("Consolas", 14), width=8, justify="center",
+                                   bg="#2d2d2d", fg="white", insertbackground="white")
+        self.code_entry.pack(side=tk.LEFT, padx=(0, 10))
+        self.code_entry.bind("<Return>", self.join_room)
+        self.join_btn = tk.Button(
+            code_frame, text="🔑 Войти", font=("Consolas", 12), command=self.join_room,
+            bg="#3a3a3a", fg="white", relief="flat", state="disabled"
+        )
+        self.join_btn.pack(side=tk.LEFT)
+
+        self.code_label = tk.Label(self.lobby, text="", font=("Consolas", 22, "bold"), fg=ACCENT, bg=BG)
+        self.code_label.pack(pady=(25, 5))
+
+        self.retry_btn = tk.Button(
+            self.lobby, text="🔄 Переподключиться", font=("Consolas", 11), command=self.connect,
+            bg="#3a3a3a", fg="white", relief="flat"
+        )
+
+    def set_status(self, text, color=WARNING):
+        self.status_label.config(text=text, fg=color)
+
+    def set_lobby_buttons(self, enabled: bool):
+        state = "normal" if enabled else "disabled"
+        self.create_btn.config(state=state)
+        self.join_btn.config(state=state)
+
+    def connect(self):
+        self.retry_btn.pack_forget()
+        try:
+            host, port = parse_address(self.address)
+        except ValueError:
+            self.set_status(f"Некорректный адрес сервера: {self.address}", DANGER)
+            return
+        self.set_status(f"Подключение к {host}:{port}…")
+        self.client = OnlineClient(self.completions, self.on_server_message, self.on_disconnect, self.on_connected)
+        self.client.connect(host, port)
+
+    def on_connected(self):
+        self.set_status(f"Подключено к {self.address}", ACCENT)
+        self.set_lobby_buttons(True)
+
+    def create_room(self):
+        self.set_lobby_buttons(False)
+        self.set_status("Создаём комнату…")
+        self.client.send({"type": "create", "name": self.name_entry.get()})
+
+    def join_room(self, event=None):
+        code = self.code_entry.get().strip().upper()
+        if not code or self.join_btn.cget("state") == "disabled":
+            return
+        self.set_lobby_buttons(False)
+        self.set_status(f"Входим в комнату {code}…")
+        self.client.send({"type": "join", "code": code, "name": self.name_entry.get()})
+
+    # === Сообщения сервера ===
+    def on_server_message(self, message):
+        handler = {
+            "room": self.on_room,
+            "start": self.on_start,
+            "move": self.on_server_move,
+            "end": self.on_server_end,
+            "error": self.on_server_error,
+        }.get(message["type"])
+        if handler is not None and not self.finished:
+            handler(message)
+
+    def on_room(self, message):
+        self.my_player = message["player"]
+        self.code_label.config(text=f"Код комнаты: {message['code']}")
+        if self.my_player == 0:
+            self.set_status("Ждём соперника — сообщите ему код комнаты")
+        else:
+            self.set_status("Ждём начала партии…")
+
+    def on_server_error(self, message):
+        if self.game is None:
+            self.set_status(message.get("message", "Ошибка сервера"), DANGER)
+            self.set_lobby_buttons(self.my_player is None)
+        else:
+            self.hint_label.config(text=message.get("message", "Ошибка сервера"), fg=DANGER)
+
+    def on_start(self, message):
+        self.lobby.destroy()
+        self.PLAYERS = tuple(message["players"])
+        self.TURN_COLORS = tuple(ACCENT if i == self.my_player else OPPONENT_COLOR for i in range(len(self.PLAYERS)))
+        self.TIME_LIMIT = message["turn_time"]
+        self.root.title(f"🌍 Онлайн — комната {message['code']}")
+
+        self.game = GameEngine(self.PLAYERS, self.make_recorder())
+        self.clock = GameClock(self.root, self.TIME_LIMIT, players=len(self.PLAYERS),
+                               on_tick=self.update_timer_display, on_timeout=self.on_timeout)
+        self._time_left = message["time_left"]
+        self.setup_ui()
+        self.update_turn_display()
+        self.start_timer()
+
+    def on_server_move(self, message):
+        self.waiting = False
+        self._time_left = message.get("time_left")
+        move = self.game.submit_move(message["name"])
+        self.hint_label.config(text=self.HINT, fg="#6a9955")
+        self.play_sound("success")
+        self.on_move_accepted(move)
+
+    def on_server_end(self, message):
+        self.waiting = False
+        if self.game is None:
+            self.set_status("Комната закрыта", DANGER)
+            return
+
+        reason, loser, name = message["reason"], message["loser"], message.get("name")
+        players = self.state.players
+        self.game.finish(loser, reason)
+        if reason == TIMEOUT:
+            self.play_sound("timeout")
+            messagebox.showerror("⏰ Тайм-аут!", f"{players[loser]} не успел(а) назвать библиотеку!")
+        elif reason == GAVE_UP:
+            messagebox.showinfo("🌍 Соперник вышел", f"{players[loser]} покинул(а) игру.")
+        elif reason in self.ERRORS:
+            self.play_sound()
+            message = self.ERRORS[reason].format(lib=name)
+            # Ход уже решён сервером: подсказка только для сведения
+            suggestions = suggest_names(name) if reason == NOT_FOUND and name else []
+            if suggestions:
+                message += f"\nВозможно, имелось в виду: {', '.join(suggestions)}"
+            messagebox.showerror("❌ Ошибка", message)
+        self.end_game()
+
+    def on_disconnect(self, error):
+        if self.finished:
+            return
+        if self.game is not None:
+            messagebox.showerror("🌐 Связь потеряна", f"Соединение с сервером {self.address} прервано.")
+            self.shutdown()
+            self.root.destroy()
+            return
+        self.my_player = None
+        self.code_label.config(text="")
+        self.set_lobby_buttons(False)
+        self.set_status(f"Нет связи с {self.address}" + (f": {error}" if error else ""), DANGER)
+        self.retry_btn.pack(pady=10)
+
+    # === Ходы ===
+    def is_human_turn(self) -> bool:
+        return (self.game is not None and not self.finished and not self.waiting
+                and self.state.current_turn == self.my_player)
+
+    def format_history(self, player, name) -> str:
+        who = "Вы" if player == self.my_player else self.state.players[player]
+        return f"[{who}] {name}"
+
+    def result_text(self, result) -> str:
+        if result.winner is None:
+            return "🤝 Ничья!"
+        if result.winner == self.my_player:
+            return "🏆 Вы победили!"
+        return f"😞 Победил(а) {self.state.players[result.winner]}"
+
+    def start_timer(self):
+        # Остаток хода берём из сообщения сервера
+        self._cancel_typing()
+        self._sent_typing = ""
+        self.clock.start_turn(self.state.current_turn, self._time_left)
+
+    def on_timeout(self, player=None):
+        # Тайм-аут объявляет сервер; локальные часы только показывают ноль
+        self.hint_label.config(text="⏰ Время вышло — ждём решения сервера…", fg=DANGER)
+
+    def on_typing(self, event=None):
+        if not self.is_human_turn():
+            return
+        self._cancel_typing()
+        self._typing_after = self.root.after(TYPING_DEBOUNCE_MS, self._send_typing)
+
+    def _send_typing(self):
+        self._typing_after = None
+        lib = normalize_name(self.entry.get())
+        # Серверу шлём только догадки, которые пройдут локальные проверки
+        if lib != self._sent_typing and self.game.check_move(lib) is None:
+            self._sent_typing = lib
+            self.client.send({"type": "typing", "name": lib})
+
+    def _cancel_typing(self):
+        if self._typing_after is not None:
+            self.root.after_cancel(self._typing_after)
+            self._typing_after = None
+
+    def on_submit(self, event=None):
+        if not self.is_human_turn() or not self.clock.running:
+            return
+
+        lib = self.entry.get().strip()
+        if not lib:
+            return
+
+        # Часы стоят, пока сервер проверяет ход
+        self.clock.pause()
+        self.waiting = True
+        self._cancel_typing()
+        self.update_turn_display()
+        self.hint_label.config(text=f"⏳ Сервер проверяет «{lib}»…", fg=WARNING)
+        self.client.send({"type": "move", "name": lib})
+
+    # === Завершение ===
+    def shutdown(self):
+        self.finished = True
+        self._cancel_typing()
+        if self.clock is not None:
+            self.clock.stop()
+        self.completions.stop()
+        if self.client is not None:
+            self.client.close()
+
+    def _on_destroy(self, event):
+        # Окно закрыли крестиком: соединение, часы и опрос больше не нужны
+        if event.widget is self.root:
+            self.shutdown()
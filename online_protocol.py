@@ -0,0 +1,59 @@
+# online_protocol.py
+# Протокол онлайн-режима: JSON-объекты по одному на строку поверх TCP.
+#
+# Клиент → сервер:
+#   {"type": "create", "name": "Аня"}              — новая комната
+#   {"type": "join", "code": "K7QXM", "name": "Боря"} — войти по коду
+#   {"type": "typing", "name": "reque"}            — догадка во время набора
+#   {"type": "move", "name": "requests"}           — ход
+#   {"type": "leave"}, {"type": "ping"}
+#
+# Сервер → клиент:
+#   {"type": "room", "code", "player"}             — вы в комнате под номером player
+#   {"type": "start", "code", "players", "turn", "turn_time", "time_left"}
+#   {"type": "move", "player", "name", "turn", "scores", "time_left"} — ход принят
+#   {"type": "end", "reason", "loser", "winner", "scores", "name"}   — партия окончена
+#   {"type": "error", "code", "message"}, {"type": "pong"}
+#
+# Время хода считает только сервер; time_left — остаток нового хода
+# на момент отправки, клиент по нему рисует свой таймер.
+import json
+from typing import Tuple
+
+DEFAULT_HOST = "127.0.0.1"
+DEFAULT_PORT = 8765
+DEFAULT_ADDRESS = f"{DEFAULT_HOST}:{DEFAULT_PORT}"
+
+# Длиннее строки сервер не читает (лимит буфера StreamReader)
+MAX_LINE = 4096
+MAX_NAME_LEN = 100       # имя пакета
+MAX_PLAYER_NAME_LEN = 32
+
+# Коды ошибок
+BAD_REQUEST = "bad_request"
+ROOM_NOT_FOUND = "room_not_found"
+ROOM_FULL = "room_full"
+SERVER_FULL = "server_full"
+NOT_YOUR_TURN = "not_your_turn"
+NOT_IN_GAME = "not_in_game"
+ALREADY_IN_ROOM = "already_in_room"
+
+
+def encode(message: dict) -> bytes:
+    return json.dumps(message, ensure_ascii=False, separators=(",", ":")).encode("utf-8") + b"\n"
+
+
+def decode(line: bytes) -> dict:
+    # ValueError — не JSON-объект или нет поля type
+    message = json.loads(line)
+    if not isinstance(message, dict) or not isinstance(message.get("type"), str):
+        raise ValueError("ожидался JSON-объект с полем type")
+    return message
+
+
+def parse_address(address: str) -> Tuple[str, int]:
+    # "host:port", "host" или ":port"
+    host, _, port = address.strip().rpartition(":")
+    if not _:
+        return address.strip() or DEFAULT_HOST, DEFAULT_PORT
+    return host or DEFAULT_HOST, int(port) if port else DEFAULT_PORT
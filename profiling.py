@@ -0,0 +1,200 @@
+# profiling.py
+# Профиль живой партии по требованию: F4 в любом окне или настройка
+# «профилировать партии». Пока запись выключена, стоимость — одна проверка
+# глобальной переменной на проверку имени, так что хук живёт и в релизе.
+#
+# Два вида записи:
+#   sample   — поток-сэмплер каждые SAMPLE_INTERVAL снимает стеки всех потоков
+#              (sys._current_frames): почти без накладных расходов, видно и
+#              поток Tk, и потоки проверок. Файл .folded — формат
+#              flamegraph.pl / speedscope / inferno.
+#   cprofile — cProfile на потоке Tk (цикл mainloop со всеми обработчиками)
+#              и на каждой проверке в пуле ValidationEngine; итог — один
+#              .pstats (python -m pstats, snakeviz).
+# Имя файла: profile-<режим>-turn<с>-<по>-<время>.<ext>.
+import os
+import sys
+import threading
+import time
+from typing import Callable, Optional, Tuple
+
+from pypi_cache import DATA_DIR
+
+PROFILE_DIR = os.path.join(DATA_DIR, "profiles")
+PROFILE_SECONDS = 10
+SAMPLE_INTERVAL = 0.005
+KINDS = ("sample", "cprofile")
+
+# Текущая запись; None — профилирование выключено
+_active = None
+_active_lock = threading.Lock()
+
+
+def profiled(fn, *args):
+    # Обёртка для задач пулов: без записи — прямой вызов
+    capture = _active
+    if capture is None:
+        return fn(*args)
+    return capture.run_worker(fn, *args)
+
+
+class StackSampler:
+    def __init__(self, interval=SAMPLE_INTERVAL):
+        self.interval = interval
+        self.counts = {}
+        self.samples = 0
+        self._stop = threading.Event()
+        self._thread = threading.Thread(target=self._run, name="profiler-sampler", daemon=True)
+
+    def start(self):
+        self._thread.start()
+
+    def stop(self):
+        self._stop.set()
+        self._thread.join()
+
+    def _run(self):
+        own = threading.get_ident()
+        names = {}
+        while not self._stop.wait(self.interval):
+            frames = sys._current_frames()
+            if frames.keys() - names.keys():
+                names = {t.ident: t.name for t in threading.enumerate()}
+            for ident, frame in frames.items():
+                if ident == own:
+                    continue
+                stack = []
+                while frame is not None:
+                    code = frame.f_code
+                    stack.append(f"{code.co_name} ({os.path.basename(code.co_filename)}:{code.co_firstlineno})")
+                    frame = frame.f_back
+                stack.append(names.get(ident, "thread"))
+                key = ";".join(reversed(stack))
+                self.counts[key] = self.counts.get(key, 0) + 1
+            self.samples += 1
+
+    def write(self, path):
+        with open(path, "w", encoding="utf-8") as f:
+            for stack, count in sorted(self.counts.items()):
+                f.write(f"{stack} {count}\n")
+
+
+class ProfileCapture:
+    def __init__(self, kind: str, describe: Callable[[], Tuple[str, int]], directory: str = PROFILE_DIR):
+        # describe() → (режим, номер хода): спрашиваем в начале и в конце записи
+        if kind not in KINDS:
+            raise ValueError(f"неизвестный профайлер: {kind}")
+        self.kind = kind
+        self.describe = describe
+        self.directory = directory
+        self.mode, self.first_turn = describe()
+        self.started = time.time()
+        self._sampler = None
+        self._main = None
+        self._workers = {}  # id потока → cProfile.Profile
+        self._lock = threading.Lock()
+
+    def start(self):
+        # Вызывать из потока Tk: cProfile записывает поток, в котором включён
+        if self.kind == "sample":
+            self._sampler = StackSampler()
+            self._sampler.start()
+        else:
+            import cProfile
+
+            self._main = cProfile.Profile()
+            self._main.enable()
+
+    def run_worker(self, fn, *args):
+        if self.kind != "cprofile":
+            return fn(*args)  # сэмплер и так видит все потоки
+        import cProfile
+
+        ident = threading.get_ident()
+        with self._lock:
+            profile = self._workers.get(ident)
+            if profile is None:
+                profile = self._workers[ident] = cProfile.Profile()
+        try:
+            profile.enable()
+        except ValueError:
+            # Python 3.12+: один профайлер на процесс, он уже видит и этот поток
+            return fn(*args)
+        try:
+            return fn(*args)
+        finally:
+            profile.disable()
+
+    def stop(self) -> str:
+        mode, last_turn = self.describe()
+        os.makedirs(self.directory, exist_ok=True)
+        stamp = time.strftime("%Y%m%d-%H%M%S", time.localtime(self.started))
+        base = os.path.join(self.directory, f"profile-{mode}-turn{self.first_turn}-{last_turn}-{stamp}")
+        if self._sampler is not None:
+            self._sampler.stop()
+            path = base + ".folded"
+            self._sampler.write(path)
+            return path
+
+        import pstats
+
+        self._main.disable()
+        with self._lock:
+            workers = [p for p in self._workers.values() if p.getstats()]
+        stats = pstats.Stats(self._main)
+        for profile in workers:
+            stats.add(profile)
+        path = base + ".pstats"
+        stats.dump_stats(path)
+        return path
+
+
+def active_capture() -> Optional[ProfileCapture]:
+    return _active
+
+
+def start_capture(kind: str, describe: Callable[[], Tuple[str, int]]) -> ProfileCapture:
+    global _active
+    with _active_lock:
+        if _active is not None:
+            raise RuntimeError("профиль уже пишется")
+        capture = ProfileCapture(kind, describe)
+        capture.start()
+        _active = capture
+    return capture
+
+
+def stop_capture() -> Optional[str]:
+    # Путь к файлу профиля; None — записи не было
+    global _active
+    with _active_lock:
+        capture, _active = _active, None
+    return capture.stop() if capture is not None else None
+
+
+if __name__ == "__main__":
+    import argparse
+
+    # Сводка по .folded без внешних инструментов (для .pstats — python -m pstats)
+    parser = argparse.ArgumentParser(description="Самые частые функции в профиле .folded")
+    parser.add_argument("path")
+    parser.add_argument("--top", type=int, default=20)
+    parser.add_argument("--thread", default=None, help="только потоки с этим префиксом имени")
+    args = parser.parse_args()
+
+    own, total, samples = {}, {}, 0
+    with open(args.path, encoding="utf-8") as f:
+        for line in f:
+            stack, _, count = line.rstrip("\n").rpartition(" ")
+            frames = stack.split(";")
+            if args.thread and not frames[0].startswith(args.thread):
+                continue
+            count = int(count)
+            samples += count
+            own[frames[-1]] = own.get(frames[-1], 0) + count
+            for frame in set(frames[1:]):
+                total[frame] = total.get(frame, 0) + count
+    print(f"сэмплов: {samples}")
+    print(f"{'своё':>7} {'всего':>7}  функция")
+    for frame, count in sorted(own.items(), key=lambda item: -item[1])[:args.top]:
+        print(f"{count / samples:7.1%} {total.get(frame, 0) / samples:7.1%}  {frame}")
@@ -0,0 +1,169 @@
+# pypi_cache.py
+# Постоянный кэш проверок PyPI, общий для всех режимов игры и всех окон.
+# Хранится в SQLite (WAL), поэтому его можно одновременно читать и писать
+# из нескольких потоков и процессов.
+import os
+import sqlite3
+import threading
+import time
+from typing import Optional
+
+from validator import canonical_name
+
+# Где лежит кэш (можно переопределить переменной окружения)
+DATA_DIR = os.environ.get(
+    "PYDEVBATTLE_DATA_DIR",
+    os.path.join(os.path.expanduser("~"), ".python_developer_battle")
+)
+DEFAULT_CACHE_PATH = os.path.join(DATA_DIR, "pypi_cache.sqlite3")
+
+# Сколько живут записи: найденный пакет почти никогда не исчезает,
+# а ненайденный могут опубликовать в любой момент
+POSITIVE_TTL = 7 * 24 * 3600
+NEGATIVE_TTL = 6 * 3600
+
+# Ограничение размера: при превышении удаляем самые старые записи
+MAX_ENTRIES = 50_000
+EVICT_CHECK_EVERY = 256
+
+class PyPICache:
+    def __init__(self, path=DEFAULT_CACHE_PATH, positive_ttl=POSITIVE_TTL,
+                 negative_ttl=NEGATIVE_TTL, max_entries=MAX_ENTRIES):
+        self.path = path
+        self.positive_ttl = positive_ttl
+        self.negative_ttl = negative_ttl
+        self.max_entries = max_entries
+
+        # Отдельное соединение на каждый поток: sqlite3 не любит общих
+        self._local = threading.local()
+        self._writes = 0
+        self._writes_lock = threading.Lock()
+        self.available = True
+
+        try:
+            os.makedirs(os.path.dirname(os.path.abspath(path)), exist_ok=True)
+            conn = self._connect()
+            conn.execute(
+                "CREATE TABLE IF NOT EXISTS packages ("
+                " name TEXT PRIMARY KEY,"
+                " exists_flag INTEGER NOT NULL,"
+                " checked_at REAL NOT NULL"
+                ") WITHOUT ROWID"
+            )
+            conn.execute("CREATE INDEX IF NOT EXISTS packages_checked_at ON packages(checked_at)")
+            conn.commit()
+        except (OSError, sqlite3.Error):
+            # Нет доступа к диску — игра работает и без кэша
+            self.available = False
+
+    def _connect(self):
+        conn = getattr(self._local, "conn", None)
+        if conn is None:
+            conn = sqlite3.connect(self.path, timeout=2.0, isolation_level=None)
+            conn.execute("PRAGMA journal_mode=WAL")
+            conn.execute("PRAGMA synchronous=NORMAL")
+            conn.execute("PRAGMA busy_timeout=2000")
+            self._local.conn = conn
+        return conn
+
+    # === Чтение / запись ===
+    def get(self, name: str) -> Optional[bool]:
+        # True / False — ответ из кэша, None — записи нет или она устарела
+        if not self.available:
+            return None
+        try:
+            row = self._connect().execute(
+                "SELECT exists_flag, checked_at FROM packages WHERE name = ?",
+                (canonical_name(name),)
+            ).fetchone()
+        except sqlite3.Error:
+            return None
+        if row is None:
+            return None
+        exists, checked_at = bool(row[0]), row[1]
+        ttl = self.positive_ttl if exists else self.negative_ttl
+        if time.time() - checked_at > ttl:
+            return None
+        return exists
+
+    def set(self, name: str, exists: bool):
+        if not self.available:
+            return
+        try:
+            self._connect().execute(
+                "INSERT OR REPLACE INTO packages (name, exists_flag, checked_at) VALUES (?, ?, ?)",
+                (canonical_name(name), int(bool(exists)), time.time())
+            )
+        except sqlite3.Error:
+            return
+
+        with self._writes_lock:
+            self._writes += 1
+            need_evict = self._writes % EVICT_CHECK_EVERY == 0
+        if need_evict:
+            self.evict()
+
+    def evict(self):
+        # Удаляем просроченные записи, затем самые старые сверх лимита
+        if not self.available:
+            return
+        now = time.time()
+        try:
+            conn = self._connect()
+            conn.execute("BEGIN IMMEDIATE")
+            try:
+                conn.execute(
+                    "DELETE FROM packages WHERE (exists_flag = 1 AND checked_at < ?)"
+                    " OR (exists_flag = 0 AND checked_at < ?)",
+                    (now - self.positive_ttl, now - self.negative_ttl)
+                )
+                (count,) = conn.execute("SELECT COUNT(*) FROM packages").fetchone()
+                extra = count - self.max_entries
+                if extra > 0:
+                    conn.execute(
+                        "DELETE FROM packages WHERE name IN ("
+                        " SELECT name FROM packages ORDER BY checked_at LIMIT ?)",
+                        (extra,)
+                    )
+                conn.execute("COMMIT")
+            except sqlite3.Error:
+                conn.execute("ROLLBACK")
+                raise
+        except sqlite3.Error:
+            pass
+
+    def __len__(self):
+        if not self.available:
+            return 0
+        try:
+            return self._connect().execute("SELECT COUNT(*) FROM packages").fetchone()[0]
+        except sqlite3.Error:
+            return 0
+
+    def clear(self):
+        if not self.available:
+            return
+        try:
+            self._connect().execute("DELETE FROM packages")
+        except sqlite3.Error:
+            pass
+
+    def close(self):
+        conn = getattr(self._local, "conn", None)
+        if conn is not None:
+            conn.close()
+            self._local.conn = None
+
+
+# === Общий экземпляр на процесс ===
+_shared_cache = None
+_shared_lock = threading.Lock()
+
+
+def get_shared_cache() -> PyPICache:
+    global _shared_cache
+    if _shared_cache is None:
+        with _shared_lock:
+            if _shared_cache is None:
+                _shared_cache = PyPICache()
+    return _shared_cache
@@ -0,0 +1,198 @@
+# pypi_index.py
+# Офлайн-снимок всех имён проектов PyPI (в нормализованном виде PEP 503).
+#
+# Формат файла (little-endian):
+#   заголовок  — MAGIC, версия, число имён, размер фильтра Блума (бит), k
+#   фильтр Блума — bloom_bits / 8 байт
+#   смещения   — (count + 1) × uint32, начало каждого имени в блоке имён
+#   имена      — отсортированные UTF-8 строки подряд, без разделителей
+#
+# Файл открывается через mmap, поэтому загрузка занимает миллисекунды,
+# а в памяти процесса остаются только реально прочитанные страницы.
+import hashlib
+import mmap
+import os
+import struct
+import sys
+import threading
+from typing import Iterable, Optional
+
+from pypi_cache import DATA_DIR
+from validator import canonical_name, canonical_names
+
+MAGIC = b"PDBIDX\x00\x01"
+HEADER = struct.Struct("<8sIIII")  # magic, version, count, bloom_bits, bloom_k
+VERSION = 1
+
+DEFAULT_INDEX_PATH = os.path.join(DATA_DIR, "pypi_index.bin")
+# Снимок, поставляемый вместе с игрой (если есть)
+BUNDLED_INDEX_PATH = os.path.join(os.path.dirname(os.path.abspath(__file__)), "data", "pypi_index.bin")
+
+BITS_PER_NAME = 10  # ≈1% ложных срабатываний
+BLOOM_K = 7
+
+SIMPLE_INDEX_URL = "https://pypi.org/simple/"
+
+
+def _bloom_hashes(key: bytes, bits: int, k: int):
+    # Двойное хеширование: h1 + i·h2 — достаточно одного blake2b на имя
+    digest = hashlib.blake2b(key, digest_size=16).digest()
+    h1 = int.from_bytes(digest[:8], "little")
+    h2 = int.from_bytes(digest[8:], "little") | 1
+    return [(h1 + i * h2) % bits for i in range(k)]
+
+
+class PyPIIndex:
+    def __init__(self, path: str):
+        self.path = path
+        with open(path, "rb") as f:
+            self._mm = mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ)
+
+        magic, version, count, bloom_bits, bloom_k = HEADER.unpack_from(self._mm, 0)
+        if magic != MAGIC or version != VERSION:
+            self._mm.close()
+            raise ValueError(f"{path}: не является индексом PyPI версии {VERSION}")
+
+        self.count = count
+        self._bloom_bits = bloom_bits
+        self._bloom_k = bloom_k
+
+        view = memoryview(self._mm)
+        bloom_start = HEADER.size
+        offsets_start = bloom_start + bloom_bits // 8
+        names_start = offsets_start + 4 * (count + 1)
+        self._bloom = view[bloom_start:offsets_start]
+        self._offsets = view[offsets_start:names_start].cast("I")
+        self._names = view[names_start:]
+
+    def __len__(self):
+        return self.count
+
+    def name_at(self, i: int) -> str:
+        return bytes(self._names[self._offsets[i]:self._offsets[i + 1]]).decode("utf-8")
+
+    def _maybe_contains(self, key: bytes) -> bool:
+        bloom = self._bloom
+        for bit in _bloom_hashes(key, self._bloom_bits, self._bloom_k):
+            if not bloom[bit >> 3] & (1 << (bit & 7)):
+                return False
+        return True
+
+    def _find(self, key: bytes) -> int:
+        # Бинарный поиск по отсортированному блоку имён
+        offsets, names = self._offsets, self._names
+        lo, hi = 0, self.count
+        while lo < hi:
+            mid = (lo + hi) // 2
+            current = names[offsets[mid]:offsets[mid + 1]].tobytes()
+            if current < key:
+                lo = mid + 1
+            elif current > key:
+                hi = mid
+            else:
+                return mid
+        return -1
+
+    def __contains__(self, name: str) -> bool:
+        key = canonical_name(name).encode("utf-8")
+        if not self._maybe_contains(key):
+            return False
+        return self._find(key) >= 0
+
+    def __iter__(self):
+        for i in range(self.count):
+            yield self.name_at(i)
+
+    def close(self):
+        self._bloom.release()
+        self._offsets.release()
+        self._names.release()
+        self._mm.close()
+
+
+# === Сборка индекса ===
+def build_index(names: Iterable[str], path: str = DEFAULT_INDEX_PATH) -> int:
+    keys = sorted({key.encode("utf-8") for key in canonical_names(names) if key})
+    count = len(keys)
+
+    bloom_bits = max(64, count * BITS_PER_NAME)
+    bloom_bits += -bloom_bits % 64  # кратно 8 байтам, чтобы смещения были выровнены
+    bloom = bytearray(bloom_bits // 8)
+    for key in keys:
+        for bit in _bloom_hashes(key, bloom_bits, BLOOM_K):
+            bloom[bit >> 3] |= 1 << (bit & 7)
+
+    offsets = [0] * (count + 1)
+    pos = 0
+    for i, key in enumerate(keys):
+        pos += len(key)
+        offsets[i + 1] = pos
+
+    os.makedirs(os.path.dirname(os.path.abspath(path)), exist_ok=True)
+    tmp_path = path + ".tmp"
+    with open(tmp_path, "wb") as f:
+        f.write(HEADER.pack(MAGIC, VERSION, count, bloom_bits, BLOOM_K))
+        f.write(bloom)
+        f.write(struct.pack(f"<{count + 1}I", *offsets))
+        for key in keys:
+            f.write(key)
+    # Атомарная замена: уже открытые индексы продолжают читать старый файл
+    os.replace(tmp_path, path)
+    return count
+
+
+def fetch_project_names(timeout: float = 120.0):
+    # Полный список проектов через Simple API (JSON, PEP 691)
+    import requests
+    response = requests.get(
+        SIMPLE_INDEX_URL, timeout=timeout,
+        headers={"Accept": "application/vnd.pypi.simple.v1+json"}
+    )
+    response.raise_for_status()
+    return [project["name"] for project in response.json()["projects"]]
+
+
+# === Общий экземпляр на процесс ===
+_shared_index = None
+_shared_loaded = False
+_shared_lock = threading.Lock()
+
+
+def get_shared_index() -> Optional[PyPIIndex]:
+    # None — если снимок ещё не скачан: тогда игра работает как раньше
+    global _shared_index, _shared_loaded
+    if not _shared_loaded:
+        with _shared_lock:
+            if not _shared_loaded:
+                for path in (DEFAULT_INDEX_PATH, BUNDLED_INDEX_PATH):
+                    if os.path.exists(path):
+                        try:
+                            _shared_index = PyPIIndex(path)
+                            break
+                        except (OSError, ValueError):
+                            continue
+                _shared_loaded = True
+    return _shared_index
+
+
+# === CLI ===
+# python pypi_index.py fetch              — скачать снимок с pypi.org
+# python pypi_index.py build names.txt    — собрать из файла (по имени в строке)
+# python pypi_index.py check requests     — проверить имя по снимку
+if __name__ == "__main__":
+    command = sys.argv[1] if len(sys.argv) > 1 else "fetch"
+    if command == "fetch":
+        total = build_index(fetch_project_names())
+        print(f"Сохранено {total} имён → {DEFAULT_INDEX_PATH}")
+    elif command == "build" and len(sys.argv) > 2:
+        with open(sys.argv[2], encoding="utf-8") as src:
+            total = build_index(src)
+        print(f"Сохранено {total} имён → {DEFAULT_INDEX_PATH}")
+    elif command == "check" and len(sys.argv) > 2:
+        index = get_shared_index()
+        if index is None:
+            sys.exit("Снимок не найден: выполните `python pypi_index.py fetch`")
+        for lib in sys.argv[2:]:
+            print(f"{lib}: {'✅ есть' if lib in index else '❌ нет'}")
+    else:
+        sys.exit("Использование: python pypi_index.py [fetch | build FILE | check NAME...]")
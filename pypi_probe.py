@@ -0,0 +1,90 @@
+# pypi_probe.py
+# Лёгкая проверка существования пакета на PyPI.
+# Вместо GET /pypi/<name>/json (мегабайты метаданных для torch/tensorflow)
+# делаем HEAD на Simple API и держим keep-alive соединения в пуле,
+# чтобы не платить за TLS-рукопожатие на каждом ходе.
+# requests (с urllib3, SSL и charset_normalizer) импортируется только при
+# создании пробы: в офлайн-режиме и без проверки PyPI он не нужен вовсе.
+import threading
+import time
+from typing import Optional
+
+from validator import canonical_name
+
+PYPI_SIMPLE_URL = "https://pypi.org/simple/"
+USER_AGENT = "python-developer-battle (+https://github.com/RastaWorldWide/Python-Developer-Battle)"
+
+
+class PyPIProbe:
+    def __init__(self, index_url=PYPI_SIMPLE_URL, pool_connections=2, pool_maxsize=8,
+                 connect_timeout=1.0, read_timeout=2.0, method="HEAD"):
+        # Любой Simple API: pypi.org, devpi, корпоративный прокси
+        self.index_url = index_url.rstrip("/") + "/"
+        self.connect_timeout = connect_timeout
+        self.read_timeout = read_timeout
+        self.method = method.upper()
+
+        import requests
+        from requests.adapters import HTTPAdapter
+
+        self._request_error = requests.RequestException
+        self.session = requests.Session()
+        self.session.headers["User-Agent"] = USER_AGENT
+        # Повторы не нужны: ход ограничен по времени, лучше быстро сдаться
+        adapter = HTTPAdapter(pool_connections=pool_connections, pool_maxsize=pool_maxsize,
+                              max_retries=0, pool_block=False)
+        self.session.mount("https://", adapter)
+        self.session.mount("http://", adapter)
+
+        # Статистика для замеров
+        self._stats_lock = threading.Lock()
+        self.requests_made = 0
+        self.total_latency = 0.0
+
+    def url_for(self, name: str) -> str:
+        return f"{self.index_url}{canonical_name(name)}/"
+
+    def exists(self, name: str, timeout: Optional[float] = None) -> Optional[bool]:
+        # True / False — ответ PyPI; None — однозначного ответа нет (сеть, 5xx, лимиты)
+        if timeout is None:
+            timeouts = (self.connect_timeout, self.read_timeout)
+        else:
+            timeouts = (min(self.connect_timeout, timeout), timeout)
+
+        started = time.perf_counter()
+        try:
+            if self.method == "HEAD":
+                response = self.session.head(self.url_for(name), timeout=timeouts, allow_redirects=True)
+            else:
+                # Страница Simple API маленькая, в отличие от JSON-метаданных
+                response = self.session.get(self.url_for(name), timeout=timeouts)
+        except self._request_error:
+            return None
+        finally:
+            with self._stats_lock:
+                self.requests_made += 1
+                self.total_latency += time.perf_counter() - started
+
+        if response.status_code == 200:
+            return True
+        if response.status_code in (404, 410):
+            return False
+        return None
+
+    def close(self):
+        self.session.close()
+
+
+# === Общие экземпляры на процесс (по одному пулу на индекс) ===
+_shared_probes = {}
+_shared_lock = threading.Lock()
+
+
+def get_shared_probe(index_url=PYPI_SIMPLE_URL) -> PyPIProbe:
+    probe = _shared_probes.get(index_url)
+    if probe is None:
+        with _shared_lock:
+            probe = _shared_probes.get(index_url)
+            if probe is None:
+                probe = _shared_probes[index_url] = PyPIProbe(index_url)
+    return probe
@@ -0,0 +1,142 @@
+# pypi_stub.py
+# Локальная подмена PyPI для замеров и отладки без сети.
+# Отдаёт /simple/<name>/ и /pypi/<name>/json для заданного набора имён,
+# умеет добавлять задержку и считает отправленные байты и соединения.
+#
+# Замер «старый способ против пробы»:
+#   python pypi_stub.py [число_проверок]
+import sys
+import threading
+import time
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+
+from validator import canonical_name, canonical_names
+
+DEFAULT_NAMES = ("requests", "numpy", "pandas", "django", "flask", "torch", "tensorflow")
+# Примерный размер /pypi/torch/json — несколько мегабайт метаданных релизов
+JSON_BODY_SIZE = 2_000_000
+
+
+class _StubHandler(BaseHTTPRequestHandler):
+    protocol_version = "HTTP/1.1"  # keep-alive
+
+    def log_message(self, format, *args):
+        pass
+
+    def setup(self):
+        super().setup()
+        self.server.count_connection()
+
+    def _send(self, status, body=b"", content_type="text/html", head_only=False):
+        if self.server.latency:
+            time.sleep(self.server.latency)
+        header = (
+            f"HTTP/1.1 {status} {self.responses[status][0]}\r\n"
+            f"Content-Type: {content_type}\r\n"
+            f"Content-Length: {len(body)}\r\n"
+            f"\r\n"
+        ).encode("latin-1")
+        # Одной записью: иначе Nagle + delayed ACK добавляют ~40 мс
+        payload = header if head_only else header + body
+        self.wfile.write(payload)
+        self.server.count_bytes(len(payload))
+
+    def _route(self, head_only):
+        parts = [p for p in self.path.split("/") if p]
+        if len(parts) == 2 and parts[0] == "simple":
+            name = parts[1]
+            if canonical_name(name) in self.server.names:
+                body = f"<html><body><a href='#'>{name}-1.0.tar.gz</a></body></html>".encode()
+                self._send(200, body, head_only=head_only)
+                return
+        elif len(parts) == 3 and parts[0] == "pypi" and parts[2] == "json":
+            if canonical_name(parts[1]) in self.server.names:
+                self._send(200, self.server.json_body, "application/json", head_only)
+                return
+        self._send(404, b"Not Found", head_only=head_only)
+
+    def do_GET(self):
+        self._route(head_only=False)
+
+    def do_HEAD(self):
+        self._route(head_only=True)
+
+
+class PyPIStubServer(ThreadingHTTPServer):
+    daemon_threads = True
+    # Нагрузочный тест открывает десятки соединений разом; с очередью
+    # по умолчанию (5) лишние получают отказ ещё до обработчика
+    request_queue_size = 256
+
+    def __init__(self, names=DEFAULT_NAMES, latency=0.0, json_size=JSON_BODY_SIZE, port=0):
+        super().__init__(("127.0.0.1", port), _StubHandler)
+        self.names = set(canonical_names(names))
+        self.latency = latency
+        self.json_body = b"{" + b" " * max(0, json_size - 2) + b"}"
+        self._lock = threading.Lock()
+        self.bytes_sent = 0
+        self.connections = 0
+        self._thread = None
+
+    @property
+    def url(self):
+        host, port = self.server_address[:2]
+        return f"http://{host}:{port}"
+
+    def count_bytes(self, n):
+        with self._lock:
+            self.bytes_sent += n
+
+    def count_connection(self):
+        with self._lock:
+            self.connections += 1
+
+    def reset_stats(self):
+        with self._lock:
+            self.bytes_sent = 0
+            self.connections = 0
+
+    def start(self):
+        self._thread = threading.Thread(target=self.serve_forever, daemon=True)
+        self._thread.start()
+        return self
+
+    def stop(self):
+        self.shutdown()
+        self.server_close()
+        if self._thread:
+            self._thread.join()
+            self._thread = None
+
+    def __enter__(self):
+        return self.start()
+
+    def __exit__(self, *exc):
+        self.stop()
+
+
+def _measure(label, server, check, names, rounds):
+    server.reset_stats()
+    started = time.perf_counter()
+    for i in range(rounds):
+        check(names[i % len(names)])
+    elapsed = time.perf_counter() - started
+    print(f"{label:<28} {server.bytes_sent / rounds:>12,.0f} Б/проверку"
+          f" {elapsed / rounds * 1000:>8.2f} мс/проверку"
+          f" {server.connections:>5} соединений")
+
+
+if __name__ == "__main__":
+    import requests
+    from pypi_probe import PyPIProbe
+
+    rounds = int(sys.argv[1]) if len(sys.argv) > 1 else 50
+    names = list(DEFAULT_NAMES) + ["no-such-package"]
+    with PyPIStubServer() as server:
+        _measure("requests.get /pypi/<n>/json", server,
+                 lambda n: requests.get(f"{server.url}/pypi/{n}/json", timeout=3.0).status_code,
+                 names, rounds)
+        probe = PyPIProbe(index_url=server.url + "/simple/")
+        _measure("PyPIProbe HEAD /simple/<n>/", server, probe.exists, names, rounds)
+        probe = PyPIProbe(index_url=server.url + "/simple/", method="GET")
+        _measure("PyPIProbe GET /simple/<n>/", server, probe.exists, names, rounds)
@@ -0,0 +1,198 @@
+# selfplay.py
+# Бот против бота без GUI: калибровка сложности и базы знаний.
+#
+# Каждая партия идёт через тот же GameEngine, что и в окне, а ходы
+# выбирает та же BotStrategy. У каждого бота свой пул имён (своя память):
+# ход соперника бот «слышит» с вероятностью --attention, иначе может
+# назвать уже прозвучавшее имя и проиграть. Кончились имена — бот сдаётся;
+# партия, упёршаяся в --max-moves, — ничья (TRUNCATED), а не чьё-то поражение.
+# Кто ходит первым, чередуется от партии к партии. При --attention 1 боты
+# ничего не забывают, каждая партия выбирает базу до дна, и исход решает
+# только очерёдность — поэтому по умолчанию внимание неполное (ATTENTION).
+#
+# Партии раскладываются пачками по процессам (ProcessPoolExecutor), база
+# знаний в каждом процессе открывается через mmap один раз.
+#
+#   python selfplay.py --games 1000000 --players easy hard
+#   python selfplay.py --games 20000 --players normal normal --attention 0.95 --workers 4
+import argparse
+import os
+import random
+import time
+from concurrent.futures import ProcessPoolExecutor, as_completed
+from typing import Dict, List, Optional, Sequence
+
+from bot_knowledge import get_knowledge_base
+from bot_pool import IndexedPool
+from bot_strategy import DIFFICULTIES, BotStrategy
+from game_engine import GAVE_UP, TRUNCATED, GameEngine
+
+BATCH_SIZE = 1000  # партий на одну задачу процесса
+ATTENTION = 0.9    # как в journal.py bench: иногда ход соперника пропускается
+
+# Состояние процесса-исполнителя: база и таблицы алиасов строятся один раз
+_worker = {}
+
+
+def _init_worker(kb_path: Optional[str]):
+    _worker["kb"] = get_knowledge_base(kb_path)
+
+
+def _side_stats() -> Dict:
+    return {"games": 0, "wins": 0, "losses": 0, "draws": 0, "moves": 0, "think": 0.0, "reasons": {}}
+
+
+def play_game(kb, strategies: Sequence[BotStrategy], attention: float, rng: random.Random,
+              max_moves: int = 0, recorder=None):
+    # Одна партия; strategies — в порядке хода. Возвращает (движок, время выбора по местам)
+    engine = GameEngine([s.difficulty for s in strategies], recorder)
+    pools = [IndexedPool(kb, kb.index_of) for _ in strategies]
+    think = [0.0] * len(strategies)
+    state = engine.state
+
+    while not state.finished:
+        player = state.current_turn
+        pool = pools[player]
+        if max_moves and len(state.history) >= max_moves:
+            # Лимит ходов — не ошибка того, чей сейчас ход: ничья без проигравшего
+            engine.finish(None, TRUNCATED)
+            break
+        if not pool:
+            engine.give_up(player)
+            break
+
+        started = time.perf_counter()
+        name = strategies[player].choose(pool, state.history[-1][1] if state.history else None)
+        think[player] += time.perf_counter() - started
+
+        move = engine.submit_move(name)
+        if move.accepted:
+            for other, other_pool in enumerate(pools):
+                if other != player and rng.random() < attention:
+                    other_pool.discard(name)
+    return engine, think
+
+
+def run_batch(labels: Sequence[str], difficulties: Sequence[str], games: int, first_game: int,
+              seed: int, attention: float, max_moves: int) -> Dict:
+    kb = _worker.get("kb") or get_knowledge_base()
+    rng = random.Random(seed)
+    n = len(labels)
+    stats = {label: _side_stats() for label in labels}
+
+    started = time.perf_counter()
+    for game_no in range(first_game, first_game + games):
+        # Чередуем, кто ходит первым
+        order = [(game_no + i) % n for i in range(n)]
+        strategies = [BotStrategy(kb, difficulties[i], rng) for i in order]
+        engine, think = play_game(kb, strategies, attention, rng, max_moves)
+        result = engine.result()
+
+        for seat, side in enumerate(order):
+            s = stats[labels[side]]
+            s["games"] += 1
+            s["moves"] += result.scores[seat]
+            s["think"] += think[seat]
+            # Счёт у ботов почти всегда равный, поэтому итог — по тому, кто ошибся
+            if result.loser is None:
+                s["draws"] += 1
+            elif result.loser == seat:
+                s["losses"] += 1
+                s["reasons"][result.reason] = s["reasons"].get(result.reason, 0) + 1
+            else:
+                s["wins"] += 1
+    return {"stats": stats, "games": games, "elapsed": time.perf_counter() - started}
+
+
+def _merge(total: Dict, part: Dict):
+    for key, value in part.items():
+        if key == "reasons":
+            for reason, count in value.items():
+                total["reasons"][reason] = total["reasons"].get(reason, 0) + count
+        else:
+            total[key] += value
+
+
+def make_labels(difficulties: Sequence[str]) -> List[str]:
+    # Одинаковые стратегии различаем номером: normal#1, normal#2
+    labels = []
+    for i, d in enumerate(difficulties):
+        labels.append(f"{d}#{i + 1}" if difficulties.count(d) > 1 else d)
+    return labels
+
+
+def simulate(difficulties: Sequence[str], games: int, workers: Optional[int] = None,
+             attention: float = ATTENTION, seed: int = 0, kb_path: Optional[str] = None,
+             max_moves: int = 0, batch_size: int = BATCH_SIZE, progress=None) -> Dict:
+    labels = make_labels(difficulties)
+    totals = {label: _side_stats() for label in labels}
+    workers = workers or os.cpu_count() or 1
+
+    started = time.perf_counter()
+    done = 0
+    with ProcessPoolExecutor(max_workers=workers, initializer=_init_worker, initargs=(kb_path,)) as pool:
+        futures = []
+        for first in range(0, games, batch_size):
+            count = min(batch_size, games - first)
+            futures.append(pool.submit(run_batch, labels, difficulties, count, first,
+                                       seed * 1_000_003 + first, attention, max_moves))
+        for future in as_completed(futures):
+            part = future.result()
+            for label in labels:
+                _merge(totals[label], part["stats"][label])
+            done += part["games"]
+            if progress:
+                progress(done, games)
+    elapsed = time.perf_counter() - started
+
+    return {"labels": labels, "stats": totals, "games": games, "elapsed": elapsed, "workers": workers}
+
+
+def format_report(report: Dict) -> str:
+    games, elapsed = report["games"], report["elapsed"]
+    stats = report["stats"]
+    total_moves = sum(s["moves"] for s in stats.values())
+    lines = [
+        f"Партий: {games:,} за {elapsed:.1f} с на {report['workers']} процессах — "
+        f"{games / elapsed:,.0f} партий/с, {total_moves / elapsed:,.0f} ходов/с",
+        f"Средняя длина партии: {total_moves / max(games, 1):.1f} ходов",
+        "",
+        f"{'стратегия':<12} {'побед':>8} {'пораж.':>8} {'ничьих':>8} {'ходов/партия':>13} {'выбор, ходов/с':>15}  причины поражений",
+    ]
+    for label in report["labels"]:
+        s = stats[label]
+        n = max(s["games"], 1)
+        speed = s["moves"] / s["think"] if s["think"] else 0.0
+        reasons = ", ".join(f"{r}: {c / n:.1%}" for r, c in sorted(s["reasons"].items()))
+        lines.append(
+            f"{label:<12} {s['wins'] / n:>8.1%} {s['losses'] / n:>8.1%} {s['draws'] / n:>8.1%} "
+            f"{s['moves'] / n:>13.1f} {speed:>15,.0f}  {reasons}"
+        )
+    exhausted = sum(s["reasons"].get(GAVE_UP, 0) for s in stats.values())
+    if games and exhausted == games:
+        lines += ["", "⚠ Все партии кончились тем, что у бота не осталось имён: исход решает только "
+                      "очерёдность, сложность не сравнивается. Уменьшите --attention."]
+    return "\n".join(lines)
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Бот против бота: win rate по уровням сложности")
+    parser.add_argument("--games", type=int, default=10_000)
+    parser.add_argument("--players", nargs="+", default=["easy", "hard"], choices=sorted(DIFFICULTIES))
+    parser.add_argument("--workers", type=int, default=None, help="процессов (по умолчанию — все ядра)")
+    parser.add_argument("--attention", type=float, default=ATTENTION,
+                        help="вероятность, что бот запомнит ход соперника (по умолчанию %(default)s)")
+    parser.add_argument("--max-moves", type=int, default=0, help="ограничение длины партии (0 — нет)")
+    parser.add_argument("--seed", type=int, default=0)
+    parser.add_argument("--kb", default=None, help="файл базы знаний (по умолчанию — как у бота)")
+    parser.add_argument("--batch", type=int, default=BATCH_SIZE)
+    args = parser.parse_args()
+    if len(args.players) < 2:
+        parser.error("нужно хотя бы два бота")
+
+    def show_progress(done, total):
+        print(f"\r{done:,}/{total:,}", end="", flush=True)
+
+    report = simulate(args.players, args.games, args.workers, args.attention, args.seed,
+                      args.kb, args.max_moves, args.batch, show_progress)
+    print("\r" + format_report(report))
@@ -0,0 +1,42 @@
+# speculative.py
+# Проверка имени пакета, пока игрок ещё печатает.
+# На каждое нажатие клавиши откладываем проверку на DEBOUNCE_MS; если текст
+# снова изменился — старая проверка отменяется. Движок проверок склеивает
+# одинаковые имена, так что по Enter ход присоединяется к уже идущему
+# запросу, а готовый ответ берётся из кэша цепочки.
+DEBOUNCE_MS = 250
+
+
+class SpeculativeValidator:
+    def __init__(self, root, engine, chain, debounce_ms=DEBOUNCE_MS):
+        self.root = root
+        self.engine = engine
+        self.chain = chain
+        self.debounce_ms = debounce_ms
+        self._after_id = None
+        self._future = None
+
+    def on_text_changed(self, name: str, deadline: float):
+        # Вызывается из Tk на каждое изменение поля ввода
+        self._cancel_pending()
+        if name:
+            self._after_id = self.root.after(self.debounce_ms, self._start, name, deadline)
+
+    def _cancel_pending(self):
+        if self._after_id is not None:
+            self.root.after_cancel(self._after_id)
+            self._after_id = None
+
+    def _start(self, name, deadline):
+        self._after_id = None
+        # Проверка для устаревшего текста, если ещё не началась, не нужна
+        if self._future is not None:
+            self.engine.cancel(self._future)
+        self._future = self.engine.check(self.chain, name, deadline, speculative=True)
+
+    def reset(self):
+        # Новый ход: старые догадки больше не нужны (ответы остались в кэшах цепочки)
+        self._cancel_pending()
+        if self._future is not None:
+            self.engine.cancel(self._future)
+            self._future = None
@@ -0,0 +1,139 @@
+# test_game_clock.py
+# GameClock без Tk: root.after заменяет маленький цикл событий в тесте.
+# Проверяем опоздание тиков (джиттер), точность тайм-аута, паузу и банк
+# времени, а также что часы не заводят потоков.
+#
+#   python -m pytest -q test_game_clock.py
+import heapq
+import itertools
+import threading
+import time
+
+from game_clock import GameClock
+
+# С запасом на загруженную машину: тик ждёт цикл событий, а не sleep(1)
+MAX_JITTER = 0.05
+MAX_AVG_JITTER = 0.01
+
+
+# === Поддельный root: только after / after_cancel ===
+class FakeRoot:
+    def __init__(self):
+        self._queue = []
+        self._ids = itertools.count()
+        self._cancelled = set()
+
+    def after(self, ms, func, *args):
+        after_id = f"after#{next(self._ids)}"
+        heapq.heappush(self._queue, (time.monotonic() + ms / 1000, after_id, func, args))
+        return after_id
+
+    def after_cancel(self, after_id):
+        self._cancelled.add(after_id)
+
+    @property
+    def pending(self):
+        return sum(1 for _, after_id, _, _ in self._queue if after_id not in self._cancelled)
+
+    def run(self, seconds, until=None):
+        # Как mainloop: вызываем то, чей срок настал, остальное время спим
+        end = time.monotonic() + seconds
+        while time.monotonic() < end and not (until and until()):
+            if not self._queue:
+                time.sleep(0.001)
+                continue
+            at, after_id, func, args = self._queue[0]
+            now = time.monotonic()
+            if at > now:
+                time.sleep(min(at - now, 0.001))
+                continue
+            heapq.heappop(self._queue)
+            if after_id not in self._cancelled:
+                func(*args)
+
+
+def make_clock(turn_time=1.0, **kwargs):
+    root = FakeRoot()
+    events = {"ticks": [], "timeouts": []}
+    clock = GameClock(root, turn_time,
+                      on_tick=events["ticks"].append,
+                      on_timeout=lambda player: events["timeouts"].append((player, time.monotonic())),
+                      **kwargs)
+    return root, clock, events
+
+
+# === Тесты ===
+def test_tick_jitter_is_small():
+    root, clock, events = make_clock(turn_time=1.0)
+    clock.start_turn(0)
+    root.run(1.5, until=lambda: events["timeouts"])
+
+    assert clock.ticks >= 8  # шаг 100 мс за секунду хода
+    assert clock.jitter_max < MAX_JITTER
+    assert clock.jitter_avg < MAX_AVG_JITTER
+
+
+def test_ticks_render_tenths():
+    root, clock, events = make_clock(turn_time=0.5)
+    clock.start_turn(0)
+    root.run(1.0, until=lambda: events["timeouts"])
+
+    shown = events["ticks"]
+    assert shown[-1] == 0.0
+    assert all(a > b for a, b in zip(shown, shown[1:]))
+    # Тики на границах шага: десятые доли видны, а не только целые секунды
+    assert len({round(left, 1) for left in shown}) >= 5
+
+
+def test_timeout_fires_at_deadline():
+    root, clock, events = make_clock(turn_time=0.3)
+    started = time.monotonic()
+    clock.start_turn(1)
+    root.run(1.0, until=lambda: events["timeouts"])
+
+    (player, at), = events["timeouts"]
+    assert player == 1
+    assert abs(at - started - 0.3) < MAX_JITTER
+    assert not clock.running
+    assert root.pending == 0
+
+
+def test_pause_stops_time():
+    root, clock, events = make_clock(turn_time=0.5)
+    clock.start_turn(0)
+    root.run(0.1)
+    clock.pause()
+    left = clock.remaining()
+    assert root.pending == 0
+
+    time.sleep(0.3)
+    assert clock.remaining() == left
+
+    clock.resume()
+    started = time.monotonic()
+    root.run(1.0, until=lambda: events["timeouts"])
+    assert abs(events["timeouts"][0][1] - started - left) < MAX_JITTER
+
+
+def test_time_bank_is_spent_after_turn_time():
+    root, clock, events = make_clock(turn_time=0.2, bank=0.3)
+    clock.start_turn(0)
+    root.run(0.35)  # основное время вышло, идёт банк
+    assert not events["timeouts"]
+    clock.stop()
+
+    assert 0.1 < clock.banks[0] < 0.2
+    assert clock.banks[1] == 0.3
+
+
+def test_no_threads_per_turn():
+    root, clock, events = make_clock(turn_time=0.2)
+    before = threading.active_count()
+    for turn in range(10):
+        clock.start_turn(turn % 2)
+        root.run(0.03)
+        assert threading.active_count() == before
+    clock.stop()
+
+    assert threading.active_count() == before
+    assert root.pending == 0  # один планировщик: от старых ходов тиков не осталось
@@ -0,0 +1,56 @@
+# test_pypi_stub.py
+# Локальная подмена PyPI: известное имя — 200, неизвестное — 404, на HEAD
+# и на GET, для /simple/ и /pypi/<name>/json; stop() гасит сервер и поток.
+#
+#   python -m pytest -q test_pypi_stub.py
+import http.client
+import threading
+from urllib.parse import urlsplit
+
+import pytest
+
+from pypi_stub import PyPIStubServer
+
+
+@pytest.fixture(scope="module")
+def server():
+    server = PyPIStubServer(["requests", "Flask_Login"], json_size=64).start()
+    yield server
+    server.stop()
+
+
+def _request(server, method, path):
+    url = urlsplit(server.url)
+    conn = http.client.HTTPConnection(url.hostname, url.port, timeout=5)
+    try:
+        conn.request(method, path)
+        response = conn.getresponse()
+        return response.status, response.read()
+    finally:
+        conn.close()
+
+
+@pytest.mark.parametrize("method", ["HEAD", "GET"])
+@pytest.mark.parametrize("path", ["/simple/requests/", "/simple/flask-login/", "/pypi/requests/json"])
+def test_known_name(server, method, path):
+    status, body = _request(server, method, path)
+    assert status == 200
+    assert (body == b"") == (method == "HEAD")
+
+
+@pytest.mark.parametrize("method", ["HEAD", "GET"])
+@pytest.mark.parametrize("path", ["/simple/no-such-lib/", "/pypi/no-such-lib/json", "/other"])
+def test_unknown_name(server, method, path):
+    status, _ = _request(server, method, path)
+    assert status == 404
+
+
+def test_stop():
+    server = PyPIStubServer(["requests"]).start()
+    assert _request(server, "HEAD", "/simple/requests/")[0] == 200
+    thread = server._thread
+    server.stop()
+    assert not thread.is_alive()
+    assert not any(t is thread for t in threading.enumerate())
+    with pytest.raises(OSError):
+        _request(server, "HEAD", "/simple/requests/")
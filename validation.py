@@ -0,0 +1,328 @@
+# validation.py
+# Цепочка источников для проверки «существует ли пакет на PyPI».
+# Источники опрашиваются по порядку: кэш в памяти → кэш на диске →
+# офлайн-снимок → зеркало (devpi / прокси) → публичный PyPI.
+# Каждая проверка укладывается в бюджет, взятый из дедлайна хода,
+# а медленные или падающие источники временно пропускаются.
+# Одновременные проверки одного имени делят один запрос (single-flight),
+# а к сетевым источникам можно задать лимит частоты (TokenBucket).
+# Время каждой проверки и каждого источника пишется в metrics.py.
+import threading
+import time
+from collections import OrderedDict
+from typing import List, Optional, Tuple
+
+from metrics import get_shared_metrics
+from pypi_cache import get_shared_cache
+from validator import canonical_name
+from pypi_index import get_shared_index
+from pypi_probe import PYPI_SIMPLE_URL, get_shared_probe
+
+# Меньше этого бюджета сетевой запрос не имеет смысла
+MIN_BUDGET = 0.05
+# Даже отправленный на последней секунде ход проверяется хотя бы столько
+FLOOR_BUDGET = 0.5
+# Сколько ошибок подряд — и источник «выключается» на COOLDOWN секунд
+FAILURE_THRESHOLD = 3
+COOLDOWN = 30.0
+# Сглаживание оценки задержки источника
+LATENCY_ALPHA = 0.3
+# Кэш в памяти: сколько имён держим и сколько им верим (сек).
+# Отрицательный ответ живёт меньше — пакет могут опубликовать посреди вечера
+MEMORY_MAX_ENTRIES = 10_000
+MEMORY_POSITIVE_TTL = 60 * 60
+MEMORY_NEGATIVE_TTL = 5 * 60
+
+
+class TokenBucket:
+    # Ограничение частоты запросов к источнику: rate в секунду, всплеск до burst
+    def __init__(self, rate: float, burst: Optional[float] = None):
+        self.rate = rate
+        self.capacity = burst or max(1.0, rate)
+        self._tokens = self.capacity
+        self._updated = time.monotonic()
+        self._lock = threading.Lock()
+
+    def acquire(self, timeout: float = 0.0) -> bool:
+        # Ждёт жетон не дольше timeout; False — лимит исчерпан
+        deadline = time.monotonic() + timeout
+        while True:
+            with self._lock:
+                now = time.monotonic()
+                self._tokens = min(self.capacity, self._tokens + (now - self._updated) * self.rate)
+                self._updated = now
+                if self._tokens >= 1.0:
+                    self._tokens -= 1.0
+                    return True
+                wait = (1.0 - self._tokens) / self.rate
+            if now + wait > deadline:
+                return False
+            time.sleep(wait)
+
+
+class ValidationBackend:
+    name = "backend"
+    # Кэши умеют запоминать ответы источников, стоящих дальше по цепочке
+    is_cache = False
+    # Постоянный кэш запоминает только то, что пришло по сети
+    is_persistent = False
+    is_remote = False
+    # TokenBucket для сетевых источников; None — без ограничения
+    limiter = None
+
+    def lookup(self, key: str, timeout: float) -> Optional[bool]:
+        # True / False — ответ; None — источник не знает
+        raise NotImplementedError
+
+    def store(self, key: str, exists: bool):
+        pass
+
+
+class MemoryCacheBackend(ValidationBackend):
+    # LRU с TTL: на сервере живёт неделями и не должен расти без предела
+    name = "memory"
+    is_cache = True
+
+    def __init__(self, max_entries=MEMORY_MAX_ENTRIES, positive_ttl=MEMORY_POSITIVE_TTL,
+                 negative_ttl=MEMORY_NEGATIVE_TTL):
+        self.max_entries = max_entries
+        self.positive_ttl = positive_ttl
+        self.negative_ttl = negative_ttl
+        self._data = OrderedDict()  # ключ → (exists, истекает)
+        self._lock = threading.Lock()
+
+    def lookup(self, key, timeout):
+        with self._lock:
+            item = self._data.get(key)
+            if item is None:
+                return None
+            if item[1] <= time.monotonic():
+                del self._data[key]
+                return None
+            self._data.move_to_end(key)
+            return item[0]
+
+    def store(self, key, exists):
+        expires = time.monotonic() + (self.positive_ttl if exists else self.negative_ttl)
+        with self._lock:
+            self._data[key] = (exists, expires)
+            self._data.move_to_end(key)
+            while len(self._data) > self.max_entries:
+                self._data.popitem(last=False)
+
+    def __len__(self):
+        return len(self._data)
+
+
+class DiskCacheBackend(ValidationBackend):
+    name = "disk"
+    is_cache = True
+    is_persistent = True
+
+    def __init__(self, cache=None):
+        self.cache = cache or get_shared_cache()
+
+    def lookup(self, key, timeout):
+        return self.cache.get(key)
+
+    def store(self, key, exists):
+        self.cache.set(key, exists)
+
+
+class SnapshotIndexBackend(ValidationBackend):
+    name = "index"
+
+    def __init__(self, index, authoritative=False):
+        self.index = index
+        # Без сети снимок — последняя инстанция: «нет в снимке» значит «нет»
+        self.authoritative = authoritative
+
+    def lookup(self, key, timeout):
+        if key in self.index:
+            return True
+        # Пакет мог появиться после снятия снимка — пусть решает сеть
+        return False if self.authoritative else None
+
+
+class ProbeBackend(ValidationBackend):
+    is_remote = True
+
+    def __init__(self, probe, name="pypi", limiter: Optional[TokenBucket] = None):
+        self.probe = probe
+        self.name = name
+        self.limiter = limiter
+
+    def lookup(self, key, timeout):
+        return self.probe.exists(key, timeout=timeout)
+
+
+class _BackendHealth:
+    def __init__(self):
+        self.failures = 0
+        self.disabled_until = 0.0
+        self.latency = 0.0  # сглаженная задержка, сек
+
+
+class _Flight:
+    # Одна проверка имени, которую ждут все одновременные вызовы check()
+    __slots__ = ("event", "result")
+
+    def __init__(self):
+        self.event = threading.Event()
+        self.result = None
+
+
+class ValidationChain:
+    def __init__(self, backends: List[ValidationBackend], default_budget=3.0,
+                 failure_threshold=FAILURE_THRESHOLD, cooldown=COOLDOWN, metrics=None):
+        self.backends = backends
+        self.default_budget = default_budget
+        self.failure_threshold = failure_threshold
+        self.cooldown = cooldown
+        self._health = {id(b): _BackendHealth() for b in backends}
+        self._lock = threading.Lock()
+        self._inflight = {}  # канон. имя → _Flight
+        self.stats = {"checks": 0, "cache_hits": 0, "shared": 0, "upstream": 0, "limited": 0, "unknown": 0}
+        # Свои метрики — у фоновых проверок (warmup.py), чтобы не смешивать их с ходами
+        self.metrics = metrics or get_shared_metrics()
+
+    def _available(self, backend, now, budget) -> bool:
+        if backend.is_cache:
+            return True
+        health = self._health[id(backend)]
+        if health.disabled_until > now:
+            return False
+        # Источник, который обычно отвечает дольше оставшегося бюджета, не ждём,
+        # но оценку уменьшаем — чтобы со временем попробовать его снова
+        if health.latency > budget:
+            health.latency /= 2
+            return False
+        return True
+
+    def _record(self, backend, elapsed, ok, budget):
+        with self._lock:
+            health = self._health[id(backend)]
+            health.latency += LATENCY_ALPHA * (elapsed - health.latency)
+            # Ответ позже бюджета для игры так же плох, как ошибка
+            if ok and elapsed <= budget:
+                health.failures = 0
+                return
+            health.failures += 1
+            if health.failures >= self.failure_threshold:
+                health.disabled_until = time.monotonic() + self.cooldown
+                health.failures = 0
+
+    def check(self, name: str, deadline: Optional[float] = None) -> Optional[bool]:
+        # deadline — момент time.monotonic(), к которому нужен ответ.
+        # Одновременные проверки одного имени (из любых потоков и комнат)
+        # ждут одну и ту же проверку: к источникам уходит один запрос.
+        key = canonical_name(name)
+        started = time.monotonic()
+        if deadline is None:
+            deadline = started + self.default_budget
+        deadline = max(deadline, started + FLOOR_BUDGET)
+        self._count("checks")
+
+        while True:
+            with self._lock:
+                flight = self._inflight.get(key)
+                leader = flight is None
+                if leader:
+                    flight = self._inflight[key] = _Flight()
+            if leader:
+                break
+            self._count("shared")
+            if not flight.event.wait(max(0.0, deadline - time.monotonic())):
+                self._observe_check(started, "shared")
+                return None
+            # У ведущей проверки мог кончиться её бюджет — тогда пробуем сами
+            if flight.result is not None or deadline - time.monotonic() < MIN_BUDGET:
+                self._observe_check(started, "shared")
+                return flight.result
+
+        source = "unknown"
+        try:
+            flight.result, source = self._lookup(key, deadline)
+            if flight.result is None:
+                self._count("unknown")
+        finally:
+            self._observe_check(started, source)
+            with self._lock:
+                del self._inflight[key]
+            flight.event.set()
+        return flight.result
+
+    def _observe_check(self, started, source):
+        self.metrics.observe("validation_check_ms", (time.monotonic() - started) * 1000, source=source)
+
+    def _count(self, stat):
+        with self._lock:
+            self.stats[stat] += 1
+
+    def _lookup(self, key, deadline) -> Tuple[Optional[bool], str]:
+        # (ответ, имя ответившего источника)
+        for i, backend in enumerate(self.backends):
+            now = time.monotonic()
+            budget = deadline - now
+            if budget < MIN_BUDGET and not backend.is_cache:
+                break
+            if not self._available(backend, now, budget):
+                continue
+            # Лимит запросов к источнику: ждём жетон в пределах бюджета,
+            # иначе идём дальше — это не ошибка источника
+            if backend.limiter is not None and not backend.limiter.acquire(budget - MIN_BUDGET):
+                self._count("limited")
+                continue
+            if backend.is_remote:
+                self._count("upstream")
+
+            try:
+                result = backend.lookup(key, budget)
+                ok = True
+            except Exception:
+                result, ok = None, False
+            self.metrics.observe("validation_backend_ms", (time.monotonic() - now) * 1000, backend=backend.name)
+            if not backend.is_cache:
+                self._record(backend, time.monotonic() - now, ok and result is not None, budget)
+
+            if result is not None:
+                if backend.is_cache:
+                    self._count("cache_hits")
+                for cache in self.backends[:i]:
+                    if cache.is_cache and (backend.is_remote or not cache.is_persistent):
+                        cache.store(key, result)
+                return result, backend.name
+        return None, "unknown"
+
+    def is_real_package(self, name: str, deadline: Optional[float] = None) -> bool:
+        # Нет однозначного ответа — не ломаем игру
+        exists = self.check(name, deadline)
+        return True if exists is None else exists
+
+
+def build_validation_chain(settings, metrics=None) -> ValidationChain:
+    if not settings.get("pypi_check", True):
+        return ValidationChain([], metrics=metrics)
+
+    offline = settings.get("offline_mode", False)
+    backends = [MemoryCacheBackend(settings.get("memory_cache_size") or MEMORY_MAX_ENTRIES), DiskCacheBackend()]
+
+    index = get_shared_index()
+    if index is not None:
+        backends.append(SnapshotIndexBackend(index, authoritative=offline))
+
+    if not offline:
+        # pypi_url — другой основной индекс (например, локальная заглушка для нагрузочных тестов)
+        primary = settings.get("pypi_url") or PYPI_SIMPLE_URL
+        mirror = settings.get("pypi_mirror")
+        # upstream_rate — запросов в секунду к каждому сетевому источнику (0 — без лимита)
+        rate = settings.get("upstream_rate") or 0
+
+        def limiter():
+            return TokenBucket(rate, settings.get("upstream_burst")) if rate > 0 else None
+
+        if mirror and mirror.rstrip("/") != primary.rstrip("/"):
+            backends.append(ProbeBackend(get_shared_probe(mirror), name="mirror", limiter=limiter()))
+        backends.append(ProbeBackend(get_shared_probe(primary), name="pypi", limiter=limiter()))
+
+    return ValidationChain(backends, metrics=metrics)
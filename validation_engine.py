@@ -0,0 +1,148 @@
+# validation_engine.py
+# Один долгоживущий движок проверок на процесс вместо потока на каждый ход.
+# Проверки выполняются в ограниченном пуле потоков, одинаковые имена,
+# которые уже проверяются, не запускаются повторно, а результаты попадают
+# обратно в Tk через очередь, которую разбирает root.after.
+import queue
+import sys
+import threading
+import traceback
+from concurrent.futures import CancelledError, Future, ThreadPoolExecutor
+from typing import Callable, Optional
+
+from profiling import profiled
+from validator import canonical_name
+
+MAX_WORKERS = 4
+# Сколько проверок может ждать в очереди; лишние догадки при наборе отбрасываются
+MAX_PENDING = 32
+POLL_MS = 15
+
+
+class ValidationEngine:
+    def __init__(self, max_workers=MAX_WORKERS, max_pending=MAX_PENDING):
+        self.max_pending = max_pending
+        self._executor = ThreadPoolExecutor(max_workers=max_workers, thread_name_prefix="validation")
+        self._inflight = {}  # (id(chain), канон. имя) → Future
+        self._lock = threading.Lock()
+        self.stats = {"resubmitted": 0, "errors": 0}
+
+    def check(self, chain, name: str, deadline: float, speculative=False) -> Optional[Future]:
+        # Future с ответом chain.check (True / False / None).
+        # Для догадок при наборе вернёт None, если движок и так перегружен.
+        key = (id(chain), canonical_name(name))
+        with self._lock:
+            future = self._inflight.get(key)
+            if future is not None and not future.cancelled():
+                return future
+            if speculative and len(self._inflight) >= self.max_pending:
+                return None
+            # profiled: без записи профиля — прямой вызов chain.check
+            future = self._inflight[key] = self._executor.submit(profiled, chain.check, key[1], deadline)
+        future.add_done_callback(lambda f: self._forget(key, f))
+        return future
+
+    def _forget(self, key, future):
+        with self._lock:
+            if self._inflight.get(key) is future:
+                del self._inflight[key]
+
+    def cancel(self, future: Future) -> bool:
+        # Отменить можно только ещё не начатую проверку
+        return future.cancel()
+
+    def submit(self, chain, name: str, deadline: float, completions: "CompletionQueue",
+               callback: Callable[[Optional[bool]], None]) -> Optional[Future]:
+        # Проверка хода: callback(exists) вызовется в потоке Tk.
+        # exists: True / False; None — проверка упала (ошибка в коде), ход не засчитан
+        try:
+            future = self.check(chain, name, deadline)
+        except RuntimeError:
+            return None  # движок остановлен: приложение закрывается
+
+        def done(f):
+            try:
+                exists = f.result()
+            except CancelledError:
+                # Общую с догадкой проверку отменили до старта — ход всё равно ждёт ответа
+                self.stats["resubmitted"] += 1
+                self.submit(chain, name, deadline, completions, callback)
+                return
+            except Exception:
+                self.stats["errors"] += 1
+                traceback.print_exc(file=sys.stderr)
+                completions.put(callback, None)
+                return
+            # Сеть не ответила (chain.check → None) — не ломаем игру, ход засчитываем
+            completions.put(callback, True if exists is None else exists)
+
+        future.add_done_callback(done)
+        return future
+
+    @property
+    def pending(self) -> int:
+        return len(self._inflight)
+
+    def shutdown(self):
+        self._executor.shutdown(wait=False)
+
+
+class CompletionQueue:
+    # Результаты из рабочих потоков → основной поток Tk
+    def __init__(self, root, poll_ms=POLL_MS):
+        self.root = root
+        self.poll_ms = poll_ms
+        self._queue = queue.SimpleQueue()
+        self._after_id = None
+        self._running = False
+
+    def put(self, callback, *args):
+        # Можно вызывать из любого потока
+        self._queue.put((callback, args))
+
+    def start(self):
+        if not self._running:
+            self._running = True
+            self._after_id = self.root.after(self.poll_ms, self._drain)
+            # Окно закрыли крестиком — опрос больше не нужен
+            self.root.bind("<Destroy>", self._on_destroy, add="+")
+
+    def _on_destroy(self, event):
+        if event.widget is self.root:
+            self.stop()
+
+    def _drain(self):
+        self._after_id = None
+        while self._running:
+            try:
+                callback, args = self._queue.get_nowait()
+            except queue.Empty:
+                break
+            callback(*args)
+        # Обработчик мог остановить очередь (конец игры, закрытие окна)
+        if self._running:
+            self._after_id = self.root.after(self.poll_ms, self._drain)
+
+    def stop(self):
+        self._running = False
+        if self._after_id is not None:
+            self.root.after_cancel(self._after_id)
+            self._after_id = None
+
+
+# === Общий движок на процесс ===
+_shared_engine = None
+_shared_lock = threading.Lock()
+
+
+def get_shared_engine() -> ValidationEngine:
+    global _shared_engine
+    if _shared_engine is None:
+        with _shared_lock:
+            if _shared_engine is None:
+                from metrics import get_shared_metrics
+
+                _shared_engine = ValidationEngine()
+                get_shared_metrics().gauge("validation_engine",
+                                           lambda: {(("stat", k),): v for k, v in _shared_engine.stats.items()})
+    return _shared_engine
@@ -0,0 +1,129 @@
+# validator.py
+# Имена библиотек: грамматика хода и канонический ключ — одни на всю игру
+# (движок, экраны, сервер, кэш, индекс, база знаний бота).
+#   normalize_name  — как имя показываем: без пробелов по краям, строчными
+#   is_valid_lib_name — проходит ли имя грамматику хода (буква или «_»,
+#                     дальше буквы, цифры, «-», «_»; не ключевое слово)
+#   canonical_name  — ключ по PEP 503: Django_REST и django-rest — одно имя
+#   name_key        — всё сразу: ключ допустимого имени или None
+# Пакетные версии (name_keys, canonical_names) обрабатывают сотни тысяч
+# имён за один вызов: список склеивается в одну строку, и обрезка,
+# перевод в нижний регистр, грамматика и свёртка разделителей проходят
+# по ней целиком на стороне C, без вызова Python-функций на каждое имя.
+#
+#   python validator.py names.txt [--show-invalid N]
+import re
+from typing import Iterable, List, Optional
+
+FORBIDDEN_NAMES = frozenset({'import', 'from', 'def', 'class', 'pass', 'true', 'false', 'none', ''})
+
+# Первый символ — буква или «_», дальше — буквы, цифры, «_» и «-».
+# Ещё нужна хотя бы одна буква или цифра: это проверяется после свёртки
+# разделителей (у имени из одних «_» и «-» ключ — ровно «-»), так
+# дешевле, чем заглядывание вперёд в самом выражении.
+# [^\W\d] — это «_», буквы и ещё числовые знаки не из десятичных цифр
+# («²», «½», «Ⅻ»): \w их включает, а str.isalpha() — нет. Регулярным
+# выражением их не отсечь, поэтому первый не-ASCII символ дополнительно
+# проверяется через isalpha() (ASCII-имена эта проверка не замедляет)
+_GRAMMAR = re.compile(r"[^\W\d][\w-]*").fullmatch
+
+# Та же грамматика построчно для склеенного списка, пробелы по краям
+# строки отбрасываются; группа пуста — строка не прошла
+_GRAMMAR_LINES = re.compile(r"^[^\S\n]*(?:([^\W\d][\w-]*)[^\S\n]*$|.*$)", re.MULTILINE)
+_STRIP_LINES = re.compile(r"^[^\S\n]*(.*\S|)[^\S\n]*$", re.MULTILINE)
+
+
+def normalize_name(name: str) -> str:
+    return name.strip().lower()
+
+
+def is_valid_lib_name(name: str) -> bool:
+    return (_GRAMMAR(name) is not None and (name[0] < "\x80" or name[0].isalpha())
+            and name.strip("-_") != "" and name.lower() not in FORBIDDEN_NAMES)
+
+
+def _fold_separators(text: str) -> str:
+    # Любая серия «-», «_», «.» → один «-»; str.replace быстрее re.sub
+    text = text.replace("_", "-").replace(".", "-")
+    while "--" in text:
+        text = text.replace("--", "-")
+    return text
+
+
+def canonical_name(name: str) -> str:
+    # Нормализация имени по PEP 503: Django_REST → django-rest
+    return _fold_separators(name.lower())
+
+
+def name_key(name: str) -> Optional[str]:
+    # Ключ для used_libs и кэшей; None — имя не проходит грамматику
+    name = name.strip().lower()
+    if _GRAMMAR(name) is None or name in FORBIDDEN_NAMES or (name[0] >= "\x80" and not name[0].isalpha()):
+        return None
+    key = _fold_separators(name)
+    return key if key != "-" else None
+
+
+# === Пакетная обработка ===
+def _joined(names: List[str]) -> Optional[str]:
+    # Одна строка на имя; None — в каком-то имени есть перевод строки
+    blob = "\n".join(names)
+    if blob.count("\n") != len(names) - 1:
+        return None
+    return blob.lower()
+
+
+def name_keys(names: Iterable[str]) -> List[Optional[str]]:
+    # name_key для каждого имени, в том же порядке
+    names = names if isinstance(names, list) else list(names)
+    if not names:
+        return []
+    blob = _joined(names)
+    if blob is None:
+        return [name_key(name) for name in names]
+    valid = _GRAMMAR_LINES.findall(blob)
+    keys = _fold_separators("\n".join(valid)).split("\n")
+    forbidden = FORBIDDEN_NAMES
+    if blob.isascii():
+        return [key if key and key != "-" and name not in forbidden else None for name, key in zip(valid, keys)]
+    # Первый символ мог оказаться числовым знаком вроде «²» (у ключа он тот же, что у имени)
+    return [key if key and key != "-" and name not in forbidden and (key[0] < "\x80" or key[0].isalpha())
+            else None for name, key in zip(valid, keys)]
+
+
+def canonical_names(names: Iterable[str]) -> List[str]:
+    # Ключи PEP 503 без грамматики хода (для снимков PyPI, где бывают
+    # и точки, и цифры в начале); пустые строки остаются пустыми
+    names = names if isinstance(names, list) else list(names)
+    if not names:
+        return []
+    blob = _joined(names)
+    if blob is None:
+        return [canonical_name(name.strip()) for name in names]
+    return _fold_separators("\n".join(_STRIP_LINES.findall(blob))).split("\n")
+
+
+if __name__ == "__main__":
+    import argparse
+    import time
+
+    parser = argparse.ArgumentParser(description="Проверить список имён (по одному в строке)")
+    parser.add_argument("path")
+    parser.add_argument("--show-invalid", type=int, default=0, metavar="N", help="показать первые N отвергнутых")
+    args = parser.parse_args()
+
+    with open(args.path, encoding="utf-8") as f:
+        names = f.read().splitlines()
+    started = time.perf_counter()
+    keys = name_keys(names)
+    elapsed = time.perf_counter() - started
+    valid = [key for key in keys if key is not None]
+    print(f"имён: {len(names):,}, допустимых: {len(valid):,}, разных ключей: {len(set(valid)):,} "
+          f"({elapsed * 1000:.1f} мс)")
+    shown = 0
+    for name, key in zip(names, keys):
+        if shown >= args.show_invalid:
+            break
+        if key is None and name.strip():
+            print(f"  ✗ {name!r}")
+            shown += 1
@@ -0,0 +1,208 @@
+# warmup.py
+# Прогрев постоянного кэша PyPI: имена, которые почти наверняка прозвучат
+# в партии, проверяются заранее — в меню или командой — и первая партия
+# дня не ждёт сетевых запросов на холодном кэше.
+#
+# Что прогреваем: самые частые имена из журналов партий за JOURNAL_DAYS
+# (их называют люди), затем база знаний бота по популярности (их называет
+# бот). Имена, на которые цепочка и так ответит без сети (кэш на диске,
+# офлайн-снимок), пропускаются, поэтому повторный прогрев почти ничего
+# не стоит. Остальное проверяют WORKERS фоновых потоков через обычную
+# цепочку (validation.py) не чаще RATE запросов в секунду на всех;
+# ответы сети цепочка сама пишет в кэш на диске. Метрики у прогрева
+# свои: его запросы не попадают в гистограммы времени хода.
+#
+#   python warmup.py                      # база бота + журналы, до MAX_NAMES имён
+#   python warmup.py --limit 5000 --workers 8 --rate 50
+#   python warmup.py --dry-run            # только посчитать, что пойдёт в сеть
+import os
+import threading
+import time
+from typing import Dict, Iterable, List, Optional
+
+from metrics import Metrics
+from validation import TokenBucket, build_validation_chain
+from validator import name_keys
+
+WORKERS = 4
+RATE = 20.0           # запросов в секунду на все потоки; PyPI — общий ресурс
+MAX_NAMES = 500       # столько имён прогреваем из меню
+CHECK_TIMEOUT = 3.0
+JOURNAL_DAYS = 30     # журналы пишутся по файлу в день на процесс
+
+
+def warmup_names(kb=None, journal_paths: Iterable[str] = (), limit: int = MAX_NAMES) -> List[str]:
+    # Канонические ключи без повторов: сначала частые в журналах, затем база бота
+    from journal import played_names
+
+    names = dict.fromkeys(key for key, _ in played_names(journal_paths, limit))
+    if kb is not None and len(names) < limit:
+        import heapq
+
+        top = heapq.nlargest(limit, range(len(kb)), key=kb.popularity)
+        for key in name_keys([kb[i] for i in top]):
+            if key is not None:
+                names.setdefault(key)
+    return list(names)[:limit]
+
+
+def recent_journal_files(days: int = JOURNAL_DAYS) -> List[str]:
+    from journal import journal_files
+
+    return journal_files(days=days)
+
+
+class CacheWarmer:
+    def __init__(self, chain, workers=WORKERS, rate=RATE, timeout=CHECK_TIMEOUT):
+        self.chain = chain
+        self.workers = workers
+        self.limiter = TokenBucket(rate) if rate > 0 else None
+        self.timeout = timeout
+        self.stats = {"names": 0, "local": 0, "checked": 0, "found": 0, "missing": 0, "unknown": 0}
+        self.started = 0.0
+        self.finished = 0.0
+        self._stop = threading.Event()
+        self._lock = threading.Lock()
+        self._threads: List[threading.Thread] = []
+        self._keys = iter(())
+
+    def pending(self, names: Iterable[str]) -> List[str]:
+        # Ключи, за которыми живая партия пошла бы в сеть
+        if not any(backend.is_remote for backend in self.chain.backends):
+            return []
+        local = [backend for backend in self.chain.backends if not backend.is_remote]
+        keys = [key for key in dict.fromkeys(name_keys(list(names))) if key is not None]
+        self.stats["names"] += len(keys)
+        pending = []
+        for key in keys:
+            if any(backend.lookup(key, self.timeout) is not None for backend in local):
+                self.stats["local"] += 1
+            else:
+                pending.append(key)
+        return pending
+
+    def prepare(self, names: Iterable[str]) -> "CacheWarmer":
+        # Отбор ключей без потоков: после него start() только запускает их
+        self.started = time.perf_counter()
+        self._keys = iter(self.pending(names))
+        return self
+
+    def start(self, names: Optional[Iterable[str]] = None) -> "CacheWarmer":
+        if names is not None:
+            self.prepare(names)
+        for i in range(self.workers):
+            thread = threading.Thread(target=self._work, name=f"warmup-{i}", daemon=True)
+            thread.start()
+            self._threads.append(thread)
+        return self
+
+    def _work(self):
+        while not self._stop.is_set():
+            with self._lock:
+                key = next(self._keys, None)
+            if key is None:
+                break
+            if self.limiter is not None:
+                self.limiter.acquire(timeout=3600)
+                if self._stop.is_set():
+                    break
+            exists = self.chain.check(key, time.monotonic() + self.timeout)
+            with self._lock:
+                self.stats["checked"] += 1
+                self.stats["unknown" if exists is None else "found" if exists else "missing"] += 1
+        with self._lock:
+            self.finished = time.perf_counter()
+
+    @property
+    def running(self) -> bool:
+        return any(thread.is_alive() for thread in self._threads)
+
+    def wait(self, timeout: Optional[float] = None) -> bool:
+        # True — все потоки закончили
+        deadline = None if timeout is None else time.monotonic() + timeout
+        for thread in self._threads:
+            thread.join(None if deadline is None else max(0.0, deadline - time.monotonic()))
+        return not self.running
+
+    def stop(self):
+        # Уже начатые проверки доделываются (их ответы тоже попадут в кэш)
+        self._stop.set()
+
+    def elapsed(self) -> float:
+        end = time.perf_counter() if self.running else self.finished
+        return max(0.0, end - self.started)
+
+
+def prepare_warmup(settings: Dict, limit: int = MAX_NAMES) -> Optional[CacheWarmer]:
+    # Прогрев из меню без запуска потоков (start() — отдельно);
+    # None — проверка PyPI выключена или игра без сети
+    if not settings.get("pypi_check", True) or settings.get("offline_mode", False):
+        return None
+    from bot_knowledge import get_knowledge_base
+
+    try:
+        kb = get_knowledge_base()
+    except (OSError, ValueError):
+        kb = None
+    names = warmup_names(kb, recent_journal_files(), limit)
+    chain = build_validation_chain(settings, metrics=Metrics())
+    return CacheWarmer(chain).prepare(names)
+
+
+def start_warmup(settings: Dict, limit: int = MAX_NAMES) -> Optional[CacheWarmer]:
+    warmer = prepare_warmup(settings, limit)
+    return warmer.start() if warmer is not None else None
+
+
+if __name__ == "__main__":
+    import argparse
+
+    from bot_knowledge import default_knowledge_path, get_knowledge_base
+
+    parser = argparse.ArgumentParser(description="Заранее проверить известные имена и сохранить ответы в кэш")
+    parser.add_argument("--limit", type=int, default=MAX_NAMES, help="сколько имён взять (по умолчанию %(default)s)")
+    parser.add_argument("--workers", type=int, default=WORKERS)
+    parser.add_argument("--rate", type=float, default=RATE, help="запросов в секунду, 0 — без лимита")
+    parser.add_argument("--timeout", type=float, default=CHECK_TIMEOUT, help="секунд на одну проверку")
+    parser.add_argument("--kb", default=None, help=f"база знаний бота (по умолчанию {default_knowledge_path()})")
+    parser.add_argument("--no-kb", action="store_true", help="только имена из журналов")
+    parser.add_argument("--no-journal", action="store_true", help="только база знаний бота")
+    parser.add_argument("--days", type=int, default=JOURNAL_DAYS, help="журналы за сколько последних дней")
+    parser.add_argument("--pypi-url", default=None, help="другой Simple API вместо pypi.org")
+    parser.add_argument("--mirror", default=os.environ.get("PYPI_MIRROR", ""), help="зеркало Simple API")
+    parser.add_argument("--dry-run", action="store_true", help="только показать, сколько имён пойдёт в сеть")
+    args = parser.parse_args()
+
+    kb = None if args.no_kb else get_knowledge_base(args.kb)
+    journals = [] if args.no_journal else recent_journal_files(args.days)
+    names = warmup_names(kb, journals, args.limit)
+    settings = {"pypi_url": args.pypi_url, "pypi_mirror": args.mirror}
+    metrics = Metrics()
+    warmer = CacheWarmer(build_validation_chain(settings, metrics), args.workers, args.rate, args.timeout)
+
+    if args.dry_run:
+        pending = warmer.pending(names)
+        print(f"имён: {len(names):,} (журналов: {len(journals)}), уже известны без сети: "
+              f"{warmer.stats['local']:,}, пойдёт в сеть: {len(pending):,}")
+        raise SystemExit(0)
+
+    warmer.start(names)
+    try:
+        while not warmer.wait(1.0):
+            stats = warmer.stats
+            print(f"\r  проверено {stats['checked']:,} из {stats['names'] - stats['local']:,}", end="", flush=True)
+    except KeyboardInterrupt:
+        warmer.stop()
+        warmer.wait()
+    print("\r" + " " * 60 + "\r", end="")
+
+    stats = warmer.stats
+    elapsed = warmer.elapsed()
+    print(f"имён: {stats['names']:,} (журналов: {len(journals)}), уже известны без сети: {stats['local']:,}")
+    print(f"проверено: {stats['checked']:,} за {elapsed:.1f} с ({stats['checked'] / max(elapsed, 1e-9):.1f}/с): "
+          f"есть {stats['found']:,}, нет {stats['missing']:,}, без ответа {stats['unknown']:,}")
+    for name, labels, histogram in metrics.histograms():
+        if name == "validation_backend_ms" and histogram.count:
+            print(f"  {dict(labels)['backend']:<8} p50 {histogram.percentile(0.5):.1f} мс, "
+                  f"p95 {histogram.percentile(0.95):.1f} мс, макс {histogram.max:.1f} мс")
+    raise SystemExit(1 if stats["unknown"] else 0)